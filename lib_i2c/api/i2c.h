@@ -16,6 +16,7 @@
 #define async_master_send_stop_bit send_stop_bit
 #define async_master_read read
 #define async_master_write write
+#define async_master_transfer transfer
 #define slave_void  slave void
 #endif
 
@@ -28,11 +29,120 @@ typedef enum {
   I2C_ACK,     ///< the slave has ACKed the last byte
 } i2c_res_t;
 
+/** This type is used by the supplementary I2C register read/write functions to
+ *  report back on whether the operation was a success or not.
+ */
+typedef enum {
+  I2C_REGOP_SUCCESS,     ///< the operation was successful
+  I2C_REGOP_DEVICE_NACK, ///< the operation was NACKed when sending the device address, so either the device is missing or busy
+  I2C_REGOP_INCOMPLETE   ///< the operation was NACKed halfway through by the slave
+} i2c_regop_res_t;
+
+/** The register address of a register table entry is 16-bit (most
+ *  significant byte first) rather than 8-bit. */
+#define I2C_REG_ADDR16   0x1
+
+/** The value of a register table entry is 16-bit (most significant byte
+ *  first) rather than 8-bit. */
+#define I2C_REG_DATA16   0x2
+
+/** Write a register table entry in its own transaction, for devices which do
+ *  not increment the register address after each register. */
+#define I2C_REG_NO_BURST 0x4
+
+/** An entry of a table of register writes (see write_reg_table()).
+ */
+typedef struct i2c_reg_write_t {
+  uint8_t device_addr; ///< the address of the slave device to write to
+  uint8_t flags;       ///< ``I2C_REG_ADDR16``, ``I2C_REG_DATA16`` and ``I2C_REG_NO_BURST`` flags
+  uint16_t reg;        ///< the address of the register to write
+  uint16_t value;      ///< the value to write
+  uint16_t delay_us;   ///< the time to wait after writing the register, in microseconds
+} i2c_reg_write_t;
+
+/** An operation of a batch submitted to an asynchronous I2C master (see
+ *  submit_batch()).
+ */
+typedef struct i2c_async_op_t {
+  uint8_t device_addr;   ///< the address of the slave device to read from or write to
+  uint8_t read;          ///< non-zero to read from the device, zero to write to it
+  uint8_t send_stop_bit; ///< non-zero to send a stop bit after the operation, zero to follow it with a repeated start
+  size_t n;              ///< the number of bytes to read or write
+} i2c_async_op_t;
+
+/** The result of an operation of a batch submitted to an asynchronous I2C
+ *  master (see get_batch_results()).
+ */
+typedef struct i2c_async_result_t {
+  i2c_res_t ack;    ///< ``I2C_ACK`` if the operation was acknowledged by the slave device, otherwise ``I2C_NACK``
+  size_t num_bytes; ///< the number of bytes sent (for a write) or received (for a read)
+} i2c_async_result_t;
+
+/** The pins of one of the buses of i2c_master_multi_bus(), each given as
+ *  the index of a port in the array of ports passed to the component and
+ *  the bit of that port.
+ */
+typedef struct i2c_bus_pins_t {
+  uint8_t scl_port; ///< the index of the port of the SCL line
+  uint8_t scl_bit;  ///< the bit of the SCL line in its port
+  uint8_t sda_port; ///< the index of the port of the SDA line
+  uint8_t sda_bit;  ///< the bit of the SDA line in its port
+} i2c_bus_pins_t;
+
+#ifndef I2C_MASTER_STATS
+/** Set this to non-zero in the application build flags for the I2C masters to
+ *  count the transactions on the bus (see get_stats()). When it is zero the
+ *  counting is compiled out.
+ */
+#define I2C_MASTER_STATS 0
+#endif
+
+/** The bus statistics counted by an I2C master if ``I2C_MASTER_STATS`` is
+ *  non-zero (see get_stats()). A transaction runs from a start or repeated
+ *  start bit up to the next stop or repeated start bit. Times are in 10ns
+ *  timer ticks.
+ */
+typedef struct i2c_master_stats_t {
+  uint32_t transactions;          ///< the number of transactions
+  uint32_t nacks;                 ///< the number of transactions NACKed by the slave device
+  uint32_t bytes_read;            ///< the number of bytes read from slave devices
+  uint32_t bytes_written;         ///< the number of bytes written to slave devices, excluding device addresses
+  uint64_t stretch_ticks;         ///< the time that slave devices held SCL low after the master released it
+  uint64_t busy_ticks;            ///< the time spent performing transactions
+  uint32_t max_transaction_ticks; ///< the duration of the longest transaction
+} i2c_master_stats_t;
+
 #if(defined __XC__ || defined __DOXYGEN__)
 
 #define BIT_TIME(KBITS_PER_SEC) ((XS1_TIMER_MHZ * 1000) / KBITS_PER_SEC)
 #define BIT_MASK(BIT_POS) (1 << BIT_POS)
 
+#ifndef I2C_REGS_MAX_BURST
+/** The maximum number of registers written in one transaction by
+ *  write_regs() and write_regs_addr16(). Longer writes are split into
+ *  several transactions. This sets the size of the buffer the functions
+ *  use on the stack.
+ */
+#define I2C_REGS_MAX_BURST 32
+#endif
+
+#ifndef I2C_ASYNC_MAX_BATCH
+/** The maximum number of operations in a batch submitted to an asynchronous
+ *  I2C master by submit_batch(). Larger batches will cause a run-time
+ *  exception.
+ */
+#define I2C_ASYNC_MAX_BATCH 8
+#endif
+
+#ifndef I2C_ASYNC_AGING_OPS
+/** The number of operations that i2c_master_async() performs for other
+ *  clients after which the priority of a client is raised by one, until the
+ *  client is next served. This bounds the number of operations for which a
+ *  waiting client can be passed over by clients of a higher priority.
+ */
+#define I2C_ASYNC_AGING_OPS 4
+#endif
+
 /** This interface is used to communication with an I2C master component.
  *  It provides facilities for reading and writing to the bus.
  *
@@ -88,6 +198,60 @@ typedef interface i2c_master_if {
   i2c_res_t read(uint8_t device_addr, uint8_t buf[n], size_t n,
                int send_stop_bit);
 
+  /** Write data to a slave device and then read data from it.
+   *
+   *  The write and the read are made by the I2C task as one operation, with
+   *  a repeated start between them, so the bus is not left idle while the
+   *  client makes a second call. The read is only made if the slave device
+   *  ACKs every byte written; otherwise a stop bit is sent after the write.
+   *  A stop bit is always sent after the read.
+   *
+   *  \param device_addr     the address of the slave device
+   *  \param write_buf       the buffer containing data to write
+   *  \param write_n         the number of bytes to write
+   *  \param read_buf        the buffer to fill with the data read
+   *  \param read_n          the number of bytes to read
+   *  \param num_bytes_sent  the function will set this value to the
+   *                         number of bytes written, as for write()
+   *
+   *  \returns               ``I2C_ACK`` if the slave device ACKed every byte
+   *                         written and the read, otherwise ``I2C_NACK``.
+   */
+  [[guarded]]
+  i2c_res_t transfer(uint8_t device_addr,
+                     uint8_t write_buf[write_n], size_t write_n,
+                     uint8_t read_buf[read_n], size_t read_n,
+                     REFERENCE_PARAM(size_t, num_bytes_sent));
+
+  /** Write a table of registers.
+   *
+   *  The whole table is written by the I2C task, so the entries do not each
+   *  need a call to the task. Entries for consecutive registers of the same
+   *  device and widths are merged into a single transaction of up to
+   *  ``I2C_REGS_MAX_BURST`` bytes of data, relying on the slave device
+   *  incrementing the register address after each register, unless the
+   *  ``I2C_REG_NO_BURST`` flag is set. A transaction always ends at an entry
+   *  with a delay, and the delay is made after the stop bit.
+   *
+   *  The table is written until a byte is NACKed. A stop bit is sent
+   *  after each transaction.
+   *
+   *  \param table           the register writes.
+   *  \param n               the number of entries in the table.
+   *  \param failed_entry    the function will set this value to the index
+   *                         of the first entry which was not written. On
+   *                         success, this will be equal to ``n``.
+   *
+   *  \returns               ``I2C_REGOP_DEVICE_NACK`` if the device address
+   *                         of the failed entry was NACKed,
+   *                         ``I2C_REGOP_INCOMPLETE`` if its register or data
+   *                         was NACKed and ``I2C_REGOP_SUCCESS`` if every
+   *                         entry was written.
+   */
+  [[guarded]]
+  i2c_regop_res_t write_reg_table(const i2c_reg_write_t table[n], size_t n,
+                                  REFERENCE_PARAM(size_t, failed_entry));
+
   /** Send a stop bit.
    *
    *  This function will cause a stop bit to be sent on the bus. It should
@@ -96,6 +260,18 @@ typedef interface i2c_master_if {
    */
   void send_stop_bit(void);
 
+  /** Get the bus statistics.
+   *
+   *  The statistics are only counted if the component is built with
+   *  ``I2C_MASTER_STATS`` set to non-zero, otherwise they are all zero.
+   *
+   *  \param stats  the function will set this to the statistics counted
+   *                since the component started or was last reset
+   *  \param reset  if this is non-zero the statistics are reset to zero
+   *                after they are read
+   */
+  void get_stats(REFERENCE_PARAM(i2c_master_stats_t, stats), int reset);
+
   /** Shutdown the I2C component.
    *
    *  This function will cause the I2C task to shutdown and return.
@@ -108,15 +284,6 @@ typedef interface i2c_master_if {
 } i2c_master_if;
 #endif
 
-/** This type is used by the supplementary I2C register read/write functions to
- *  report back on whether the operation was a success or not.
- */
-typedef enum {
-  I2C_REGOP_SUCCESS,     ///< the operation was successful
-  I2C_REGOP_DEVICE_NACK, ///< the operation was NACKed when sending the device address, so either the device is missing or busy
-  I2C_REGOP_INCOMPLETE   ///< the operation was NACKed halfway through by the slave
-} i2c_regop_res_t;
-
 #ifndef __DOXYGEN__
 extends client interface i2c_master_if : {
 #endif
@@ -129,7 +296,8 @@ extends client interface i2c_master_if : {
    *  This function reads an 8-bit addressed, 8-bit register from the i2c
    *  bus. The function reads data by
    *  transmitting the register addr and then reading the data from the slave
-   *  device.
+   *  device, in a single call to transfer(). The other register read
+   *  functions below also use transfer().
    *
    *  Note that no stop bit is transmitted between the write and the read.
    *  The operation is performed as one transaction using a repeated start.
@@ -151,13 +319,7 @@ extends client interface i2c_master_if : {
     uint8_t data[1] = {0};
     size_t n;
     i2c_res_t res;
-    res = i.write(device_addr, a_reg, 1, n, 0);
-    if (n != 1) {
-      result = I2C_REGOP_DEVICE_NACK;
-      i.send_stop_bit();
-      return 0;
-    }
-    res = i.read(device_addr, data, 1, 1);
+    res = i.transfer(device_addr, a_reg, 1, data, 1, n);
     if (res == I2C_ACK) {
       result = I2C_REGOP_SUCCESS;
     } else {
@@ -219,16 +381,10 @@ extends client interface i2c_master_if : {
                                   REFERENCE_PARAM(i2c_regop_res_t, result))
   {
     uint8_t a_reg[2] = {reg >> 8, reg};
-    uint8_t data[1];
+    uint8_t data[1] = {0};
     size_t n;
     i2c_res_t res;
-    i.write(device_addr, a_reg, 2, n, 0);
-    if (n != 2) {
-      result = I2C_REGOP_DEVICE_NACK;
-      i.send_stop_bit();
-      return 0;
-    }
-    res = i.read(device_addr, data, 1, 1);
+    res = i.transfer(device_addr, a_reg, 2, data, 1, n);
     if (res == I2C_NACK) {
       result = I2C_REGOP_DEVICE_NACK;
     } else {
@@ -291,16 +447,10 @@ extends client interface i2c_master_if : {
                              REFERENCE_PARAM(i2c_regop_res_t, result))
   {
     uint8_t a_reg[2] = {reg >> 8, reg};
-    uint8_t data[2];
+    uint8_t data[2] = {0, 0};
     size_t n;
     i2c_res_t res;
-    i.write(device_addr, a_reg, 2, n, 0);
-    if (n != 2) {
-      result = I2C_REGOP_DEVICE_NACK;
-      i.send_stop_bit();
-      return 0;
-    }
-    res = i.read(device_addr, data, 2, 1);
+    res = i.transfer(device_addr, a_reg, 2, data, 2, n);
     if (res == I2C_NACK) {
       result = I2C_REGOP_DEVICE_NACK;
     } else {
@@ -367,16 +517,10 @@ extends client interface i2c_master_if : {
                                    REFERENCE_PARAM(i2c_regop_res_t, result))
   {
     uint8_t a_reg[1] = {reg};
-    uint8_t data[2];
+    uint8_t data[2] = {0, 0};
     size_t n;
     i2c_res_t res;
-    i.write(device_addr, a_reg, 1, n, 0);
-    if (n != 1) {
-      result = I2C_REGOP_DEVICE_NACK;
-      i.send_stop_bit();
-      return 0;
-    }
-    res = i.read(device_addr, data, 2, 1);
+    res = i.transfer(device_addr, a_reg, 1, data, 2, n);
     if (res == I2C_NACK) {
       result = I2C_REGOP_DEVICE_NACK;
     } else {
@@ -416,12 +560,338 @@ extends client interface i2c_master_if : {
     return I2C_REGOP_SUCCESS;
   }
 
+  /** Read consecutive 8-bit registers on a slave device.
+   *
+   *  This function reads ``n`` 8-bit registers from an 8-bit register
+   *  address in a single transaction, relying on the slave device
+   *  incrementing the register address after each byte. The function reads
+   *  data by transmitting the register addr and then reading the data from
+   *  the slave device.
+   *
+   *  Note that no stop bit is transmitted between the write and the read.
+   *  The operation is performed as one transaction using a repeated start.
+   *
+   *  \param i           the interface to the I2C master
+   *  \param device_addr the address of the slave device to read from
+   *  \param reg         the address of the first register to read
+   *  \param data        the buffer to fill with the register values
+   *  \param n           the number of registers to read
+   *
+   *  \returns           ``I2C_REGOP_DEVICE_NACK`` if the slave NACKed, and
+   *                     ``I2C_REGOP_SUCCESS`` on successful completion of the
+   *                     read.
+   */
+  inline i2c_regop_res_t read_regs(CLIENT_INTERFACE(i2c_master_if, i),
+                                   uint8_t device_addr, uint8_t reg,
+                                   uint8_t data[n], size_t n)
+  {
+    uint8_t a_reg[1] = {reg};
+    size_t num_bytes_sent;
+    if (i.transfer(device_addr, a_reg, 1, data, n, num_bytes_sent) == I2C_NACK) {
+      return I2C_REGOP_DEVICE_NACK;
+    }
+    return I2C_REGOP_SUCCESS;
+  }
+
+  /** Write consecutive 8-bit registers on a slave device.
+   *
+   *  This function writes ``n`` 8-bit registers from an 8-bit register
+   *  address, relying on the slave device incrementing the register address
+   *  after each byte. The registers are written in transactions of up to
+   *  ``I2C_REGS_MAX_BURST`` registers, each of which transmits the register
+   *  addr and then the data to the slave device.
+   *
+   *  \param i                the interface to the I2C master
+   *  \param device_addr      the address of the slave device to write to
+   *  \param reg              the address of the first register to write
+   *  \param data             the 8-bit values to write
+   *  \param n                the number of registers to write
+   *  \param num_regs_written the function will set this value to the number
+   *                          of registers ACKed by the slave. On success, this
+   *                          will be equal to ``n`` but it will be less if the
+   *                          slave sends an early NACK.
+   *
+   *  \returns                ``I2C_REGOP_DEVICE_NACK`` if the address is NACKed,
+   *                          ``I2C_REGOP_INCOMPLETE`` if not all data was ACKed and
+   *                          ``I2C_REGOP_SUCCESS`` on successful completion of the
+   *                          write with every byte being ACKed.
+   */
+  inline i2c_regop_res_t write_regs(CLIENT_INTERFACE(i2c_master_if, i),
+                                    uint8_t device_addr, uint8_t reg,
+                                    uint8_t data[n], size_t n,
+                                    REFERENCE_PARAM(size_t, num_regs_written))
+  {
+    uint8_t a_data[I2C_REGS_MAX_BURST + 1];
+    num_regs_written = 0;
+    while (num_regs_written < n) {
+      size_t len = n - num_regs_written;
+      size_t num_bytes_sent;
+      if (len > I2C_REGS_MAX_BURST) {
+        len = I2C_REGS_MAX_BURST;
+      }
+      a_data[0] = reg + num_regs_written;
+      for (size_t j = 0; j < len; j++) {
+        a_data[j + 1] = data[num_regs_written + j];
+      }
+      i2c_res_t result = i.write(device_addr, a_data, len + 1, num_bytes_sent, 1);
+      if (num_bytes_sent == 0) {
+        return num_regs_written ? I2C_REGOP_INCOMPLETE : I2C_REGOP_DEVICE_NACK;
+      }
+      if (result == I2C_NACK) {
+        // The last byte sent was NACKed, and is counted in num_bytes_sent
+        // along with the register address
+        if (num_bytes_sent > 1) {
+          num_regs_written += num_bytes_sent - 2;
+        }
+        return I2C_REGOP_INCOMPLETE;
+      }
+      num_regs_written += len;
+    }
+    return I2C_REGOP_SUCCESS;
+  }
+
+  /** Read consecutive 8-bit registers on a slave device from a 16-bit
+   *  register address.
+   *
+   *  This function reads ``n`` 8-bit registers from a 16-bit register
+   *  address in a single transaction, relying on the slave device
+   *  incrementing the register address after each byte. The function reads
+   *  data by transmitting the register addr and then reading the data from
+   *  the slave device.
+   *
+   *  Note that no stop bit is transmitted between the write and the read.
+   *  The operation is performed as one transaction using a repeated start.
+   *
+   *  \param i           the interface to the I2C master
+   *  \param device_addr the address of the slave device to read from
+   *  \param reg         the 16-bit address of the first register to read
+   *                     (most significant byte first)
+   *  \param data        the buffer to fill with the register values
+   *  \param n           the number of registers to read
+   *
+   *  \returns           ``I2C_REGOP_DEVICE_NACK`` if the slave NACKed, and
+   *                     ``I2C_REGOP_SUCCESS`` on successful completion of the
+   *                     read.
+   */
+  inline i2c_regop_res_t read_regs_addr16(CLIENT_INTERFACE(i2c_master_if, i),
+                                          uint8_t device_addr, uint16_t reg,
+                                          uint8_t data[n], size_t n)
+  {
+    uint8_t a_reg[2] = {reg >> 8, reg};
+    size_t num_bytes_sent;
+    if (i.transfer(device_addr, a_reg, 2, data, n, num_bytes_sent) == I2C_NACK) {
+      return I2C_REGOP_DEVICE_NACK;
+    }
+    return I2C_REGOP_SUCCESS;
+  }
+
+  /** Write consecutive 8-bit registers on a slave device from a 16-bit
+   *  register address.
+   *
+   *  This function writes ``n`` 8-bit registers from a 16-bit register
+   *  address, relying on the slave device incrementing the register address
+   *  after each byte. The registers are written in transactions of up to
+   *  ``I2C_REGS_MAX_BURST`` registers, each of which transmits the register
+   *  addr and then the data to the slave device.
+   *
+   *  \param i                the interface to the I2C master
+   *  \param device_addr      the address of the slave device to write to
+   *  \param reg              the 16-bit address of the first register to
+   *                          write (most significant byte first)
+   *  \param data             the 8-bit values to write
+   *  \param n                the number of registers to write
+   *  \param num_regs_written the function will set this value to the number
+   *                          of registers ACKed by the slave. On success, this
+   *                          will be equal to ``n`` but it will be less if the
+   *                          slave sends an early NACK.
+   *
+   *  \returns                ``I2C_REGOP_DEVICE_NACK`` if the address is NACKed,
+   *                          ``I2C_REGOP_INCOMPLETE`` if not all data was ACKed and
+   *                          ``I2C_REGOP_SUCCESS`` on successful completion of the
+   *                          write with every byte being ACKed.
+   */
+  inline i2c_regop_res_t write_regs_addr16(CLIENT_INTERFACE(i2c_master_if, i),
+                                           uint8_t device_addr, uint16_t reg,
+                                           uint8_t data[n], size_t n,
+                                           REFERENCE_PARAM(size_t, num_regs_written))
+  {
+    uint8_t a_data[I2C_REGS_MAX_BURST + 2];
+    num_regs_written = 0;
+    while (num_regs_written < n) {
+      size_t len = n - num_regs_written;
+      size_t num_bytes_sent;
+      uint16_t burst_reg = reg + num_regs_written;
+      if (len > I2C_REGS_MAX_BURST) {
+        len = I2C_REGS_MAX_BURST;
+      }
+      a_data[0] = burst_reg >> 8;
+      a_data[1] = burst_reg;
+      for (size_t j = 0; j < len; j++) {
+        a_data[j + 2] = data[num_regs_written + j];
+      }
+      i2c_res_t result = i.write(device_addr, a_data, len + 2, num_bytes_sent, 1);
+      if (num_bytes_sent == 0) {
+        return num_regs_written ? I2C_REGOP_INCOMPLETE : I2C_REGOP_DEVICE_NACK;
+      }
+      if (result == I2C_NACK) {
+        // The last byte sent was NACKed, and is counted in num_bytes_sent
+        // along with the register address
+        if (num_bytes_sent > 2) {
+          num_regs_written += num_bytes_sent - 3;
+        }
+        return I2C_REGOP_INCOMPLETE;
+      }
+      num_regs_written += len;
+    }
+    return I2C_REGOP_SUCCESS;
+  }
+
 /**@}*/ // END: addtogroup i2c_master_if
 
 #ifndef __DOXYGEN__
 }
 #endif
 
+#ifndef I2C_REGCACHE_SIZE
+/** The number of registers held by an ``i2c_regcache_t``. When a register
+ *  is added to a full cache the least recently used register is evicted.
+ */
+#define I2C_REGCACHE_SIZE 16
+#endif
+
+/** A cache of the 8-bit registers of a slave device with 8-bit register
+ *  addresses, used with the i2c_regcache functions. Reads of cacheable
+ *  registers are served from the cache once the register has been read or
+ *  written, and writes are held in the cache until they are flushed.
+ *
+ *  The fields are private to the i2c_regcache functions.
+ */
+typedef struct i2c_regcache_t {
+  uint8_t device_addr;                      ///< the address of the slave device
+  uint8_t volatile_regs[32];                ///< a bit for each register which is volatile
+  uint8_t regs[I2C_REGCACHE_SIZE];          ///< the address of the register of each entry
+  uint8_t values[I2C_REGCACHE_SIZE];        ///< the value of the register of each entry
+  uint8_t flags[I2C_REGCACHE_SIZE];         ///< whether each entry is in use and dirty
+  unsigned last_used[I2C_REGCACHE_SIZE];    ///< when each entry was last used
+  unsigned use_count;                       ///< the count of uses of the cache
+} i2c_regcache_t;
+
+/** Initialize a register cache for a slave device.
+ *
+ *  The cache starts empty with every register cacheable.
+ *
+ *  \param cache        the cache to initialize
+ *  \param device_addr  the address of the slave device
+ */
+void i2c_regcache_init(REFERENCE_PARAM(i2c_regcache_t, cache),
+                       uint8_t device_addr);
+
+/** Mark registers of the device as volatile or cacheable.
+ *
+ *  Registers that the device changes itself, such as status registers and
+ *  FIFOs, should be volatile: they are read and written on the bus every
+ *  time and never held in the cache. Marking a register volatile drops it
+ *  from the cache, discarding any write to it that has not been flushed.
+ *
+ *  \param cache        the cache of the device
+ *  \param first_reg    the address of the first register
+ *  \param n            the number of registers
+ *  \param is_volatile  non-zero to mark the registers volatile, zero to mark
+ *                      them cacheable
+ */
+void i2c_regcache_set_volatile(REFERENCE_PARAM(i2c_regcache_t, cache),
+                               uint8_t first_reg, size_t n, int is_volatile);
+
+/** Read a register through a register cache.
+ *
+ *  A cacheable register is read from the cache if it is there, otherwise it
+ *  is read from the device with read_reg() and added to the cache. A
+ *  volatile register is always read from the device.
+ *
+ *  \param i       the interface to the I2C master
+ *  \param cache   the cache of the device
+ *  \param reg     the address of the register to read
+ *  \param result  set as by read_reg(), or to the result of the flush if
+ *                 adding the register to the cache needed a flush which
+ *                 failed
+ *
+ *  \returns       the value of the register
+ */
+uint8_t i2c_regcache_read(CLIENT_INTERFACE(i2c_master_if, i),
+                          REFERENCE_PARAM(i2c_regcache_t, cache),
+                          uint8_t reg,
+                          REFERENCE_PARAM(i2c_regop_res_t, result));
+
+/** Write a register through a register cache.
+ *
+ *  A write to a cacheable register is held in the cache until the cache is
+ *  flushed, so that successive writes to a register cost one write on the
+ *  bus and writes to consecutive registers are combined. A volatile
+ *  register is written to the device with write_reg(), after the cache has
+ *  been flushed so that the writes reach the device in order.
+ *
+ *  \param i      the interface to the I2C master
+ *  \param cache  the cache of the device
+ *  \param reg    the address of the register to write
+ *  \param data   the 8-bit value to write
+ *
+ *  \returns      ``I2C_REGOP_SUCCESS`` if the write was held in the cache
+ *                or written to the device, otherwise the result of the write
+ *                or flush which failed
+ */
+i2c_regop_res_t i2c_regcache_write(CLIENT_INTERFACE(i2c_master_if, i),
+                                   REFERENCE_PARAM(i2c_regcache_t, cache),
+                                   uint8_t reg, uint8_t data);
+
+/** Update bits of a register through a register cache.
+ *
+ *  The bits of the register set in ``mask`` are set to those of ``data``.
+ *  This is a read of the register by i2c_regcache_read() followed by a
+ *  write by i2c_regcache_write(), so for a cacheable register that is in
+ *  the cache it does not use the bus.
+ *
+ *  \param i      the interface to the I2C master
+ *  \param cache  the cache of the device
+ *  \param reg    the address of the register to update
+ *  \param mask   the bits of the register to update
+ *  \param data   the new values of the bits
+ *
+ *  \returns      ``I2C_REGOP_SUCCESS`` on success, otherwise the result of
+ *                the read or write which failed
+ */
+i2c_regop_res_t i2c_regcache_update_bits(CLIENT_INTERFACE(i2c_master_if, i),
+                                         REFERENCE_PARAM(i2c_regcache_t, cache),
+                                         uint8_t reg, uint8_t mask,
+                                         uint8_t data);
+
+/** Write the registers held in a register cache to the device.
+ *
+ *  The registers written since they were last flushed are written with
+ *  write_regs(), combining registers with consecutive addresses into one
+ *  transaction. The registers stay in the cache. If a write fails the
+ *  registers that were not written stay dirty and are written by the next
+ *  flush.
+ *
+ *  \param i      the interface to the I2C master
+ *  \param cache  the cache of the device
+ *
+ *  \returns      ``I2C_REGOP_SUCCESS`` if every register was written,
+ *                otherwise the result of the first write which failed
+ */
+i2c_regop_res_t i2c_regcache_flush(CLIENT_INTERFACE(i2c_master_if, i),
+                                   REFERENCE_PARAM(i2c_regcache_t, cache));
+
+/** Empty a register cache.
+ *
+ *  This should be called when the registers of the device may have changed
+ *  without going through the cache, such as after the device has been
+ *  reset. Writes which have not been flushed are discarded, so
+ *  i2c_regcache_flush() should be called first to keep them.
+ *
+ *  \param cache  the cache of the device
+ */
+void i2c_regcache_invalidate(REFERENCE_PARAM(i2c_regcache_t, cache));
+
 /** Implements I2C on the i2c_master_if interface using two ports.
  *
  *  \param  i                an array of server interface connections for clients
@@ -512,9 +982,29 @@ typedef interface i2c_master_async_if {
   [[guarded]]
   void async_master_read(uint8_t device_addr, size_t n, int send_stop_bit);
 
+  /** Initialize a write followed by a read from the same device.
+   *
+   *  The read follows the write with a repeated start as soon as the write
+   *  has completed, without waiting for the client in between, and a stop
+   *  bit is sent after it. If a byte of the write is NACKed the read is not
+   *  made and a stop bit is sent after the write. The result is returned by
+   *  get_read_data(), which returns ``I2C_NACK`` if either the write or the
+   *  read was NACKed.
+   *
+   *  \param device_addr     the address of the slave device.
+   *  \param buf             the buffer containing data to write.
+   *  \param n               the number of bytes to write.
+   *  \param read_n          the number of bytes to read. ``n + read_n``
+   *                         must not be more than the maximum transaction
+   *                         size of the component.
+   */
+  [[guarded]]
+  void async_master_transfer(uint8_t device_addr, uint8_t buf[n], size_t n,
+                             size_t read_n);
+
   /** Completed operation notification.
    *
-   *  This notification will fire when a read or write is completed.
+   *  This notification will fire when a read, write or batch is completed.
    */
   [[notification]]
   slave_void operation_complete(void);
@@ -551,6 +1041,100 @@ typedef interface i2c_master_async_if {
   [[clears_notification]]
   i2c_res_t get_read_data(uint8_t buf[n], size_t n);
 
+  /** Initialize a batch of reads and writes.
+   *
+   *  The operations are performed back to back without waiting for the
+   *  client in between, and operation_complete() fires once when they have
+   *  all completed. Each operation starts with a repeated start if the
+   *  previous one did not send a stop bit. All of the operations are
+   *  performed even if one of them is NACKed; the result of each is
+   *  returned by get_batch_results().
+   *
+   *  The data of the operations is held in a single buffer, one operation
+   *  after another in the order of the operations: the data to send for each
+   *  write and space for the data received by each read.
+   *
+   *  \param ops   the operations to perform, at most ``I2C_ASYNC_MAX_BATCH``
+   *  \param m     the number of operations
+   *  \param buf   the buffer containing the data of the operations
+   *  \param n     the size of the data in bytes, which must be the sum of
+   *               the sizes of the operations
+   */
+  [[guarded]]
+  void submit_batch(i2c_async_op_t ops[m], size_t m, uint8_t buf[n], size_t n);
+
+  /** Get batch results.
+   *
+   *  This function should be called after a batch has completed.
+   *
+   *  \param results  the array to fill with the result of each operation
+   *  \param m        the number of operations, this should be the same as
+   *                  in submit_batch()
+   *  \param buf      the buffer to fill with the data of the operations,
+   *                  with the data received by each read at the same offset
+   *                  as in the buffer passed to submit_batch()
+   *  \param n        the size of the data in bytes, this should be the same
+   *                  as in submit_batch()
+   */
+  [[clears_notification]]
+  void get_batch_results(i2c_async_result_t results[m], size_t m,
+                         uint8_t buf[n], size_t n);
+
+  /** Initialize a write to an I2C bus from a buffer owned by the client.
+   *
+   *  The ownership of the buffer is moved to the component for the duration
+   *  of the write and returned by get_movable_result(), so the data is not
+   *  copied and the write is not limited by ``max_transaction_size``.
+   *
+   *  \param device_addr     the address of the slave device to write to
+   *  \param buf             the movable pointer to the data to write, which
+   *                         is null until the buffer is returned
+   *  \param n               the number of bytes to write
+   *  \param send_stop_bit   if this is non-zero then a stop bit
+   *                         will be sent on the bus after the transaction.
+   *                         If it is zero then no other task can use the
+   *                         component until a stop bit has been sent.
+   */
+  [[guarded]]
+  void write_movable(uint8_t device_addr, uint8_t * movable &buf, size_t n,
+                     int send_stop_bit);
+
+  /** Initialize a read from an I2C bus into a buffer owned by the client.
+   *
+   *  The ownership of the buffer is moved to the component for the duration
+   *  of the read and returned by get_movable_result(), so the data is not
+   *  copied and the read is not limited by ``max_transaction_size``.
+   *
+   *  \param device_addr     the address of the slave device to read from
+   *  \param buf             the movable pointer to the buffer to fill, which
+   *                         is null until the buffer is returned
+   *  \param n               the number of bytes to read
+   *  \param send_stop_bit   if this is non-zero then a stop bit
+   *                         will be sent on the bus after the transaction.
+   *                         If it is zero then no other task can use the
+   *                         component until a stop bit has been sent.
+   */
+  [[guarded]]
+  void read_movable(uint8_t device_addr, uint8_t * movable &buf, size_t n,
+                    int send_stop_bit);
+
+  /** Get the result of a write_movable() or read_movable().
+   *
+   *  This function should be called after the operation has completed. It
+   *  returns the ownership of the buffer to the client.
+   *
+   *  \param buf        set to the movable pointer to the buffer passed to
+   *                    write_movable() or read_movable()
+   *  \param num_bytes  the function will set this value to the number of
+   *                    bytes actually sent or received
+   *
+   *  \returns          ``I2C_ACK`` if the operation was acknowledged by the
+   *                    slave device, otherwise ``I2C_NACK``.
+   */
+  [[clears_notification]]
+  i2c_res_t get_movable_result(uint8_t * movable &buf,
+                               REFERENCE_PARAM(size_t, num_bytes));
+
   /** Send a stop bit.
    *
    *  This function will cause a stop bit to be sent on the bus. It should
@@ -559,6 +1143,33 @@ typedef interface i2c_master_async_if {
    */
   void async_master_send_stop_bit(void);
 
+  /** Get the bus statistics.
+   *
+   *  The statistics are only counted if the component is built with
+   *  ``I2C_MASTER_STATS`` set to non-zero, otherwise they are all zero.
+   *
+   *  \param stats  the function will set this to the statistics counted
+   *                since the component started or was last reset
+   *  \param reset  if this is non-zero the statistics are reset to zero
+   *                after they are read
+   */
+  void get_stats(REFERENCE_PARAM(i2c_master_stats_t, stats), int reset);
+
+
+  /** Set the priority of the client.
+   *
+   *  When several clients are waiting to start an operation, i2c_master_async()
+   *  serves the client with the highest priority first, and clients of the
+   *  same priority in turn. The priority of a client is raised by one for
+   *  every ``I2C_ASYNC_AGING_OPS`` operations performed for other clients
+   *  since it was last served, so that no client waits indefinitely. All clients start with
+   *  priority 0. i2c_master_async_comb() serves the clients in the order of
+   *  their requests and ignores the priority.
+   *
+   *  \param priority  the priority of the client, higher values are served
+   *                   first
+   */
+  void set_priority(unsigned priority);
 
   /** Shutdown the I2C component.
    *
@@ -575,7 +1186,10 @@ typedef interface i2c_master_async_if {
 /** I2C master component (asynchronous API).
  *
  *  This function implements I2C and allows clients to asynchronously
- *  perform operations on the bus.
+ *  perform operations on the bus. Clients waiting to start an operation are
+ *  served in order of their priority (see set_priority()). A client which
+ *  performs an operation without a stop bit holds the bus, so is the only
+ *  client served until it sends the stop bit.
  *
  *  \param  i                    the interfaces to connect the component to its clients
  *  \param  n                    the number of clients connected to the component
@@ -584,7 +1198,8 @@ typedef interface i2c_master_async_if {
  *  \param  kbits_per_second     the speed of the I2C bus
  *  \param  max_transaction_size the size of the local buffer in bytes. Any
  *                               transactions exceeding this size will cause a
- *                               run-time exception.
+ *                               run-time exception, except for those made
+ *                               with write_movable() and read_movable().
  *
  */
 void i2c_master_async(SERVER_INTERFACE(i2c_master_async_if, i[n]),
@@ -600,7 +1215,8 @@ void i2c_master_async(SERVER_INTERFACE(i2c_master_async_if, i[n]),
  *  Note that this component can be run on the same logical core as other
  *  tasks (i.e. it is [[combinable]]). However, care must be taken that the
  *  other tasks do not take too long in their select cases otherwise this
- *  component may miss I2C transactions.
+ *  component may miss I2C transactions. Speeds above 100 kbps are not
+ *  supported.
  *
  *  \param  i                    the interfaces to connect the component to its clients
  *  \param  n                    the number of clients connected to the component
@@ -609,7 +1225,8 @@ void i2c_master_async(SERVER_INTERFACE(i2c_master_async_if, i[n]),
  *  \param  kbits_per_second     the speed of the I2C bus
  *  \param  max_transaction_size the size of the local buffer in bytes. Any
  *                               transactions exceeding this size will cause a
- *                               run-time exception.
+ *                               run-time exception, except for those made
+ *                               with write_movable() and read_movable().
  */
 [[combinable]]
 void i2c_master_async_comb(SERVER_INTERFACE(i2c_master_async_if, i[n]),
@@ -618,6 +1235,45 @@ void i2c_master_async_comb(SERVER_INTERFACE(i2c_master_async_if, i[n]),
                            static_const_unsigned kbits_per_second,
                            static_const_size_t max_transaction_size);
 
+/** I2C master component for several buses (asynchronous API, combinable).
+ *
+ *  This function implements I2C on several independent buses, each served
+ *  to one client through the asynchronous API. The SCL and SDA lines of the
+ *  buses can be on separate 1-bit ports or on the bits of shared multi-bit
+ *  ports, which are driven low by the component and must be pulled up
+ *  externally. Transactions on different buses run at the same time: the
+ *  bits of all of the buses are clocked together, with the buses that are
+ *  not performing an operation left idle, and a slave stretching the clock
+ *  only delays its own bus.
+ *
+ *  Speeds of 100 to 400 kbps are supported. The component does the work of
+ *  every busy bus several times per bit, so the number of buses it can
+ *  serve at the higher speeds is limited by the speed of the core it runs
+ *  on and by the other tasks combined with it. Operations without a stop
+ *  bit hold their bus until send_stop_bit() is called; set_priority() has
+ *  no effect as each bus has a single client.
+ *
+ *  \param  i                    the interfaces to connect the component to
+ *                               its clients, one for each bus
+ *  \param  num_buses            the number of buses
+ *  \param  p                    the ports of the SCL and SDA lines
+ *  \param  num_ports            the number of ports
+ *  \param  pins                 the SCL and SDA pins of each bus
+ *  \param  kbits_per_second     the speed of the I2C buses
+ *  \param  max_transaction_size the size of the local buffer of each bus in
+ *                               bytes. Any transactions exceeding this size
+ *                               will cause a run-time exception, except for
+ *                               those made with write_movable() and
+ *                               read_movable().
+ */
+[[combinable]]
+void i2c_master_multi_bus(SERVER_INTERFACE(i2c_master_async_if, i[num_buses]),
+                          static_const_size_t num_buses,
+                          port_t p[num_ports], static_const_size_t num_ports,
+                          const i2c_bus_pins_t pins[num_buses],
+                          static_const_unsigned kbits_per_second,
+                          static_const_size_t max_transaction_size);
+
 
 
 typedef enum i2c_slave_ack_t {
@@ -727,6 +1383,191 @@ void i2c_slave(CLIENT_INTERFACE(i2c_slave_callback_if, i),
                port_t p_scl, port_t p_sda,
                uint8_t device_addr);
 
+/** This interface is used to communicate with an I2C slave component which
+ *  responds to several device addresses. It is the same as
+ *  i2c_slave_callback_if, except that each callback is passed the address
+ *  of the transaction. The I2C slave component acts a *client* to this
+ *  interface.
+ */
+#ifndef __DOXYGEN__
+typedef interface i2c_slave_multi_callback_if {
+#endif
+
+  /**
+   * \addtogroup i2c_slave_multi_callback_if
+   * @{
+   */
+
+  /** Master has requested a read.
+   *
+   *  \param device_addr  the address of the device the master is reading from
+   *
+   *  \returns  the callback must return either ``I2C_SLAVE_ACK`` or
+   *            ``I2C_SLAVE_NACK``.
+   */
+  [[guarded]]
+  i2c_slave_ack_t ack_read_request(uint8_t device_addr);
+
+  /** Master has requested a write.
+   *
+   *  \param device_addr  the address of the device the master is writing to
+   *
+   *  \returns  the callback must return either ``I2C_SLAVE_ACK`` or
+   *            ``I2C_SLAVE_NACK``.
+   */
+  [[guarded]]
+  i2c_slave_ack_t ack_write_request(uint8_t device_addr);
+
+  /** Master requires data.
+   *
+   *  \param device_addr  the address of the device the master is reading from
+   *
+   *  \return   the data to pass to the master.
+   */
+  [[guarded]]
+  uint8_t master_requires_data(uint8_t device_addr);
+
+  /** Master has sent some data.
+   *
+   *  \param device_addr  the address of the device the master is writing to
+   *  \param data         the byte sent by the master
+   */
+  [[guarded]]
+  i2c_slave_ack_t master_sent_data(uint8_t device_addr, uint8_t data);
+
+  /** Stop bit.
+   *
+   *  \param device_addr  the address of the last transaction to the slave
+   *                      before the stop bit
+   */
+  void stop_bit(uint8_t device_addr);
+
+  /** Shutdown the I2C component.
+   *
+   *  This function will cause the I2C slave task to shutdown and return.
+   */
+  [[notification]] slave_void shutdown();
+
+  /**@}*/ // END: addtogroup i2c_slave_multi_callback_if
+#ifndef __DOXYGEN__
+} i2c_slave_multi_callback_if;
+#endif
+
+/** I2C slave task responding to several device addresses.
+ *
+ *  This function instantiates an I2C slave component which emulates several
+ *  devices in one task. A transaction is for the slave if its address
+ *  matches one of the device addresses in the bits set in the mask, so a
+ *  mask of 0x7f matches the device addresses exactly and a mask of 0x78
+ *  matches the eight addresses from ``device_addrs[0] & 0x78``.
+ *  Transactions to other addresses are ignored without stretching the
+ *  clock.
+ *
+ *  \param i            the client end of the i2c_slave_multi_callback_if
+ *                      interface
+ *  \param p_scl        the SCL port of the I2C bus
+ *  \param p_sda        the SDA port of the I2C bus
+ *  \param device_addrs the addresses of the devices
+ *  \param n            the number of device addresses
+ *  \param addr_mask    the bits of the addresses which must match
+ */
+[[combinable]]
+void i2c_slave_multi(CLIENT_INTERFACE(i2c_slave_multi_callback_if, i),
+                     port_t p_scl, port_t p_sda,
+                     const uint8_t device_addrs[n], size_t n,
+                     uint8_t addr_mask);
+
+/** This interface is used to communicate with an I2C slave register file
+ *  component, which holds a set of registers that the bus master reads and
+ *  writes. The component acts as the *server* of this interface, so the
+ *  application can access the registers at any time and is notified when the
+ *  master has written to them.
+ */
+#ifndef __DOXYGEN__
+typedef interface i2c_slave_reg_file_if {
+#endif
+
+  /**
+   * \addtogroup i2c_slave_reg_file_if
+   * @{
+   */
+
+  /** Get the value of a register.
+   *
+   *  \param reg    the register to read
+   *
+   *  \returns      the value of the register
+   */
+  uint8_t get_reg(uint8_t reg);
+
+  /** Set the value of a register, such as a sensor reading for the master
+   *  to read.
+   *
+   *  \param reg    the register to write
+   *  \param value  the value to write to the register
+   */
+  void set_reg(uint8_t reg, uint8_t value);
+
+  /** Registers written notification.
+   *
+   *  This notification will fire when a write by the master to the registers
+   *  has completed with a stop or repeated start bit.
+   */
+  [[notification]] slave_void regs_written(void);
+
+  /** Get the registers written by the master.
+   *
+   *  This function clears the regs_written() notification. The registers
+   *  are those written since the last call, as a range which covers all of
+   *  them. If the writes were not to consecutive registers the range may also
+   *  cover registers which were not written.
+   *
+   *  \param first_reg  the function will set this to the first register of
+   *                    the range
+   *  \param num        the function will set this to the number of registers
+   *                    in the range, which is zero if none have been written
+   */
+  [[clears_notification]]
+  void get_written_regs(REFERENCE_PARAM(uint8_t, first_reg),
+                        REFERENCE_PARAM(size_t, num));
+
+  /** Shutdown the I2C component.
+   *
+   *  This function will cause the I2C slave task to shutdown and return.
+   */
+  void shutdown(void);
+
+  /**@}*/ // END: addtogroup i2c_slave_reg_file_if
+#ifndef __DOXYGEN__
+} i2c_slave_reg_file_if;
+#endif
+
+/** I2C slave register file task.
+ *
+ *  This function instantiates an I2C slave component which serves the reads
+ *  and writes of the bus master from a set of registers held by the task,
+ *  in the manner of an EEPROM or sensor. The first byte of each write by the
+ *  master selects the register, and the following bytes are written to that
+ *  register and the registers after it, so a write of just the register
+ *  followed by a read reads from that register. Each read continues from
+ *  the register after the last one read or written, wrapping around to zero
+ *  after the last register. The application is only involved
+ *  when it accesses the registers or the master writes to them, so the
+ *  component never stretches the clock.
+ *
+ *  \param i           the server end of the i2c_slave_reg_file_if interface
+ *  \param  p_scl      the SCL port of the I2C bus
+ *  \param  p_sda      the SDA port of the I2C bus
+ *  \param device_addr the address of the slave device
+ *  \param num_regs    the number of registers, up to 256
+ *
+ */
+[[combinable]]
+void i2c_slave_reg_file(SERVER_INTERFACE(i2c_slave_reg_file_if, i),
+                        port_t p_scl, port_t p_sda,
+                        uint8_t device_addr,
+                        static_const_size_t num_regs);
+
 #endif // __XC__
 
 #endif
@@ -1,6 +1,6 @@
 set(LIB_NAME lib_i2c)
 
-set(LIB_VERSION 6.4.1)
+set(LIB_VERSION 7.0.0)
 
 set(LIB_INCLUDES api)
 
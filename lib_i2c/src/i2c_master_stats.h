@@ -0,0 +1,40 @@
+// Copyright 2026 XMOS LIMITED.
+// This Software is subject to the terms of the XMOS Public Licence: Version 1.
+#ifndef _i2c_master_stats_h_
+#define _i2c_master_stats_h_
+
+#include <i2c.h>
+
+/* Helpers shared by the I2C masters to count the bus statistics (see
+   get_stats() in i2c.h) */
+
+#if I2C_MASTER_STATS
+/* The time that SCL is held low by slaves during a transaction is added up
+   by the functions that wait for SCL to go high, which take the total as an
+   extra parameter */
+#define I2C_STRETCH_PARAM , unsigned &stretch_ticks
+#define I2C_STRETCH_ARG   , stretch_ticks
+#else
+#define I2C_STRETCH_PARAM
+#define I2C_STRETCH_ARG
+#endif
+
+/** Start counting a transaction, setting stretch_ticks to zero.
+ *
+ *  \returns the start time of the transaction
+ */
+unsigned i2c_stats_start(unsigned &stretch_ticks);
+
+/** Add a transaction which started at start_time and ends now to the
+ *  statistics.
+ */
+void i2c_stats_add_transaction(i2c_master_stats_t &stats,
+                               unsigned start_time, unsigned stretch_ticks,
+                               int nacked, size_t bytes_read,
+                               size_t bytes_written);
+
+/** Set all of the statistics to zero.
+ */
+void i2c_stats_clear(i2c_master_stats_t &stats);
+
+#endif
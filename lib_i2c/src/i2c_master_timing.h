@@ -0,0 +1,27 @@
+// Copyright 2026 XMOS LIMITED.
+// This Software is subject to the terms of the XMOS Public Licence: Version 1.
+#ifndef _i2c_master_timing_h_
+#define _i2c_master_timing_h_
+
+#include <i2c.h>
+
+/* Bit timing shared by the I2C masters */
+
+/** Return the number of 10ns timer ticks to wait after the falling edge of SCL
+ *  before changing SDA. This is a quarter of a bit time, limited so that the
+ *  change is made within the data valid time (tVD;DAT) defined in the
+ *  standards at low speeds.
+ */
+static unsigned inline compute_data_change_ticks(static const unsigned kbits_per_second)
+{
+  const unsigned bit_time = BIT_TIME(kbits_per_second);
+
+  // 3.45us less a margin for waking up and driving the port
+  const unsigned max_data_change_ticks = 335;
+  if (bit_time / 4 < max_data_change_ticks) {
+    return bit_time / 4;
+  }
+  return max_data_change_ticks;
+}
+
+#endif
@@ -0,0 +1,32 @@
+// Copyright 2026 XMOS LIMITED.
+// This Software is subject to the terms of the XMOS Public Licence: Version 1.
+#ifndef _i2c_reg_table_h_
+#define _i2c_reg_table_h_
+
+#include <i2c.h>
+
+/* Helpers shared by the I2C masters to write a register table (see
+   write_reg_table() in i2c.h) */
+
+/** The size of the buffer to hold a transaction of a register table: the
+ *  register address and up to I2C_REGS_MAX_BURST bytes of data.
+ */
+#define I2C_REG_TABLE_BUF_SIZE (I2C_REGS_MAX_BURST + 2)
+
+/** Fill buf with the register address and data of the transaction that
+ *  starts at entry first of a register table, merging the following entries
+ *  for consecutive registers. len is set to the number of bytes in buf.
+ *
+ *  \returns the number of table entries in the transaction
+ */
+size_t i2c_reg_table_burst(const i2c_reg_write_t table[n], size_t n,
+                           size_t first,
+                           uint8_t buf[I2C_REG_TABLE_BUF_SIZE], size_t &len);
+
+/** Return the entry of the transaction starting at entry first that was
+ *  NACKed, given the number of bytes sent after the device address.
+ */
+size_t i2c_reg_table_nacked_entry(const i2c_reg_write_t table[n], size_t n,
+                                  size_t first, size_t num_bytes_sent);
+
+#endif
@@ -0,0 +1,323 @@
+// Copyright 2026 XMOS LIMITED.
+// This Software is subject to the terms of the XMOS Public Licence: Version 1.
+#ifndef _i2c_slave_core_h_
+#define _i2c_slave_core_h_
+
+#include <i2c.h>
+#include <xs1.h>
+#include <xclib.h>
+
+/* The bit-level state machine shared by the I2C slaves.
+
+   Each slave task selects on the edges of SCL and SDA with the guards below
+   and passes them to i2c_slave_scl_edge() and i2c_slave_sda_edge(). These
+   return an action when the slave has to decide something: whether the
+   address is its own, whether to ACK, the byte to send or whether to ACK a
+   byte received. The slave then completes the action with the functions
+   below, so only the address match and the source and sink of the data
+   differ between the slaves:
+
+     case s.state != WAITING_FOR_START_OR_STOP =>
+            p_scl when pinseq(s.scl_val) :> void:
+       ... i2c_slave_scl_edge(s, p_sda) ...
+
+     case s.state == WAITING_FOR_START_OR_STOP || s.stop_bit_check =>
+            p_sda when pinseq(s.sda_val) :> void:
+       ... i2c_slave_sda_edge(s, p_scl) ...
+
+   A slave which calls the application to complete an action stretches the
+   clock by driving SCL low first and passes stretching as 1 so that the
+   clock is released once SDA is set up. */
+
+enum i2c_slave_state {
+  WAITING_FOR_START_OR_STOP,
+  READING_ADDR,
+  ACK_ADDR,
+  ACK_WAIT_HIGH,
+  ACK_WAIT_LOW,
+  IGNORE_ACK,
+  MASTER_WRITE,
+  MASTER_READ
+};
+
+enum i2c_slave_action {
+  I2C_SLAVE_NO_ACTION,
+  // The 7-bit address is in data and rw is set; call i2c_slave_match_address()
+  I2C_SLAVE_ADDRESS,
+  // Call i2c_slave_ack_address() to ACK or NACK the address
+  I2C_SLAVE_ACK_ADDRESS,
+  // The master is reading a byte; call i2c_slave_send_byte()
+  I2C_SLAVE_SEND_BYTE,
+  // The master has written the byte in data; call i2c_slave_ack_byte()
+  I2C_SLAVE_BYTE_RECEIVED,
+  // Returned by i2c_slave_sda_edge() for a start or repeated start bit
+  I2C_SLAVE_START,
+  // Returned by i2c_slave_sda_edge() for a stop bit
+  I2C_SLAVE_STOP
+};
+
+typedef struct i2c_slave_core_t {
+  enum i2c_slave_state state;
+  enum i2c_slave_state next_state;
+  int sda_val;
+  int scl_val;
+  int bitnum;
+  int data;
+  int rw;
+  int stop_bit_check;
+} i2c_slave_core_t;
+
+static inline void ensure_setup_time()
+{
+  // The I2C spec requires a 100ns setup time
+  delay_ticks(10);
+}
+
+static inline void i2c_slave_init(i2c_slave_core_t &s)
+{
+  s.state = WAITING_FOR_START_OR_STOP;
+  s.next_state = WAITING_FOR_START_OR_STOP;
+  s.sda_val = 0;
+  s.scl_val = 0;
+  s.bitnum = 0;
+  s.data = 0;
+  s.rw = 0;
+  s.stop_bit_check = 0;
+}
+
+/* Drive a data or ACK bit: 1 is driven by releasing SDA to the pull-up */
+static inline void i2c_slave_drive_sda(port p_sda, int bit)
+{
+  if (bit) {
+    p_sda :> void;
+  } else {
+    p_sda <: 0;
+  }
+}
+
+/* Release the clock once SDA is set up, if the slave stretched it */
+static inline void i2c_slave_end_stretch(port p_scl, int stretching)
+{
+  if (stretching) {
+    ensure_setup_time();
+    p_scl :> void;
+  }
+}
+
+/* Handle an edge of SCL, returning the action for the slave to complete */
+static inline enum i2c_slave_action i2c_slave_scl_edge(i2c_slave_core_t &s,
+                                                       port p_sda)
+{
+  switch (s.state) {
+  case READING_ADDR:
+    // If clock has gone low, wait for it to go high before doing anything
+    if (s.scl_val == 0) {
+      s.scl_val = 1;
+      break;
+    }
+
+    int bit;
+    p_sda :> bit;
+    if (s.bitnum < 7) {
+      s.data = (s.data << 1) | bit;
+      s.bitnum++;
+      s.scl_val = 0;
+      break;
+    }
+
+    // We have gathered the whole device address sent by the master
+    s.rw = bit;
+    return I2C_SLAVE_ADDRESS;
+
+  case IGNORE_ACK:
+    // This request is not for us, ignore the ACK
+    s.next_state = WAITING_FOR_START_OR_STOP;
+    s.scl_val = 1;
+    s.state = ACK_WAIT_HIGH;
+    break;
+
+  case ACK_ADDR:
+    return I2C_SLAVE_ACK_ADDRESS;
+
+  case ACK_WAIT_HIGH:
+    // Rising edge of clock, hold ack to the falling edge
+    s.state = ACK_WAIT_LOW;
+    s.scl_val = 0;
+    break;
+
+  case ACK_WAIT_LOW:
+    // ACK done, release the data line
+    p_sda :> void;
+    if (s.next_state == MASTER_READ) {
+      s.scl_val = 0;
+    } else if (s.next_state == MASTER_WRITE) {
+      s.data = 0;
+      s.scl_val = 1;
+    } else { // WAITING_FOR_START_OR_STOP
+      s.sda_val = 0;
+    }
+    s.state = s.next_state;
+    s.bitnum = 0;
+    break;
+
+  case MASTER_READ:
+    if (s.scl_val == 1) {
+      // Rising edge
+      if (s.bitnum == 8) {
+        // Sample ack from master
+        int bit;
+        p_sda :> bit;
+        if (bit) {
+          // Master has NACKed so the transaction is finished
+          s.state = WAITING_FOR_START_OR_STOP;
+          s.sda_val = 0;
+        } else {
+          s.bitnum = 0;
+          s.scl_val = 0;
+        }
+      } else {
+        // Wait for next falling edge
+        s.scl_val = 0;
+        s.bitnum++;
+      }
+    } else {
+      // Falling edge, drive data
+      if (s.bitnum == 0) {
+        return I2C_SLAVE_SEND_BYTE;
+      }
+      if (s.bitnum < 8) {
+        i2c_slave_drive_sda(p_sda, s.data & 0x1);
+        s.data >>= 1;
+      } else {
+        // Release the bus for the master to be able to ACK/NACK
+        p_sda :> void;
+      }
+      s.scl_val = 1;
+    }
+    break;
+
+  case MASTER_WRITE:
+    if (s.scl_val == 1) {
+      // Rising edge
+      int bit;
+      p_sda :> bit;
+      s.data = (s.data << 1) | (bit & 0x1);
+      if (s.bitnum == 0) {
+        if (bit) {
+          s.sda_val = 0;
+        } else {
+          s.sda_val = 1;
+        }
+        // First bit could be a start or stop bit
+        s.stop_bit_check = 1;
+      }
+      s.scl_val = 0;
+      s.bitnum++;
+    } else {
+      // Falling edge
+
+      // Not a start or stop bit
+      s.stop_bit_check = 0;
+
+      if (s.bitnum == 8) {
+        return I2C_SLAVE_BYTE_RECEIVED;
+      }
+      s.scl_val = 1;
+    }
+    break;
+
+  default:
+    break;
+  }
+  return I2C_SLAVE_NO_ACTION;
+}
+
+/* Complete I2C_SLAVE_ADDRESS, with whether the address is the slave's */
+static inline void i2c_slave_match_address(i2c_slave_core_t &s, int matches)
+{
+  s.state = matches ? ACK_ADDR : IGNORE_ACK;
+  s.scl_val = 0;
+}
+
+/* Complete I2C_SLAVE_ACK_ADDRESS, ACKing the address if ack is set */
+static inline void i2c_slave_ack_address(i2c_slave_core_t &s,
+                                         port p_scl, port p_sda,
+                                         int ack, int stretching)
+{
+  if (ack) {
+    // Drive the ACK low
+    p_sda <: 0;
+    s.next_state = s.rw ? MASTER_READ : MASTER_WRITE;
+  } else {
+    // Release the data line so that it is pulled high
+    p_sda :> void;
+    s.next_state = WAITING_FOR_START_OR_STOP;
+  }
+  s.scl_val = 1;
+  s.state = ACK_WAIT_HIGH;
+  i2c_slave_end_stretch(p_scl, stretching);
+}
+
+/* Complete I2C_SLAVE_SEND_BYTE, driving the first bit of the byte */
+static inline void i2c_slave_send_byte(i2c_slave_core_t &s,
+                                       port p_scl, port p_sda,
+                                       uint8_t byte, int stretching)
+{
+  // Data is transmitted MSB first
+  s.data = bitrev(byte) >> 24;
+  i2c_slave_drive_sda(p_sda, s.data & 0x1);
+  i2c_slave_end_stretch(p_scl, stretching);
+  s.data >>= 1;
+  s.scl_val = 1;
+}
+
+/* Complete I2C_SLAVE_BYTE_RECEIVED, ACKing the byte if ack is set */
+static inline void i2c_slave_ack_byte(i2c_slave_core_t &s,
+                                      port p_scl, port p_sda,
+                                      int ack, int stretching)
+{
+  if (ack) {
+    // Drive data bus low to signal ACK
+    p_sda <: 0;
+  } else {
+    // Release the data bus so it is pulled high to signal NACK
+    p_sda :> void;
+  }
+  s.state = ACK_WAIT_HIGH;
+  i2c_slave_end_stretch(p_scl, stretching);
+  s.scl_val = 1;
+}
+
+/* Handle an edge of SDA, returning I2C_SLAVE_START or I2C_SLAVE_STOP for a
+   start or stop bit */
+static inline enum i2c_slave_action i2c_slave_sda_edge(i2c_slave_core_t &s,
+                                                       port p_scl)
+{
+  int val;
+  p_scl :> val;
+  if (s.sda_val == 1) {
+    // SDA has transitioned from low to high, if SCL is high
+    // then it is a stop bit.
+    s.sda_val = 0;
+    if (val) {
+      s.state = WAITING_FOR_START_OR_STOP;
+      s.stop_bit_check = 0;
+      return I2C_SLAVE_STOP;
+    }
+  } else {
+    // SDA has transitioned from high to low, if SCL is high
+    // then it is a start bit.
+    if (val == 1) {
+      s.state = READING_ADDR;
+      s.bitnum = 0;
+      s.data = 0;
+      s.scl_val = 0;
+      s.stop_bit_check = 0;
+      return I2C_SLAVE_START;
+    }
+    s.sda_val = 1;
+  }
+  return I2C_SLAVE_NO_ACTION;
+}
+
+#endif
@@ -1,6 +1,16 @@
 # Copyright 2024-2025 XMOS LIMITED.
 # This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import hashlib
+import json
+import os
+import time
 import pytest
+from i2c_golden import diff_run
+from i2c_coverage import Coverage, CoverageReport, collecting
+
+# Cache key for the wall time of each test in the last run
+DURATIONS_KEY = "lib_i2c/durations"
 
 # from https://github.com/pytest-dev/pytest/issues/3730#issuecomment-567142496
 def pytest_configure(config):
@@ -23,9 +33,208 @@ def pytest_collection_modifyitems(config, items):
         config.hook.pytest_deselected(items=removed)
         items[:] = kept
 
+    # Start the slowest simulations first so that the parallel workers are
+    # not left waiting on a long run at the end. The order must be the same on
+    # every worker, which holds as the cache is only written at the end of
+    # the session.
+    cache = getattr(config, "cache", None)
+    durations = cache.get(DURATIONS_KEY, {}) if cache else {}
+    if durations:
+        items.sort(key=lambda item: durations.get(item.nodeid, 0), reverse=True)
+
 def pytest_addoption(parser):
     parser.addoption("--nightly", action="store_true")
+    parser.addoption("--resim", action="store_true",
+                     help="Re-run simulations with a cached pass")
+    parser.addoption("--sim-cache-max-age", type=float, default=30,
+                     help="Evict cached simulation results older than this many days")
+    parser.addoption("--sim-cache-max-entries", type=int, default=1000,
+                     help="Keep at most this many cached simulation results")
+    parser.addoption("--state-coverage", metavar="FILE",
+                     help="Collect the state transition and timing margin coverage "
+                          "of the checkers, report it and write it to FILE")
 
 @pytest.fixture
 def nightly(pytestconfig):
     return pytestconfig.getoption("nightly")
+
+def pytest_sessionstart(session):
+    session.config._i2c_start_time = time.perf_counter()
+    session.config._i2c_coverage = {}
+
+@pytest.fixture(autouse=True)
+def state_coverage(request):
+    """ Collect the coverage of the checkers of each test config, if
+        --state-coverage is given (see i2c_coverage).
+    """
+    config = request.config
+    if not config.getoption("state_coverage"):
+        yield
+        return
+
+    coverage = Coverage()
+    with collecting(coverage):
+        yield
+    data = coverage.to_dict()
+    if data["transitions"] or data["margins"]:
+        config._i2c_coverage[request.node.nodeid] = data
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """ Merge the coverage of a parallel worker into that of the session.
+    """
+    data = getattr(node, "workeroutput", {}).get("i2c_coverage")
+    if data:
+        node.config._i2c_coverage.update(json.loads(data))
+
+def report_state_coverage(terminalreporter, config):
+    report = CoverageReport(config._i2c_coverage)
+    with open(config.getoption("state_coverage"), "w") as f:
+        f.write(report.to_json())
+
+    terminalreporter.section("state and timing coverage")
+    for line in report.lines():
+        terminalreporter.write_line(line)
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """ Print the wall time of each test config, slowest first, and record
+        the times to order the next run.
+    """
+    if hasattr(config, "workerinput"):
+        return
+
+    if config.getoption("state_coverage"):
+        report_state_coverage(terminalreporter, config)
+
+    durations = {}
+    outcomes = {}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) == "call":
+                durations[report.nodeid] = report.duration
+                outcomes[report.nodeid] = report.outcome
+    if not durations:
+        return
+
+    cache = getattr(config, "cache", None)
+    if cache:
+        previous = cache.get(DURATIONS_KEY, {})
+        previous.update(durations)
+        cache.set(DURATIONS_KEY, previous)
+
+    terminalreporter.section("wall time per config")
+    width = max(len(nodeid) for nodeid in durations)
+    for nodeid, duration in sorted(durations.items(), key=lambda d: d[1], reverse=True):
+        terminalreporter.write_line(f"{nodeid:<{width}} {duration:>9.2f}s  {outcomes[nodeid]}")
+
+    total = sum(durations.values())
+    wall_time = time.perf_counter() - config._i2c_start_time
+    terminalreporter.write_line(f"{len(durations)} tests, {total:.2f}s of test time in "
+                                f"{wall_time:.2f}s wall time ({total / wall_time:.1f}x)")
+
+#
+# Simulation result cache
+#
+# A passing simulation is recorded under a key made from everything that can
+# change its outcome: the binary, the simulator arguments, the parameters of
+# the checkers, the expected records and output and the source of the
+# checkers. A run with the same key then passes without re-running the
+# simulator.
+#
+SIM_CACHE_DIR = "sim_results"
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def checker_sources_digest():
+    """ Digest of the checker modules, so that changing a checker invalidates
+        the cached results.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("i2c_*.py")):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def sim_cache_key(binary, simthreads, golden, output, simargs):
+    # Pyxsim is only needed by the tests which run the simulator, so that the
+    # bus model tests can run without the XMOS test support
+    import Pyxsim
+    key = {
+        "binary": file_digest(binary),
+        "simargs": list(simargs),
+        "checkers": [[type(t).__name__, t.cache_params()] for t in simthreads],
+        "golden": golden.cache_params(),
+        "output": list(output),
+        "sources": checker_sources_digest(),
+        "pyxsim": getattr(Pyxsim, "__version__", None),
+        "tools": os.environ.get("XMOS_TOOL_PATH"),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+@pytest.fixture
+def run_sim(request, capfd):
+    """ Run a binary on the simulator with the given checkers, unless the same
+        run has passed before, and check the bus against the records of a
+        GoldenSink (which must be the event sink of the checkers) and the
+        output of the xCORE against the expected lines (see i2c_golden).
+        Only the pass/fail outcome is cached, so tests which inspect the
+        checkers after the run should call Pyxsim directly.
+    """
+    config = request.config
+    cache = getattr(config, "cache", None)
+
+    def run(binary, simthreads, golden, output, simargs):
+        entry = None
+        if cache is not None:
+            key = sim_cache_key(binary, simthreads, golden, output, simargs)
+            entry = cache.mkdir(SIM_CACHE_DIR) / f"{key}.json"
+            # A cached pass has no coverage, so re-run while collecting it
+            if entry.exists() and not config.getoption("resim") and \
+               not config.getoption("state_coverage"):
+                # Refresh the entry so that it is evicted last
+                os.utime(entry)
+                request.node.user_properties.append(("sim_cache", "hit"))
+                return
+
+        import Pyxsim
+        Pyxsim.run_on_simulator_(
+            binary,
+            do_xe_prebuild = False,
+            simthreads = simthreads,
+            simargs = simargs,
+            capfd = capfd
+            )
+
+        out, _ = capfd.readouterr()
+        differences = diff_run(golden, output, out)
+        assert not differences, "\n".join(differences)
+
+        if entry is not None:
+            tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"nodeid": request.node.nodeid,
+                                       "binary": str(binary),
+                                       "time": time.time()}))
+            os.replace(tmp, entry)
+
+    return run
+
+def evict_sim_cache(config):
+    cache_dir = config.cache.mkdir(SIM_CACHE_DIR)
+    entries = sorted(cache_dir.iterdir(), key=lambda p: p.stat().st_mtime,
+                     reverse=True)
+    oldest = time.time() - config.getoption("sim_cache_max_age") * 24 * 60 * 60
+    for index, entry in enumerate(entries):
+        if index >= config.getoption("sim_cache_max_entries") or \
+           entry.stat().st_mtime < oldest:
+            entry.unlink(missing_ok=True)
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if hasattr(config, "workerinput") and config.getoption("state_coverage"):
+        # Sent to the controller, which merges it in pytest_testnodedown
+        config.workeroutput["i2c_coverage"] = json.dumps(config._i2c_coverage)
+    if hasattr(config, "workerinput") or getattr(config, "cache", None) is None:
+        return
+    evict_sim_cache(config)
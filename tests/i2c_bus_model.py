@@ -0,0 +1,825 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+A discrete event model of an I2C bus which runs the checkers without xsim.
+
+I2CBusModel implements the parts of the xsi interface used by the checkers
+(drive_port_pins, sample_port_pins, is_port_driving, get_time and the waits
+behind the Pyxsim.SimThread methods) on top of a time ordered event queue.
+The device side of the bus, which is the xCORE in a simulation, is provided
+by behavioural models of the lib_i2c master and slave. These follow the
+timing of i2c_master.xc and i2c_slave.xc.
+
+All pins are open drain with a pull-up: a pin is low if any device model
+drives it low, otherwise it takes the value weakly driven by the checkers,
+as with '--weak-external-drive' in xsim.
+
+The behavioural models are generators which yield the waits below. The
+first checker registered runs on the caller's stack and runs the event loop
+itself from inside each of its waits until it is woken, as the trace replay
+of i2c_trace_analyzer does, so a checker costs no thread switches. Any further
+checkers run in their own threads and hand control back and forth with the
+event loop at each wait.
+
+Most events are at the current time, as every pin change wakes its waiters
+at the time of the change. These are kept in a FIFO rather than the time
+ordered heap, and a checker waiting for a pin change is woken by the change
+without calling a condition.
+
+All times are in femtoseconds, the unit of the simulator time.
+"""
+import heapq
+import itertools
+import threading
+from collections import deque
+from i2c_coverage import set_source, MODEL
+
+# The reference clock period (10ns)
+TICK = 10000000
+
+# Waits yielded by the behavioural models
+#   (UNTIL, time):                  resume at the given time
+#   (PINS_EQ, ((port, value), ..)): resume as soon as one of the pins has the
+#                                   value, with the index of that pin
+UNTIL, PINS_EQ = range(2)
+
+class SimThread(object):
+    """ The methods of Pyxsim.SimThread which the checkers use, so that they
+        can run on the bus model where Pyxsim is not installed. The waits are
+        made on the xsi interface given to the thread, as in Pyxsim.
+    """
+
+    def run(self):
+        pass
+
+    def wait(self, f):
+        self.xsi._user_wait(f)
+
+    def wait_for_port_pins_change(self, ps):
+        self.xsi._wait_for_port_pins_change(ps)
+
+    def wait_for_next_cycle(self):
+        self.xsi._wait_for_next_cycle()
+
+    def wait_until(self, t):
+        self.xsi._wait_until(t)
+
+class SimulationEnd(Exception):
+    """ Raised in the checker threads still waiting when the simulation ends.
+    """
+    pass
+
+class _Waiter(object):
+    """ A process waiting on pins. A waiter with no check is woken by any
+        change of its ports.
+    """
+    __slots__ = ("process", "ports", "check", "active")
+
+    def __init__(self, process, ports, check):
+        self.process = process
+        self.ports = ports
+        self.check = check
+        self.active = True
+
+class _ModelProcess(object):
+    """ A behavioural model, run as a generator.
+    """
+
+    def __init__(self, bus, generator):
+        self._bus = bus
+        self._generator = generator
+        self._send = generator.send
+        self.finished = False
+
+    def resume(self, value):
+        try:
+            request = self._send(value)
+        except StopIteration:
+            self.finished = True
+            return
+
+        kind, arg = request
+        if kind == UNTIL:
+            bus = self._bus
+            bus._schedule(arg, bus._resume, self)
+        elif kind == PINS_EQ:
+            self._bus._wait_for_pins(self, arg)
+        else:
+            raise ValueError("Unknown wait %r" % (request,))
+
+    def end(self):
+        self._generator.close()
+
+class _InlineSimThreadProcess(object):
+    """ A checker which runs the event loop from inside its waits (see
+        I2CBusModel.run).
+    """
+
+    def __init__(self, bus, simthread):
+        self._bus = bus
+        self.simthread = simthread
+        self.resumed = False
+        self.finished = False
+
+    def resume(self, value):
+        # Called by the event loop, which returns to the waiting checker
+        self.resumed = True
+
+    def wait(self):
+        # Called by the checker once its waiter has been registered
+        if not self._bus._run_events(self):
+            raise SimulationEnd()
+
+    def end(self):
+        pass
+
+class _SimThreadProcess(object):
+    """ A checker, run in its own thread. Only one of the event loop and the
+        checker threads runs at any time.
+    """
+
+    def __init__(self, bus, simthread):
+        self._bus = bus
+        self._simthread = simthread
+        self._run = threading.Semaphore(0)
+        self._waiting = threading.Semaphore(0)
+        self._ending = False
+        self.exception = None
+        self.finished = False
+        self._thread = threading.Thread(target=self._main, daemon=True)
+        self._thread.start()
+
+    def _main(self):
+        self._run.acquire()
+        try:
+            if not self._ending:
+                self._simthread.run()
+        except SimulationEnd:
+            pass
+        except BaseException as e:
+            self.exception = e
+        self.finished = True
+        self._waiting.release()
+
+    def resume(self, value):
+        # Called by the event loop, which blocks until the checker waits again
+        self._run.release()
+        self._waiting.acquire()
+        if self.exception is not None:
+            exception, self.exception = self.exception, None
+            raise exception
+
+    def wait(self):
+        # Called by the checker thread once its waiter has been registered
+        self._waiting.release()
+        self._run.acquire()
+        if self._ending:
+            raise SimulationEnd()
+
+    def end(self):
+        if not self.finished:
+            self._ending = True
+            self.resume(None)
+        self._thread.join()
+
+class I2CBusModel(object):
+    """
+    The event loop and pins of the bus. Register the checkers with
+    register_simthread(), the device models with add_model() and then call
+    run().
+    """
+
+    def __init__(self, cycle_time=TICK, trace=False):
+        self._time = 0
+        self._cycle_time = cycle_time
+        self._queue = []
+        self._ready = deque()
+        self._seq = itertools.count()
+        self._external = {}
+        self._device = {}
+        self._pins = {}
+        self._port_waiters = {}
+        self._any_waiters = []
+        self._processes = []
+        self._inline = None
+        self._current = None
+        self._stopped = False
+        self._timeout = None
+        self.num_changes = 0
+        self.trace = [] if trace else None
+        # The checkers are not testing the firmware (see i2c_coverage)
+        set_source(MODEL)
+
+    #
+    # The xsi interface used by the checkers
+    #
+    def get_time(self):
+        return self._time
+
+    def drive_port_pins(self, port, value):
+        """ Weakly drive a pin from outside the device.
+        """
+        # The checkers redrive their pins on every read to maintain the weak
+        # drive, which only changes a pin if the value changes
+        if self._external.get(port) == value:
+            return
+        self._external[port] = value
+        self._update(port)
+
+    def sample_port_pins(self, port):
+        return self._pins.get(port, 1)
+
+    def is_port_driving(self, port):
+        return bool(self._device.get(port))
+
+    def _wait_until(self, time):
+        process = self._current
+        self._schedule(time, self._resume, process)
+        process.wait()
+
+    def _wait_for_port_pins_change(self, ports):
+        process = self._current
+        self._add_waiter(_Waiter(process, ports, None))
+        process.wait()
+
+    def _wait_for_next_cycle(self):
+        self._wait_until(self._time + self._cycle_time)
+
+    def _user_wait(self, condition):
+        """ Wait until condition(xsi) is true. The condition is checked when a
+            pin changes, on its ports if it has a 'ports' attribute, and at its
+            'time' attribute if it has one (see PinsChangeOrTime).
+        """
+        process = self._current
+        waiter = _Waiter(process, getattr(condition, "ports", None),
+                         lambda: condition(self))
+        self._add_waiter(waiter)
+        time = getattr(condition, "time", None)
+        if time is not None:
+            self._schedule(time, self._check_waiter, waiter)
+        process.wait()
+
+    def register_simthread(self, simthread):
+        simthread.xsi = self
+        if self._inline is None:
+            process = self._inline = _InlineSimThreadProcess(self, simthread)
+        else:
+            process = _SimThreadProcess(self, simthread)
+        self._processes.append(process)
+        self._schedule(self._time, self._resume, process)
+
+    #
+    # The device side of the bus
+    #
+    def add_model(self, generator):
+        process = _ModelProcess(self, generator)
+        self._processes.append(process)
+        self._schedule(self._time, self._resume, process)
+
+    def drive(self, owner, port, value):
+        """ Drive a pin from a device model, or release it if value is None.
+        """
+        drivers = self._device.setdefault(port, {})
+        if value is None:
+            drivers.pop(owner, None)
+        else:
+            drivers[owner] = value
+        self._update(port)
+
+    def stop(self):
+        """ End the simulation, as the xCORE exiting would.
+        """
+        self._stopped = True
+
+    def run(self, timeout=None):
+        """ Run until no more events are pending, stop() is called or the
+            timeout (in femtoseconds) is reached. Returns the end time.
+        """
+        self._timeout = timeout
+        inline = self._inline
+        try:
+            # The first checker runs the event loop from its waits until it
+            # returns or the simulation ends
+            if inline is not None and self._run_events(inline):
+                try:
+                    inline.simthread.run()
+                except SimulationEnd:
+                    pass
+                inline.finished = True
+            self._run_events()
+        finally:
+            for process in self._processes:
+                process.end()
+        return self._time
+
+    def write_vcd(self, file, ports=None):
+        """ Write the traced pin changes as a VCD file.
+        """
+        if self.trace is None:
+            raise ValueError("Bus was not created with trace=True")
+        ports = ports or sorted(set(port for _, port, _ in self.trace))
+        ids = {port: chr(33 + i) for i, port in enumerate(ports)}
+        file.write("$timescale 1 fs $end\n$scope module i2c $end\n")
+        for port in ports:
+            file.write("$var wire 1 %s %s $end\n" % (ids[port], port.replace(" ", "_")))
+        file.write("$upscope $end\n$enddefinitions $end\n")
+        last_time = None
+        for time, port, value in self.trace:
+            if port not in ids:
+                continue
+            if time != last_time:
+                file.write("#%d\n" % time)
+                last_time = time
+            file.write("%d%s\n" % (value, ids[port]))
+
+    #
+    # Internals
+    #
+    def _run_events(self, process=None):
+        """ Run the events in time order until process is resumed, returning
+            True, or until the simulation ends, returning False.
+        """
+        queue = self._queue
+        ready = self._ready
+        timeout = self._timeout
+        while not self._stopped:
+            if not ready:
+                # Move on to the next time with events, all of which were
+                # scheduled before any event that they schedule
+                if not queue or (timeout is not None and queue[0][0] > timeout):
+                    break
+                time = queue[0][0]
+                self._time = time
+                while queue and queue[0][0] == time:
+                    ready.append(heapq.heappop(queue)[2:])
+            action, arg, value = ready.popleft()
+            action(arg, value)
+            if process is not None and process.resumed:
+                process.resumed = False
+                self._current = process
+                return True
+        return False
+
+    def _schedule(self, time, action, arg, value=None):
+        """ Call action(arg, value) at the given time, or now if it has passed.
+        """
+        if time <= self._time:
+            self._ready.append((action, arg, value))
+        else:
+            heapq.heappush(self._queue, (time, next(self._seq), action, arg, value))
+
+    def _resume(self, process, value=None):
+        self._current = process
+        process.resume(value)
+        self._current = None
+
+    def _wait_for_pins(self, process, conditions):
+        for index, (port, value) in enumerate(conditions):
+            if self.sample_port_pins(port) == value:
+                self._schedule(self._time, self._resume, process, index)
+                return
+
+        def check():
+            for index, (port, value) in enumerate(conditions):
+                if self.sample_port_pins(port) == value:
+                    return index
+            return None
+
+        ports = tuple(port for port, _ in conditions)
+        self._add_waiter(_Waiter(process, ports, check))
+
+    def _add_waiter(self, waiter):
+        if waiter.ports is None:
+            self._any_waiters.append(waiter)
+        else:
+            port_waiters = self._port_waiters
+            for port in waiter.ports:
+                if port in port_waiters:
+                    port_waiters[port].append(waiter)
+                else:
+                    port_waiters[port] = [waiter]
+
+    def _remove_waiter(self, waiter):
+        waiter.active = False
+        if waiter.ports is None:
+            self._any_waiters.remove(waiter)
+        else:
+            for port in waiter.ports:
+                self._port_waiters[port].remove(waiter)
+
+    def _check_waiter(self, waiter, value=None):
+        if waiter.active and waiter.check():
+            self._remove_waiter(waiter)
+            self._resume(waiter.process)
+
+    def _wake_waiters(self, waiters):
+        # The waiters run after the current process, at the same time
+        ready = self._ready
+        resume = self._resume
+        for waiter in waiters:
+            if not waiter.active:
+                continue
+            check = waiter.check
+            if check is None:
+                result = None
+            else:
+                result = check()
+                if result is None or result is False:
+                    continue
+                if result is True:
+                    result = None
+            self._remove_waiter(waiter)
+            ready.append((resume, waiter.process, result))
+
+    def _update(self, port):
+        drivers = self._device.get(port)
+        if drivers:
+            value = min(drivers.values())
+        else:
+            value = self._external.get(port, 1)
+
+        pins = self._pins
+        if pins.get(port) == value:
+            return
+        pins[port] = value
+        self.num_changes += 1
+        if self.trace is not None:
+            self.trace.append((self._time, port, value))
+
+        # Wake the waiters which are satisfied by the change
+        waiters = self._port_waiters.get(port)
+        if waiters:
+            self._wake_waiters(list(waiters))
+        if self._any_waiters:
+            self._wake_waiters(list(self._any_waiters))
+
+class I2CMasterModel(object):
+    """
+    Behavioural model of i2c_master() running a program of operations:
+
+      ("w", device, data, send_stop_bit)
+      ("r", device, num_bytes, send_stop_bit)
+      ("stop",)
+
+    The results are recorded in ``results`` as (ack, num_bytes_sent) for
+    writes and (ack, data) for reads, where ack is True for an ACK.
+    """
+
+    WAKE_UP_TICKS = 10
+    JITTER_TICKS = 3
+
+    def __init__(self, bus, scl, sda, speed, program, start_delay=100):
+        self.bus = bus
+        self.scl = scl
+        self.sda = sda
+        self.speed = speed
+        self.program = program
+        self.start_delay = start_delay
+        self.results = []
+
+        self.bit_time = (100 * 1000) // speed
+        if speed <= 100:
+            self.low_period = 470 + self.JITTER_TICKS
+        elif speed <= 400:
+            self.low_period = 130 + self.JITTER_TICKS
+        elif speed <= 1000:
+            self.low_period = 50 + self.JITTER_TICKS
+        else:
+            raise ValueError("Speeds above Fast-mode Plus not supported")
+        self.bus_off = self.bit_time // 2 + self.bit_time // 16
+        self.data_change = min(self.bit_time // 4, 335)
+
+    def ticks(self):
+        return int(self.bus.get_time() // TICK)
+
+    def drive_low(self, port):
+        self.bus.drive(self, port, 0)
+
+    def release(self, port):
+        self.bus.drive(self, port, None)
+
+    def after(self, ticks):
+        return UNTIL, ticks * TICK
+
+    def release_clock_and_wait(self, fall_time, delay):
+        self.release(self.scl)
+        yield PINS_EQ, ((self.scl, 1),)
+        yield self.after(fall_time + delay)
+        time = self.ticks()
+        if time > fall_time + delay + self.WAKE_UP_TICKS:
+            fall_time = time - self.low_period - self.WAKE_UP_TICKS
+            yield self.after(fall_time + delay)
+        return fall_time
+
+    def high_pulse_sample(self, fall_time):
+        self.release(self.sda)
+        yield self.after(fall_time + self.low_period)
+        fall_time = yield from self.release_clock_and_wait(fall_time, (self.bit_time * 3) // 4)
+        value = self.bus.sample_port_pins(self.sda)
+        fall_time += self.bit_time
+        yield self.after(fall_time)
+        self.drive_low(self.scl)
+        return value, fall_time
+
+    def high_pulse(self, fall_time):
+        yield self.after(fall_time + self.low_period)
+        fall_time = yield from self.release_clock_and_wait(fall_time, (self.bit_time * 3) // 4)
+        fall_time += self.bit_time
+        yield self.after(fall_time)
+        self.drive_low(self.scl)
+        return fall_time
+
+    def start_bit(self, fall_time, stopped):
+        if not stopped:
+            yield self.after(fall_time + self.low_period)
+            fall_time = yield from self.release_clock_and_wait(fall_time, self.bit_time)
+        self.drive_low(self.sda)
+        yield self.after(self.ticks() + self.bit_time // 2)
+        self.drive_low(self.scl)
+        return self.ticks()
+
+    def stop_bit(self, fall_time):
+        self.drive_low(self.sda)
+        yield self.after(fall_time + self.low_period)
+        fall_time = yield from self.release_clock_and_wait(fall_time, self.bit_time)
+        self.release(self.sda)
+        yield self.after(self.ticks() + self.bus_off)
+
+    def tx8(self, data, fall_time):
+        for bit in range(7, -1, -1):
+            if (data >> bit) & 1:
+                self.release(self.sda)
+            else:
+                self.drive_low(self.sda)
+            fall_time = yield from self.high_pulse(fall_time)
+        ack, fall_time = yield from self.high_pulse_sample(fall_time)
+        return ack, fall_time
+
+    def run(self):
+        yield self.after(self.start_delay)
+        last_fall_time = 0
+        stopped = True
+        for op in self.program:
+            if op[0] == "stop":
+                yield from self.stop_bit(self.ticks())
+                stopped = True
+                continue
+
+            mode, device, arg, send_stop_bit = op
+            fall_time = yield from self.start_bit(last_fall_time, stopped)
+            if mode == "r":
+                ack, fall_time = yield from self.tx8((device << 1) | 1, fall_time)
+                data = []
+                if ack == 0:
+                    for j in range(arg):
+                        byte = 0
+                        for _ in range(8):
+                            bit, fall_time = yield from self.high_pulse_sample(fall_time)
+                            byte = (byte << 1) | bit
+                        data.append(byte)
+
+                        yield self.after(fall_time + self.data_change)
+                        # ACK after every read byte until the final byte then NACK
+                        if j == arg - 1:
+                            self.release(self.sda)
+                        else:
+                            self.drive_low(self.sda)
+                        yield self.after(fall_time + self.low_period)
+                        fall_time = yield from self.high_pulse(fall_time)
+                        self.release(self.sda)
+                result = (ack == 0, data)
+            else:
+                ack, fall_time = yield from self.tx8(device << 1, fall_time)
+                sent = 0
+                for byte in arg:
+                    if ack != 0:
+                        break
+                    ack, fall_time = yield from self.tx8(byte, fall_time)
+                    sent += 1
+                result = (ack == 0, sent)
+
+            if send_stop_bit:
+                yield from self.stop_bit(fall_time)
+            stopped = bool(send_stop_bit)
+            last_fall_time = fall_time
+            self.results.append(result)
+
+class I2CSlaveDeviceModel(object):
+    """
+    The application side of a slave model, with the callbacks of
+    i2c_slave_callback_if. Acks addresses, acks written bytes according to
+    ack_sequence (then always) and returns tx_data cyclically to reads. The
+    bytes written by the master are recorded in ``received``.
+    """
+
+    def __init__(self, tx_data=(0xab,), ack_sequence=()):
+        self.tx_data = tx_data
+        self.ack_sequence = ack_sequence
+        self._tx_index = 0
+        self._ack_index = 0
+        self.received = []
+        self.num_stop_bits = 0
+
+    def ack_read_request(self):
+        return True
+
+    def ack_write_request(self):
+        return True
+
+    def master_requires_data(self):
+        data = self.tx_data[self._tx_index]
+        self._tx_index = (self._tx_index + 1) % len(self.tx_data)
+        return data
+
+    def master_sent_data(self, data):
+        self.received.append(data)
+        if self._ack_index < len(self.ack_sequence):
+            ack = self.ack_sequence[self._ack_index]
+            self._ack_index += 1
+            return ack
+        return True
+
+    def stop_bit(self):
+        self.num_stop_bits += 1
+
+class I2CSlaveModel(object):
+    """
+    Behavioural model of i2c_slave(), calling a device model (see
+    I2CSlaveDeviceModel) where the slave would make callbacks.
+    """
+
+    (WAITING_FOR_START_OR_STOP, READING_ADDR, ACK_ADDR, ACK_WAIT_HIGH,
+     ACK_WAIT_LOW, IGNORE_ACK, MASTER_WRITE, MASTER_READ) = range(8)
+
+    SETUP_TICKS = 10
+
+    def __init__(self, bus, scl, sda, device_addr, device):
+        self.bus = bus
+        self.scl = scl
+        self.sda = sda
+        self.device_addr = device_addr
+        self.device = device
+
+    def drive_low(self, port):
+        self.bus.drive(self, port, 0)
+
+    def release(self, port):
+        self.bus.drive(self, port, None)
+
+    def ensure_setup_time(self):
+        yield UNTIL, self.bus.get_time() + self.SETUP_TICKS * TICK
+
+    def run(self):
+        state = self.WAITING_FOR_START_OR_STOP
+        next_state = self.WAITING_FOR_START_OR_STOP
+        sda_val = 0
+        scl_val = 0
+        bitnum = 0
+        data = 0
+        rw = 0
+        stop_bit_check = False
+        ignore_stop_bit = True
+        sample = self.bus.sample_port_pins
+
+        yield PINS_EQ, ((self.sda, 1),)
+        while True:
+            conditions = []
+            if state != self.WAITING_FOR_START_OR_STOP:
+                conditions.append((self.scl, scl_val))
+            if state == self.WAITING_FOR_START_OR_STOP or stop_bit_check:
+                conditions.append((self.sda, sda_val))
+            index = yield PINS_EQ, tuple(conditions)
+
+            if conditions[index][0] == self.scl:
+                if state == self.READING_ADDR:
+                    # If clock has gone low, wait for it to go high
+                    if scl_val == 0:
+                        scl_val = 1
+                        continue
+                    bit = sample(self.sda)
+                    if bitnum < 7:
+                        data = (data << 1) | bit
+                        bitnum += 1
+                        scl_val = 0
+                        continue
+                    if data != self.device_addr:
+                        state = self.IGNORE_ACK
+                    else:
+                        state = self.ACK_ADDR
+                        rw = bit
+                    scl_val = 0
+
+                elif state == self.IGNORE_ACK:
+                    next_state = self.WAITING_FOR_START_OR_STOP
+                    scl_val = 1
+                    state = self.ACK_WAIT_HIGH
+
+                elif state == self.ACK_ADDR:
+                    # Stretch the clock while the device is called
+                    self.drive_low(self.scl)
+                    if rw:
+                        ack = self.device.ack_read_request()
+                    else:
+                        ack = self.device.ack_write_request()
+                    ignore_stop_bit = False
+                    if not ack:
+                        self.release(self.sda)
+                        next_state = self.WAITING_FOR_START_OR_STOP
+                    else:
+                        self.drive_low(self.sda)
+                        next_state = self.MASTER_READ if rw else self.MASTER_WRITE
+                    scl_val = 1
+                    state = self.ACK_WAIT_HIGH
+                    yield from self.ensure_setup_time()
+                    self.release(self.scl)
+
+                elif state == self.ACK_WAIT_HIGH:
+                    state = self.ACK_WAIT_LOW
+                    scl_val = 0
+
+                elif state == self.ACK_WAIT_LOW:
+                    self.release(self.sda)
+                    if next_state == self.MASTER_READ:
+                        scl_val = 0
+                    elif next_state == self.MASTER_WRITE:
+                        data = 0
+                        scl_val = 1
+                    else:
+                        sda_val = 0
+                    state = next_state
+                    bitnum = 0
+
+                elif state == self.MASTER_READ:
+                    if scl_val == 1:
+                        if bitnum == 8:
+                            # Sample the ACK from the master
+                            if sample(self.sda):
+                                state = self.WAITING_FOR_START_OR_STOP
+                                sda_val = 0
+                            else:
+                                bitnum = 0
+                                scl_val = 0
+                        else:
+                            scl_val = 0
+                            bitnum += 1
+                    else:
+                        if bitnum < 8:
+                            if bitnum == 0:
+                                self.drive_low(self.scl)
+                                data = self.device.master_requires_data()
+                            if (data >> (7 - bitnum)) & 1:
+                                self.release(self.sda)
+                            else:
+                                self.drive_low(self.sda)
+                            if bitnum == 0:
+                                yield from self.ensure_setup_time()
+                                self.release(self.scl)
+                        else:
+                            # Release the bus for the master to ACK/NACK
+                            self.release(self.sda)
+                        scl_val = 1
+
+                elif state == self.MASTER_WRITE:
+                    if scl_val == 1:
+                        bit = sample(self.sda)
+                        data = (data << 1) | bit
+                        if bitnum == 0:
+                            sda_val = 0 if bit else 1
+                            # The first bit could be a start or stop bit
+                            stop_bit_check = True
+                        scl_val = 0
+                        bitnum += 1
+                    else:
+                        stop_bit_check = False
+                        if bitnum == 8:
+                            self.drive_low(self.scl)
+                            ack = self.device.master_sent_data(data)
+                            if not ack:
+                                self.release(self.sda)
+                            else:
+                                self.drive_low(self.sda)
+                            state = self.ACK_WAIT_HIGH
+                            yield from self.ensure_setup_time()
+                            self.release(self.scl)
+                        scl_val = 1
+
+            else:
+                if sda_val == 1:
+                    # SDA rising with SCL high is a stop bit
+                    if sample(self.scl):
+                        if not ignore_stop_bit:
+                            self.device.stop_bit()
+                        state = self.WAITING_FOR_START_OR_STOP
+                        ignore_stop_bit = True
+                        stop_bit_check = False
+                    sda_val = 0
+                else:
+                    # SDA falling with SCL high is a start bit
+                    if sample(self.scl):
+                        state = self.READING_ADDR
+                        bitnum = 0
+                        data = 0
+                        scl_val = 0
+                        stop_bit_check = False
+                    else:
+                        sda_val = 1
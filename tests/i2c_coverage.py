@@ -0,0 +1,427 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Coverage of the state machines and timing limits exercised by the tests.
+
+While a Coverage is being collected (see collecting()) each checker that is
+created counts the transitions of its state machine and how close each time
+that it checks comes to its timing limit:
+
+  I2CMasterChecker  the transitions of its states table
+  i2c_slave         the transitions of the slave state machine of
+                    i2c_slave_core.h, as shadowed from the bus by the events
+                    of an I2CSlaveChecker testing i2c_slave() (see
+                    SlaveStateTracker); the machine is named after the
+                    slave_firmware given to the checker
+
+Each config is tagged with where its checkers ran: against the firmware on
+the simulator, against the models of i2c_bus_model or over a recorded trace.
+Only the simulator runs test the firmware, so the report gives the coverage
+of the others separately and leaves them out of the redundant configs.
+
+The counters are flat arrays indexed by integer state ID and limit index, so
+collecting costs a few list operations per edge. The coverage of each test
+config is saved as a dict which can be written as JSON, and CoverageReport
+merges the configs of any number of runs (such as the workers of a parallel
+run) into one report of the transitions not covered, the closest approach to
+each timing limit and the configs which add no coverage to the others.
+
+Usage:
+
+  pytest --state-coverage=coverage.json
+  python i2c_coverage.py coverage1.json coverage2.json
+"""
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from i2c_events import START, REPEATED_START, STOP, ADDRESS, ACK, MASTER, SLAVE
+from i2c_timing import Histogram, NO_LIMIT, PARAMETER_NAMES
+
+# The states of the slave state machine in i2c_slave_core.h, in the order of
+# its enum
+SLAVE_STATE_NAMES = ("WAITING_FOR_START_OR_STOP", "READING_ADDR", "ACK_ADDR",
+                     "ACK_WAIT_HIGH", "ACK_WAIT_LOW", "IGNORE_ACK",
+                     "MASTER_WRITE", "MASTER_READ")
+(WAITING_FOR_START_OR_STOP, READING_ADDR, ACK_ADDR, ACK_WAIT_HIGH, ACK_WAIT_LOW,
+ IGNORE_ACK, MASTER_WRITE, MASTER_READ) = range(len(SLAVE_STATE_NAMES))
+
+# The transitions which the slave state machine makes
+SLAVE_TRANSITIONS = (
+  ("WAITING_FOR_START_OR_STOP", "READING_ADDR"),
+  # A stop bit while waiting
+  ("WAITING_FOR_START_OR_STOP", "WAITING_FOR_START_OR_STOP"),
+  ("READING_ADDR",              "ACK_ADDR"),
+  ("READING_ADDR",              "IGNORE_ACK"),
+  ("ACK_ADDR",                  "ACK_WAIT_HIGH"),
+  ("IGNORE_ACK",                "ACK_WAIT_HIGH"),
+  ("ACK_WAIT_HIGH",             "ACK_WAIT_LOW"),
+  ("ACK_WAIT_LOW",              "MASTER_READ"),
+  ("ACK_WAIT_LOW",              "MASTER_WRITE"),
+  ("ACK_WAIT_LOW",              "WAITING_FOR_START_OR_STOP"),
+  # The master NACKs the last byte of a read
+  ("MASTER_READ",               "WAITING_FOR_START_OR_STOP"),
+  ("MASTER_WRITE",              "ACK_WAIT_HIGH"),
+  # A stop bit or repeated start in place of the next byte of a write
+  ("MASTER_WRITE",              "WAITING_FOR_START_OR_STOP"),
+  ("MASTER_WRITE",              "READING_ADDR"),
+)
+
+# Where the checkers of a config ran
+XSIM, MODEL, TRACE = "xsim", "model", "trace"
+SOURCE_TITLES = {MODEL: "the models", TRACE: "recorded traces"}
+
+# The margins to each timing limit are counted in buckets of this fraction
+# of the limit, from 0 up to the limit itself
+MARGIN_BUCKETS = 10
+
+def transition_name(from_name, to_name):
+    return "%s -> %s" % (from_name, to_name)
+
+def limit_name(index):
+    return "%s %s" % (PARAMETER_NAMES[index // 2], "max" if index & 1 else "min")
+
+class TransitionCoverage(object):
+    """ The number of times that each transition of a state machine has been
+        taken, held in a flat array indexed by (from * number of states + to).
+    """
+
+    def __init__(self, state_names, possible):
+        self.state_names = tuple(state_names)
+        self.possible = [transition_name(*transition) for transition in possible]
+        self._num_states = len(self.state_names)
+        self.counts = [0] * (self._num_states * self._num_states)
+
+    def add(self, from_state, to_state):
+        self.counts[from_state * self._num_states + to_state] += 1
+
+    def to_dict(self):
+        n = self._num_states
+        return {"states": list(self.state_names),
+                "possible": list(self.possible),
+                "counts": {transition_name(self.state_names[index // n],
+                                           self.state_names[index % n]): count
+                           for index, count in enumerate(self.counts) if count}}
+
+class MarginCoverage(object):
+    """ How close the times checked against the timing limits of a speed mode
+        came to each limit. The margin of a time is how far it is inside the
+        limit (negative for a violation); the closest margin is kept and the
+        margins are counted in a histogram as a fraction of the limit.
+    """
+
+    def __init__(self, mode, limits):
+        self.mode = mode
+        self.limits = list(limits)
+        self.counts = [0] * len(self.limits)
+        self.closest = [None] * len(self.limits)
+        self.histograms = [Histogram(0, 1, MARGIN_BUCKETS) for _ in self.limits]
+
+    def add(self, index, time):
+        limit = self.limits[index]
+        if not 0 < limit < NO_LIMIT:
+            # The limit does not apply
+            return
+        margin = limit - time if index & 1 else time - limit
+        self.counts[index] += 1
+        closest = self.closest[index]
+        if closest is None or margin < closest:
+            self.closest[index] = margin
+        self.histograms[index].add(margin / limit)
+
+    def to_dict(self):
+        return {limit_name(index): {"limit": self.limits[index],
+                                    "count": count,
+                                    "closest": self.closest[index],
+                                    "buckets": list(self.histograms[index].buckets),
+                                    "underflow": self.histograms[index].underflow,
+                                    "overflow": self.histograms[index].overflow}
+                for index, count in enumerate(self.counts) if count}
+
+class Coverage(object):
+    """ The coverage collected by the checkers of a test config.
+    """
+
+    def __init__(self):
+        self.source = XSIM
+        self._transitions = {}
+        self._margins = {}
+
+    def transitions(self, machine, state_names, possible):
+        """ The TransitionCoverage of the named state machine.
+        """
+        if machine not in self._transitions:
+            self._transitions[machine] = TransitionCoverage(state_names, possible)
+        return self._transitions[machine]
+
+    def margins(self, profile):
+        """ The MarginCoverage of the speed mode of an I2CTimingProfile, or
+            None if the profile has no limits.
+        """
+        if profile.mode is None:
+            return None
+        if profile.mode not in self._margins:
+            self._margins[profile.mode] = MarginCoverage(profile.mode, profile.limits)
+        return self._margins[profile.mode]
+
+    def to_dict(self):
+        return {"source": self.source,
+                "transitions": {machine: transitions.to_dict()
+                                for machine, transitions in self._transitions.items()},
+                "margins": {mode: margins.to_dict()
+                            for mode, margins in self._margins.items()}}
+
+_collecting = None
+
+def active_coverage():
+    """ The Coverage being collected, or None.
+    """
+    return _collecting
+
+def set_source(source):
+    """ Record that the checkers of the Coverage being collected run on
+        something other than the simulator (MODEL or TRACE).
+    """
+    if _collecting is not None:
+        _collecting.source = source
+
+@contextmanager
+def collecting(coverage):
+    """ Collect the coverage of the checkers created in the block.
+    """
+    global _collecting
+    previous = _collecting
+    _collecting = coverage
+    try:
+        yield coverage
+    finally:
+        _collecting = previous
+
+class SlaveStateTracker(object):
+    """ An event sink of I2CSlaveChecker which follows the slave state
+        machine from the bus traffic and counts its transitions. Whether
+        the address was for the slave is taken from its ACK, so an address
+        which the application NACKs is counted as ignored.
+    """
+
+    def __init__(self, transitions):
+        self._transitions = transitions
+        self._state = WAITING_FOR_START_OR_STOP
+        self._address = None
+
+    def go(self, *states):
+        for state in states:
+            self._transitions.add(self._state, state)
+            self._state = state
+
+    def __call__(self, event):
+        kind = event.kind
+        if kind == START or kind == REPEATED_START:
+            self.go(READING_ADDR)
+        elif kind == ADDRESS:
+            self._address = event.value
+        elif kind == ACK and event.sender == SLAVE:
+            if self._address is not None:
+                reading = self._address & 1
+                self._address = None
+                if event.value:
+                    self.go(IGNORE_ACK, ACK_WAIT_HIGH, ACK_WAIT_LOW,
+                            WAITING_FOR_START_OR_STOP)
+                else:
+                    self.go(ACK_ADDR, ACK_WAIT_HIGH, ACK_WAIT_LOW,
+                            MASTER_READ if reading else MASTER_WRITE)
+            elif self._state == MASTER_WRITE:
+                self.go(ACK_WAIT_HIGH, ACK_WAIT_LOW, MASTER_WRITE)
+        elif kind == ACK and event.sender == MASTER:
+            if event.value and self._state == MASTER_READ:
+                self.go(WAITING_FOR_START_OR_STOP)
+        elif kind == STOP:
+            self.go(WAITING_FOR_START_OR_STOP)
+
+def slave_state_tracker(coverage, firmware):
+    """ A SlaveStateTracker counting the transitions of the named slave.
+    """
+    return SlaveStateTracker(coverage.transitions(firmware, SLAVE_STATE_NAMES,
+                                                  SLAVE_TRANSITIONS))
+
+def config_source(data):
+    # Coverage written before the source was recorded is from the simulator
+    return data.get("source", XSIM)
+
+def empty_coverage(source=XSIM):
+    return {"source": source, "transitions": {}, "margins": {}}
+
+def merge_coverage(into, data):
+    """ Add the coverage dict data to the coverage dict into.
+    """
+    for machine, transitions in data["transitions"].items():
+        merged = into["transitions"].setdefault(
+            machine, {"states": transitions["states"],
+                      "possible": transitions["possible"], "counts": {}})
+        for name, count in transitions["counts"].items():
+            merged["counts"][name] = merged["counts"].get(name, 0) + count
+
+    for mode, limits in data["margins"].items():
+        merged_limits = into["margins"].setdefault(mode, {})
+        for name, margin in limits.items():
+            merged = merged_limits.get(name)
+            if merged is None:
+                merged_limits[name] = dict(margin, buckets=list(margin["buckets"]))
+                continue
+            merged["count"] += margin["count"]
+            merged["closest"] = min(merged["closest"], margin["closest"])
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], margin["buckets"])]
+            merged["underflow"] += margin["underflow"]
+            merged["overflow"] += margin["overflow"]
+    return into
+
+def coverage_items(data):
+    """ The set of things covered by the coverage dict of a config: the
+        transitions taken and the bands of margin reached to each limit.
+    """
+    items = set()
+    for machine, transitions in data["transitions"].items():
+        items.update((machine, name) for name in transitions["counts"])
+    for mode, limits in data["margins"].items():
+        for name, margin in limits.items():
+            if margin["underflow"]:
+                items.add((mode, name, "violated"))
+            items.update((mode, name, index)
+                         for index, count in enumerate(margin["buckets"]) if count)
+            if margin["overflow"]:
+                items.add((mode, name, "over"))
+    return items
+
+def redundant_configs(items_by_config):
+    """ The configs which can be dropped together without losing any item of
+        coverage. The configs which cover the most new items are picked in
+        turn until every item is covered, and the rest are redundant.
+    """
+    remaining = set().union(*items_by_config.values())
+    configs = sorted(items_by_config)
+    picked = set()
+    while remaining:
+        best = max(configs, key=lambda config: len(items_by_config[config] & remaining))
+        picked.add(best)
+        remaining -= items_by_config[best]
+    return [config for config in configs if config not in picked]
+
+class CoverageReport(object):
+    """ The coverage of a set of test configs, merged from one or more runs.
+        The configs are a dict of test node ID to the dict of its Coverage.
+    """
+
+    def __init__(self, configs=None):
+        self.configs = {}
+        if configs:
+            self.add(configs)
+
+    def add(self, configs):
+        for nodeid, data in configs.items():
+            if nodeid in self.configs:
+                merge_coverage(self.configs[nodeid], data)
+            else:
+                self.configs[nodeid] = merge_coverage(empty_coverage(config_source(data)), data)
+
+    def to_json(self):
+        return json.dumps({"configs": self.configs}, indent=1, sort_keys=True)
+
+    @classmethod
+    def from_files(cls, paths):
+        report = cls()
+        for path in paths:
+            with open(path) as f:
+                report.add(json.load(f)["configs"])
+        return report
+
+    def source_configs(self, source):
+        return {nodeid: data for nodeid, data in self.configs.items()
+                if config_source(data) == source}
+
+    def merged(self, source=XSIM):
+        """ The merged coverage of the configs from a source.
+        """
+        merged = empty_coverage(source)
+        configs = self.source_configs(source)
+        for nodeid in sorted(configs):
+            merge_coverage(merged, configs[nodeid])
+        return merged
+
+    def lines(self):
+        """ The lines of text of the report.
+        """
+        configs = self.source_configs(XSIM)
+        lines = self.coverage_lines(XSIM)
+        for source in (MODEL, TRACE):
+            num_configs = len(self.source_configs(source))
+            if num_configs:
+                lines.append("Runs on %s (%d configs, not counted as redundant):" %
+                             (SOURCE_TITLES[source], num_configs))
+                lines.extend("  " + line for line in self.coverage_lines(source))
+
+        redundant = redundant_configs({nodeid: coverage_items(data)
+                                       for nodeid, data in configs.items()})
+        lines.append("%d of %d configs can be dropped without losing any transition "
+                     "or band of timing margin" % (len(redundant), len(configs)))
+        lines.extend("  " + nodeid for nodeid in redundant)
+        return lines
+
+    def coverage_lines(self, source):
+        """ The lines of the transitions and timing margins covered by the
+            configs from a source.
+        """
+        merged = self.merged(source)
+        items_by_config = {nodeid: coverage_items(data)
+                           for nodeid, data in self.source_configs(source).items()}
+        lines = []
+
+        for machine in sorted(merged["transitions"]):
+            transitions = merged["transitions"][machine]
+            counts = transitions["counts"]
+            possible = transitions["possible"]
+            num_configs = {name: sum((machine, name) in items
+                                     for items in items_by_config.values())
+                           for name in counts}
+            covered = [name for name in possible if name in counts]
+            lines.append("%s: %d of %d transitions covered" %
+                         (machine, len(covered), len(possible)))
+            for name in possible:
+                if name in counts:
+                    lines.append("  %-55s %10d  %d configs" %
+                                 (name, counts[name], num_configs[name]))
+                else:
+                    lines.append("  %-55s  NOT COVERED" % name)
+            for name in sorted(set(counts) - set(possible)):
+                lines.append("  %-55s %10d  %d configs (not in the state machine)" %
+                             (name, counts[name], num_configs[name]))
+
+        if merged["margins"]:
+            lines.append("Timing margins (closest approach to each limit):")
+        for mode in sorted(merged["margins"]):
+            limits = merged["margins"][mode]
+            for name in sorted(limits):
+                margin = limits[name]
+                line = ("  %-15s %-12s limit %7.1fns, closest %8.1fns (%5.1f%%), %d checks" %
+                        (mode, name, margin["limit"] / 1e6, margin["closest"] / 1e6,
+                         100 * margin["closest"] / margin["limit"], margin["count"]))
+                if margin["underflow"]:
+                    line += ", %d violations" % margin["underflow"]
+                lines.append(line)
+        return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge and report the coverage of "
+                                                 "I2C test runs")
+    parser.add_argument("files", nargs="+", help="Coverage files written by --state-coverage")
+    parser.add_argument("--output", help="Write the merged coverage to this file")
+    args = parser.parse_args(argv)
+
+    report = CoverageReport.from_files(args.files)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report.to_json())
+    print("\n".join(report.lines()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Batch timing analysis of the SCL and SDA edges of a whole trace.
+
+The checkers measure the I2C timing parameters one edge at a time as the
+simulation runs. For long simulations and recorded traces it is much faster
+to collect the edges into NumPy arrays and measure every parameter at once.
+The same per-speed limits as the checkers are used (see i2c_timing), so the
+two report the same violations for a trace, though only the timing is
+checked here; the protocol is not decoded.
+
+All times are in femtoseconds.
+"""
+import numpy as np
+from i2c_timing import I2CTimingProfile, PARAMETER_NAMES, T_LOW, T_HIGH, \
+                       T_SU_STA, T_HD_STA, T_SU_DAT, T_VD_DAT, T_SU_STO, T_BUF
+
+SCL, SDA = "scl", "sda"
+
+class EdgeArrays(object):
+    """
+    The changes of a trace as arrays: the time of each change, whether it was
+    a change of SCL (rather than SDA), and the levels of SCL and SDA after it.
+    Changes at the same time are applied in the order they were given.
+    """
+
+    def __init__(self, time, is_scl, value):
+        self.time = np.asarray(time, dtype=np.float64)
+        self.is_scl = np.asarray(is_scl, dtype=bool)
+        value = np.asarray(value, dtype=np.int8)
+        self.scl = _levels(self.is_scl, value)
+        self.sda = _levels(~self.is_scl, value)
+
+    @classmethod
+    def from_changes(cls, changes, scl=SCL, sda=SDA):
+        """ Collect the (time, port, value) changes of a trace, such as the
+            bus model trace or the output of read_vcd_changes, where port is
+            scl or sda.
+        """
+        time, is_scl, value = [], [], []
+        for change_time, port, change_value in changes:
+            if port != scl and port != sda:
+                continue
+            time.append(change_time)
+            is_scl.append(port == scl)
+            value.append(change_value)
+        return cls(time, is_scl, value)
+
+    def __len__(self):
+        return len(self.time)
+
+def _levels(mask, value):
+    # Carry the value of the last masked change forward; the bus idles high
+    index = np.where(mask, np.arange(len(mask)), -1)
+    index = np.maximum.accumulate(index) if len(index) else index
+    return np.where(index >= 0, value[index], 1).astype(np.int8)
+
+def _previous(mask):
+    """ The index of the last change before each change for which mask is
+        set, or -1 if there is none.
+    """
+    index = np.where(mask, np.arange(len(mask)), -1)
+    if not len(index):
+        return index
+    index = np.maximum.accumulate(index)
+    return np.concatenate(([-1], index[:-1]))
+
+def _before(levels):
+    return np.concatenate(([1], levels[:-1])).astype(np.int8)
+
+class EdgeTimingAnalysis(object):
+    """
+    The timing parameters measured over a whole trace and checked against
+    the limits for a bus speed.
+
+    For each parameter, ``times[param]`` holds the time of the edge that
+    completes each measurement and ``values[param]`` the measurements, and
+    ``violations[param]`` the indices of the measurements outside the limits.
+    ``stretch`` holds the clock stretch of each SCL low period, estimated as
+    its excess over the median low period.
+    """
+
+    def __init__(self, edges, speed):
+        self.profile = I2CTimingProfile(speed)
+        self.times = {}
+        self.values = {}
+        self.violations = {}
+
+        time = edges.time
+        scl_before, sda_before = _before(edges.scl), _before(edges.sda)
+        scl_change = edges.is_scl & (edges.scl != scl_before)
+        sda_change = ~edges.is_scl & (edges.sda != sda_before)
+        scl_rise = scl_change & (edges.scl == 1)
+        scl_fall = scl_change & (edges.scl == 0)
+        starts = sda_change & (edges.sda == 0) & (edges.scl == 1)
+        stops = sda_change & (edges.sda == 1) & (edges.scl == 1)
+
+        prev_scl_change = _previous(scl_change)
+        self._measure(T_LOW, time, scl_rise, _previous(scl_fall))
+        self._measure(T_HIGH, time, scl_fall, _previous(scl_rise))
+        self._measure(T_SU_DAT, time, scl_rise, _previous(sda_change))
+        self._measure(T_VD_DAT, time, sda_change & (edges.scl == 0), prev_scl_change)
+        self._measure(T_SU_STA, time, starts, prev_scl_change)
+        self._measure(T_SU_STO, time, stops, prev_scl_change)
+
+        # The bus free time is from a STOP to the following START
+        prev_condition = _previous(starts | stops)
+        index = np.flatnonzero(starts)
+        index = index[prev_condition[index] >= 0]
+        after_stop = np.zeros(len(edges), dtype=bool)
+        after_stop[index] = stops[prev_condition[index]]
+        self._measure(T_BUF, time, after_stop, prev_condition)
+
+        # The start hold time is from a START to the next SCL fall
+        start_times = time[starts]
+        fall_times = time[scl_fall]
+        next_fall = np.searchsorted(fall_times, start_times, side="right")
+        held = next_fall < len(fall_times)
+        self._add(T_HD_STA, fall_times[next_fall[held]],
+                  fall_times[next_fall[held]] - start_times[held])
+
+        low = self.values[T_LOW]
+        self.stretch = np.maximum(low - np.median(low), 0) if len(low) else low
+
+    def _measure(self, param, time, mask, previous):
+        # Measure from the previous edge to each masked edge, if there is one
+        index = np.flatnonzero(mask)
+        start = previous[index]
+        index, start = index[start >= 0], start[start >= 0]
+        self._add(param, time[index], time[index] - time[start])
+
+    def _add(self, param, times, values):
+        self.times[param] = times
+        self.values[param] = values
+        self.violations[param] = np.flatnonzero(
+            (values < self.profile.min(param)) | (values > self.profile.max(param)))
+
+    @property
+    def num_violations(self):
+        return sum(len(indices) for indices in self.violations.values())
+
+    def violation_list(self):
+        """ All of the violations as (time, parameter name, value), in time
+            order.
+        """
+        violations = [(float(self.times[param][i]), PARAMETER_NAMES[param],
+                       float(self.values[param][i]))
+                      for param, indices in self.violations.items() for i in indices]
+        return sorted(violations)
+
+    def summary(self):
+        """ The count, minimum, maximum, mean and standard deviation of each
+            parameter and the number of violations, keyed by parameter name.
+            The clock stretch is included as "stretch".
+        """
+        summary = {}
+        for param in sorted(self.values):
+            summary[PARAMETER_NAMES[param]] = _summarise(self.values[param])
+            summary[PARAMETER_NAMES[param]]["violations"] = len(self.violations[param])
+        summary["stretch"] = _summarise(self.stretch)
+        summary["stretch"]["stretched"] = int(np.count_nonzero(self.stretch))
+        return summary
+
+    def report(self):
+        print("Edge timing (%s)" % (self.profile.mode or "no limits"))
+        for name, stats in self.summary().items():
+            if not stats["count"]:
+                print("  %-8s no measurements" % name)
+                continue
+            print("  %-8s count %d, min %.0fns, mean %.0fns, max %.0fns, stddev %.0fns%s" %
+                  (name, stats["count"], stats["min"] / 1e6, stats["mean"] / 1e6,
+                   stats["max"] / 1e6, stats["stddev"] / 1e6,
+                   ", %d violations" % stats["violations"] if stats.get("violations") else ""))
+
+def _summarise(values):
+    if not len(values):
+        return {"count": 0}
+    return {"count": len(values),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "stddev": float(values.std(ddof=1)) if len(values) > 1 else 0.0}
+
+def analyze_edges(changes, speed, scl=SCL, sda=SDA):
+    """ Measure the timing of the (time, port, value) changes of a trace
+        against the limits for speed (in kbps).
+    """
+    return EdgeTimingAnalysis(EdgeArrays.from_changes(changes, scl, sda), speed)
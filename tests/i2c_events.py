@@ -0,0 +1,258 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Structured events describing the traffic seen on an I2C bus by the checkers.
+
+The checkers emit events to one or more sinks. The text renderers reproduce
+the free text output of the checkers, while the list, JSONL and binary sinks
+record the events so that they can be grouped into transactions and compared
+against an expected transaction list (see also i2c_golden, which compares the
+events as they arrive).
+"""
+from collections import namedtuple
+import json
+import struct
+import sys
+
+# Event kinds
+(START, REPEATED_START, STOP, ADDRESS, BYTE, ACK,
+ VIOLATION, ERROR, WARNING) = range(9)
+
+KIND_NAMES = ("START", "REPEATED_START", "STOP", "ADDRESS", "BYTE", "ACK",
+              "VIOLATION", "ERROR", "WARNING")
+
+# Senders of ADDRESS, BYTE and ACK events
+MASTER, SLAVE = range(2)
+
+SENDER_NAMES = ("MASTER", "SLAVE")
+
+#
+# time:   simulator time of the event in femtoseconds
+# kind:   one of the event kinds above
+# value:  the byte for ADDRESS and BYTE events (the address byte includes the
+#         read/write bit), the SDA level (0 for ACK, 1 for NACK) for ACK events
+# sender: MASTER or SLAVE for ADDRESS, BYTE and ACK events
+# detail: the measured speed in kbps for ADDRESS and BYTE events (if known),
+#         the message for VIOLATION, ERROR and WARNING events
+#
+Event = namedtuple("Event", ["time", "kind", "value", "sender", "detail"])
+Event.__new__.__defaults__ = (None, None, None)
+
+PROBLEM_KINDS = (VIOLATION, ERROR, WARNING)
+
+class ListSink(object):
+    """ Keep the events in memory.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+class TextRenderer(object):
+    """ Print the text produced by a render function for each event. The
+        render function returns the list of lines for an event.
+    """
+
+    def __init__(self, render, file=None):
+        self._render = render
+        self._file = file
+
+    def __call__(self, event):
+        for line in self._render(event):
+            print(line, file=self._file or sys.stdout)
+
+def event_to_dict(event):
+    record = {"time": event.time, "kind": KIND_NAMES[event.kind]}
+    if event.value is not None:
+        record["value"] = event.value
+    if event.sender is not None:
+        record["sender"] = SENDER_NAMES[event.sender]
+    if event.detail is not None:
+        record["detail"] = event.detail
+    return record
+
+def event_from_dict(record):
+    sender = record.get("sender")
+    return Event(record["time"], KIND_NAMES.index(record["kind"]),
+                 record.get("value"),
+                 SENDER_NAMES.index(sender) if sender is not None else None,
+                 record.get("detail"))
+
+class JsonlSink(object):
+    """ Write each event as a JSON object on its own line.
+    """
+
+    def __init__(self, file):
+        self._file = file
+
+    def __call__(self, event):
+        self._file.write(json.dumps(event_to_dict(event)) + "\n")
+
+def read_jsonl_events(file):
+    for line in file:
+        if line.strip():
+            yield event_from_dict(json.loads(line))
+
+#
+# Binary records are a fixed header followed by the detail:
+#
+#   time (double), kind (uint8), sender (uint8, 0xff if none),
+#   value (int16, -1 if none), detail tag (uint8)
+#
+# The detail tag is one of DETAIL_NONE, DETAIL_INT (followed by an int32),
+# DETAIL_FLOAT (double) or DETAIL_STR (uint16 length and UTF-8 bytes).
+#
+_HEADER = struct.Struct("<dBBhB")
+DETAIL_NONE, DETAIL_INT, DETAIL_FLOAT, DETAIL_STR = range(4)
+_DETAIL_INT = struct.Struct("<i")
+_DETAIL_FLOAT = struct.Struct("<d")
+_DETAIL_STR_LEN = struct.Struct("<H")
+
+class BinarySink(object):
+    """ Write each event as a compact binary record to a file opened in binary
+        mode.
+    """
+
+    def __init__(self, file):
+        self._file = file
+
+    def __call__(self, event):
+        detail = event.detail
+        if detail is None:
+            tag, payload = DETAIL_NONE, b""
+        elif isinstance(detail, int):
+            tag, payload = DETAIL_INT, _DETAIL_INT.pack(detail)
+        elif isinstance(detail, float):
+            tag, payload = DETAIL_FLOAT, _DETAIL_FLOAT.pack(detail)
+        else:
+            text = str(detail).encode("utf-8")
+            tag, payload = DETAIL_STR, _DETAIL_STR_LEN.pack(len(text)) + text
+
+        self._file.write(_HEADER.pack(
+            event.time, event.kind,
+            0xff if event.sender is None else event.sender,
+            -1 if event.value is None else event.value,
+            tag) + payload)
+
+def read_binary_events(file):
+    while True:
+        header = file.read(_HEADER.size)
+        if not header:
+            return
+        if len(header) != _HEADER.size:
+            raise ValueError("Truncated event record")
+
+        time, kind, sender, value, tag = _HEADER.unpack(header)
+        if tag == DETAIL_NONE:
+            detail = None
+        elif tag == DETAIL_INT:
+            detail, = _DETAIL_INT.unpack(file.read(_DETAIL_INT.size))
+        elif tag == DETAIL_FLOAT:
+            detail, = _DETAIL_FLOAT.unpack(file.read(_DETAIL_FLOAT.size))
+        elif tag == DETAIL_STR:
+            length, = _DETAIL_STR_LEN.unpack(file.read(_DETAIL_STR_LEN.size))
+            detail = file.read(length).decode("utf-8")
+        else:
+            raise ValueError("Unknown event detail tag %d" % tag)
+
+        yield Event(time, kind, None if value == -1 else value,
+                    None if sender == 0xff else sender, detail)
+
+#
+# mode:    "w" for a master write, "r" for a master read
+# address: 7-bit device address
+# data:    the bytes transferred after the address
+# acks:    True (ACK) or False (NACK) for the address and each data byte
+#
+Transaction = namedtuple("Transaction", ["mode", "address", "data", "acks"])
+Transaction.__new__.__defaults__ = (None,)
+
+class TransactionSink(object):
+    """ Group events into transactions as they arrive, calling
+        on_transaction(transaction) as each one completes and
+        on_problem(event) for each violation, error or warning. Each address
+        byte starts a new transaction, so a repeated start splits transactions.
+        Call flush() at the end of the events to complete the last one.
+    """
+
+    def __init__(self, on_transaction, on_problem=None):
+        self._on_transaction = on_transaction
+        self._on_problem = on_problem
+        self._current = None
+
+    def __call__(self, event):
+        kind = event.kind
+        if kind == ADDRESS:
+            self.flush()
+            self._current = Transaction("r" if event.value & 1 else "w",
+                                        event.value >> 1, [], [])
+        elif kind in PROBLEM_KINDS:
+            if self._on_problem is not None:
+                self._on_problem(event)
+        elif self._current is None:
+            pass
+        elif kind == BYTE:
+            self._current.data.append(event.value)
+        elif kind == ACK:
+            self._current.acks.append(event.value == 0)
+        elif kind in (START, REPEATED_START, STOP):
+            self.flush()
+
+    def flush(self):
+        if self._current is not None:
+            current, self._current = self._current, None
+            self._on_transaction(current)
+
+def group_transactions(events):
+    """ Group the events into a list of transactions (see TransactionSink).
+    """
+    transactions = []
+    sink = TransactionSink(transactions.append)
+    for event in events:
+        sink(event)
+    sink.flush()
+    return transactions
+
+def diff_transaction(index, expected, actual):
+    """ Compare one actual transaction against the expected one and return a
+        list of differences (empty if they match). The expected transaction
+        can be given as a tuple and the acks left as None if they should not
+        be checked.
+    """
+    differences = []
+    exp = Transaction(*expected)
+    if exp.mode != actual.mode or exp.address != actual.address:
+        differences.append("Transaction %d: expected %s 0x%x, got %s 0x%x" %
+                           (index, exp.mode, exp.address, actual.mode, actual.address))
+    if list(exp.data) != actual.data:
+        differences.append("Transaction %d: expected data [%s], got [%s]" %
+                           (index, ", ".join("0x%x" % d for d in exp.data),
+                            ", ".join("0x%x" % d for d in actual.data)))
+    if exp.acks is not None and list(exp.acks) != actual.acks:
+        differences.append("Transaction %d: expected acks %s, got %s" %
+                           (index, list(exp.acks), actual.acks))
+    return differences
+
+def diff_transactions(expected, actual):
+    """ Compare the actual transactions against the expected ones in a single
+        pass and return a list of differences (empty if they match), see
+        diff_transaction.
+    """
+    differences = []
+    for index, (exp, act) in enumerate(zip(expected, actual)):
+        differences.extend(diff_transaction(index, exp, act))
+
+    if len(expected) != len(actual):
+        differences.append("Expected %d transactions, got %d" %
+                           (len(expected), len(actual)))
+    return differences
+
+def diff_events(expected, events):
+    """ Compare the events against a list of expected transactions and report
+        any timing violations, errors or warnings as differences.
+    """
+    differences = ["%s @ %s: %s" % (KIND_NAMES[event.kind], event.time, event.detail)
+                   for event in events if event.kind in PROBLEM_KINDS]
+    return differences + diff_transactions(expected, group_transactions(events))
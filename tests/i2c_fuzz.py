@@ -0,0 +1,372 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Seeded random traffic for the master and slave checkers.
+
+Each seed gives a case: a random sequence of reads and writes with random
+addresses, lengths, NACK positions and repeated starts, at a random speed
+and (for the master) with a random clock stretch. A master case is run with
+I2CMasterChecker acting as the slave device against the behavioural model of
+i2c_master() in i2c_bus_model, and a slave case with I2CSlaveChecker acting
+as the master against the model of i2c_slave(). The expected records and
+results are computed from the case by the golden model in i2c_golden rather
+than written by hand.
+
+A case which fails is shrunk by removing operations and bytes and
+simplifying the rest while it still fails, to give a small reproduction.
+
+firmware_runner() runs the cases on the firmware of i2c_fuzz_test under the
+simulator instead of the models, checked by the same golden model and shrunk
+in the same way. The firmware reads each case from a file at run time, so
+that one binary runs every case. This takes seconds per case rather than
+milliseconds, so only a subset of the seeds is run on the firmware nightly.
+
+Usage:
+
+  python i2c_fuzz.py --seeds 10000
+  python i2c_fuzz.py --side master --start 1234 --seeds 1
+
+Each failing seed is printed with its shrunk case, and the exit status is
+non-zero if any seed failed.
+"""
+import argparse
+import random
+import sys
+from collections import namedtuple
+from pathlib import Path
+from i2c_bus_model import I2CBusModel, I2CMasterModel, I2CSlaveModel, I2CSlaveDeviceModel
+from i2c_master_checker import I2CMasterChecker
+from i2c_slave_checker import I2CSlaveChecker
+from i2c_golden import GoldenSink, master_golden, slave_golden, diff_run
+from i2c_scenarios import fuzz_master_test, fuzz_slave_test
+
+SPEEDS = (10, 100, 400, 1000)
+
+# The clock stretch (in ns) applied by the master checker after each falling
+# edge of SCL
+CLOCK_STRETCHES = (0, 500, 5000)
+
+# The address of the slave model in the slave cases
+SLAVE_ADDRESS = 0x3c
+
+MAX_OPS = 6
+MAX_BYTES = 4
+
+# The file from which i2c_fuzz_test reads its case, in the working directory
+# of the simulator
+FIRMWARE_CASE_FILE = "fuzz_case.bin"
+
+# The ports of i2c_fuzz_test
+FIRMWARE_SCL_PORT = "tile[0]:XS1_PORT_1A"
+FIRMWARE_SDA_PORT = "tile[0]:XS1_PORT_1B"
+
+#
+# speed:         master or bus speed in kbps
+# clock_stretch: clock stretch of the master checker in ns (0 for slave cases)
+# ops:           ("w", address, data, send_stop_bit) or
+#                ("r", address, num_bytes, send_stop_bit)
+# tx_data:       the bytes returned to reads by the checker or slave device
+# ack_sequence:  True (ACK) or False (NACK) for each address and byte
+#                written to the master checker, or for each byte written to
+#                the slave device
+#
+Case = namedtuple("Case", ["speed", "clock_stretch", "ops", "tx_data", "ack_sequence"])
+
+def random_ops(rng, addresses):
+    ops = []
+    for _ in range(rng.randint(1, MAX_OPS)):
+        address = addresses(rng)
+        stop = rng.random() < 0.7
+        if rng.random() < 0.5:
+            data = [rng.randrange(256) for _ in range(rng.randint(0, MAX_BYTES))]
+            ops.append(("w", address, data, stop))
+        else:
+            ops.append(("r", address, rng.randint(1, MAX_BYTES), stop))
+    return ops
+
+def master_case(seed):
+    """ The random master case of a seed.
+    """
+    rng = random.Random(seed)
+    ops = random_ops(rng, lambda rng: rng.randrange(0x08, 0x78))
+    num_acks = sum(1 + (len(op[2]) if op[0] == "w" else 0) for op in ops)
+    num_tx = sum(op[2] for op in ops if op[0] == "r")
+    return Case(speed = rng.choice(SPEEDS),
+                clock_stretch = rng.choice(CLOCK_STRETCHES),
+                ops = ops,
+                tx_data = [rng.randrange(256) for _ in range(num_tx)],
+                ack_sequence = [rng.random() < 0.8 for _ in range(num_acks)])
+
+def slave_case(seed):
+    """ The random slave case of a seed.
+    """
+    rng = random.Random(seed)
+    def address(rng):
+        return SLAVE_ADDRESS if rng.random() < 0.7 else rng.choice([0x3d, 0x44, 0x1c, 0x7c])
+    ops = random_ops(rng, address)
+    num_acks = sum(len(op[2]) for op in ops if op[0] == "w")
+    return Case(speed = rng.choice(SPEEDS),
+                clock_stretch = 0,
+                ops = ops,
+                tx_data = [rng.randrange(256) for _ in range(rng.randint(1, 8))],
+                ack_sequence = [rng.random() < 0.8 for _ in range(num_acks)])
+
+def master_program(case):
+    """ The program of the master model for a case, which ends with a stop
+        bit.
+    """
+    program = list(case.ops)
+    if not program[-1][3]:
+        program.append(("stop",))
+    return program
+
+def slave_tsequence(case):
+    """ The transactions of the slave checker for a case, the last of which
+        ends with a stop bit.
+    """
+    ops = list(case.ops)
+    mode, address, arg, _ = ops[-1]
+    ops[-1] = (mode, address, arg, True)
+    return ops
+
+def master_checker(case, sink, scl_port="scl", sda_port="sda"):
+    """ The checker of a master case, which sends its events to sink.
+    """
+    # The speed is only checked without clock stretching, as the stretch
+    # slows the bits down
+    return I2CMasterChecker(scl_port, sda_port,
+                            tx_data = list(case.tx_data),
+                            expected_speed = None if case.clock_stretch else case.speed,
+                            clock_stretch = case.clock_stretch,
+                            ack_sequence = list(case.ack_sequence),
+                            original_speed = case.speed,
+                            event_sink = sink,
+                            text_output = False)
+
+def slave_checker(case, tsequence, sink, scl_port="scl", sda_port="sda"):
+    """ The checker of a slave case running tsequence, which sends its events
+        to sink. The slave is i2c_slave() or its model.
+    """
+    return I2CSlaveChecker(scl_port, sda_port,
+                           tsequence = tsequence,
+                           speed = case.speed,
+                           event_sink = sink,
+                           text_output = False,
+                           slave_firmware = "i2c_slave")
+
+def run_master_case(case):
+    """ Run a master case and return a list of differences from the expected
+        behaviour (empty if it passed).
+    """
+    bus = I2CBusModel()
+    program = master_program(case)
+    master = I2CMasterModel(bus, "scl", "sda", case.speed, program)
+    golden = master_golden(program, case.tx_data, case.ack_sequence)
+    sink = GoldenSink(golden.records)
+    checker = master_checker(case, sink)
+    bus.register_simthread(checker)
+    bus.add_model(master.run())
+    bus.run()
+
+    differences = sink.finish()
+    if master.results != golden.results:
+        differences.append("Expected master results %s, got %s" % (golden.results, master.results))
+    return differences
+
+def run_slave_case(case):
+    """ Run a slave case and return a list of differences from the expected
+        behaviour (empty if it passed).
+    """
+    bus = I2CBusModel()
+    device = I2CSlaveDeviceModel(tx_data = list(case.tx_data),
+                                 ack_sequence = list(case.ack_sequence))
+    slave = I2CSlaveModel(bus, "scl", "sda", SLAVE_ADDRESS, device)
+    tsequence = slave_tsequence(case)
+    golden = slave_golden(tsequence, SLAVE_ADDRESS, case.tx_data, case.ack_sequence)
+    sink = GoldenSink(golden.records)
+    checker = slave_checker(case, tsequence, sink)
+    bus.register_simthread(checker)
+    bus.add_model(slave.run())
+    bus.run()
+
+    received = [callback[1] for callback in golden.results
+                if callback[0] == "master_sent_data"]
+    num_stop_bits = golden.results.count(("stop_bit",))
+    differences = sink.finish()
+    if device.received != received:
+        differences.append("Expected the slave to receive %s, got %s" %
+                           (received, device.received))
+    if device.num_stop_bits != num_stop_bits:
+        differences.append("Expected %d stop bits, got %d" %
+                           (num_stop_bits, device.num_stop_bits))
+    return differences
+
+def master_case_bytes(case):
+    """ The master case as read by i2c_fuzz_test: the number of operations,
+        then the mode ("w", "r" or "s" for a stop bit), address, length and
+        send_stop_bit of each, followed by the data of a write.
+    """
+    program = master_program(case)
+    data = [len(program)]
+    for op in program:
+        if op[0] == "stop":
+            data += [ord("s"), 0, 0, 0]
+            continue
+        mode, address, arg, stop = op
+        if mode == "w":
+            data += [ord(mode), address, len(arg), int(stop)] + list(arg)
+        else:
+            data += [ord(mode), address, arg, int(stop)]
+    return bytes(data)
+
+def slave_case_bytes(case):
+    """ The slave case as read by i2c_fuzz_test: the number of writes to the
+        slave in the case, after which the application exits on the next,
+        then the length and bytes of tx_data and of ack_sequence.
+    """
+    golden = slave_golden(slave_tsequence(case), SLAVE_ADDRESS,
+                          case.tx_data, case.ack_sequence)
+    num_writes = golden.results.count(("ack_write_request",))
+    return bytes([num_writes, len(case.tx_data)] + list(case.tx_data) +
+                 [len(case.ack_sequence)] + [int(ack) for ack in case.ack_sequence])
+
+def firmware_runner(side, binary, capfd):
+    """ A run for the cases of a side which runs them on i2c_fuzz_test under
+        the simulator rather than on the models. binary(case) is the path of
+        the binary for a case, and capfd captures the output of the
+        simulator. Each case is written to FIRMWARE_CASE_FILE in the working
+        directory, from which the firmware reads it.
+    """
+    def run(case):
+        if side == "master":
+            expected = fuzz_master_test(master_program(case),
+                                        case.tx_data, case.ack_sequence)
+            sink = GoldenSink(expected.records)
+            checker = master_checker(case, sink, FIRMWARE_SCL_PORT, FIRMWARE_SDA_PORT)
+            data = master_case_bytes(case)
+        else:
+            tsequence = slave_tsequence(case)
+            expected = fuzz_slave_test(tsequence, SLAVE_ADDRESS,
+                                       case.tx_data, case.ack_sequence)
+            sink = GoldenSink(expected.records)
+            # The application exits when the final empty write asks for an ACK
+            checker = slave_checker(case, tsequence + [("w", SLAVE_ADDRESS, [], True)],
+                                    sink, FIRMWARE_SCL_PORT, FIRMWARE_SDA_PORT)
+            data = slave_case_bytes(case)
+        Path(FIRMWARE_CASE_FILE).write_bytes(data)
+
+        # Only the firmware runs need Pyxsim (see conftest.sim_cache_key)
+        import Pyxsim
+        Pyxsim.run_on_simulator_(
+            binary(case),
+            do_xe_prebuild = False,
+            simthreads = [checker],
+            simargs = ['--weak-external-drive'],
+            capfd = capfd
+            )
+        out, _ = capfd.readouterr()
+        return diff_run(sink, expected.output, out)
+    return run
+
+def check_case(run, case):
+    """ Run a case, reporting an exception from the models or checker as a
+        difference so that it can be shrunk like any other failure.
+    """
+    try:
+        return run(case)
+    except Exception as e:
+        return ["%s: %s" % (type(e).__name__, e)]
+
+def reductions(case):
+    """ Generate the cases one step simpler than a case, simplest first.
+    """
+    ops = case.ops
+    if len(ops) > 1:
+        for k in range(len(ops)):
+            yield case._replace(ops = ops[:k] + ops[k + 1:])
+    if case.clock_stretch:
+        yield case._replace(clock_stretch = 0)
+    for k, (mode, address, arg, stop) in enumerate(ops):
+        if mode == "w":
+            for b in range(len(arg)):
+                op = (mode, address, arg[:b] + arg[b + 1:], stop)
+                yield case._replace(ops = ops[:k] + [op] + ops[k + 1:])
+        elif arg > 1:
+            op = (mode, address, arg - 1, stop)
+            yield case._replace(ops = ops[:k] + [op] + ops[k + 1:])
+        if not stop:
+            op = (mode, address, arg, True)
+            yield case._replace(ops = ops[:k] + [op] + ops[k + 1:])
+    for k, ack in enumerate(case.ack_sequence):
+        if not ack:
+            acks = list(case.ack_sequence)
+            acks[k] = True
+            yield case._replace(ack_sequence = acks)
+    if case.ack_sequence:
+        yield case._replace(ack_sequence = case.ack_sequence[:-1])
+    if len(case.tx_data) > 1:
+        yield case._replace(tx_data = case.tx_data[:-1])
+
+def shrink(run, case, differences):
+    """ Shrink a failing case, returning the smallest case found that still
+        fails and its differences.
+    """
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        for candidate in reductions(case):
+            candidate_differences = check_case(run, candidate)
+            if candidate_differences:
+                case, differences = candidate, candidate_differences
+                shrinking = True
+                break
+    return case, differences
+
+SIDES = {"master": (master_case, run_master_case),
+         "slave": (slave_case, run_slave_case)}
+
+def fuzz(side, seeds, run=None):
+    """ Run the cases of the seeds for the master or slave side, returning
+        a list of (seed, shrunk case, differences) for each seed that failed.
+        The cases are run on the models unless another run is given.
+    """
+    make_case, model_run = SIDES[side]
+    run = run or model_run
+    failures = []
+    for seed in seeds:
+        case = make_case(seed)
+        differences = check_case(run, case)
+        if differences:
+            case, differences = shrink(run, case, differences)
+            failures.append((seed, case, differences))
+    return failures
+
+def format_failure(side, seed, case, differences):
+    lines = ["%s seed %d fails, shrunk to:" % (side, seed),
+             "  speed=%d clock_stretch=%d" % (case.speed, case.clock_stretch)]
+    for mode, address, arg, stop in case.ops:
+        arg = "[%s]" % ", ".join("0x%02x" % b for b in arg) if mode == "w" else arg
+        lines.append("  %s 0x%02x %s%s" % (mode, address, arg, "" if stop else " (no stop)"))
+    lines.append("  tx_data=[%s]" % ", ".join("0x%02x" % b for b in case.tx_data))
+    lines.append("  ack_sequence=%s" % [int(ack) for ack in case.ack_sequence])
+    lines.extend("  " + difference for difference in differences)
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz the I2C checkers and models")
+    parser.add_argument("--side", choices=sorted(SIDES), action="append",
+                        help="Side to fuzz (default both)")
+    parser.add_argument("--start", type=int, default=0, help="First seed")
+    parser.add_argument("--seeds", type=int, default=1000, help="Number of seeds")
+    args = parser.parse_args(argv)
+
+    num_failures = 0
+    for side in args.side or sorted(SIDES):
+        for seed, case, differences in fuzz(side, range(args.start, args.start + args.seeds)):
+            print(format_failure(side, seed, case, differences))
+            num_failures += 1
+    print("%d failing seeds" % num_failures, file=sys.stderr)
+    return 1 if num_failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
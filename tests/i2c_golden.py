@@ -0,0 +1,301 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Golden model of the I2C transaction semantics.
+
+A test describes its scenario: the operations that the firmware makes and
+the behaviour of the checker or device at the other end of the bus. The
+model computes from it the records that the checker should see and the
+results that the firmware should get, from which the test formats the
+output that the firmware should print. The records are:
+
+  START, REPEATED_START, STOP  the framing events of i2c_events
+  Transaction                  an address and the bytes that follow it
+
+GoldenSink compares the events of a checker against the records as they
+arrive. It holds neither the events nor any text, so runs of hundreds of
+thousands of transactions are checked in constant memory beyond the records
+themselves.
+"""
+from collections import namedtuple
+import hashlib
+import json
+from i2c_events import Transaction, TransactionSink, diff_transaction, \
+                       START, REPEATED_START, STOP, KIND_NAMES
+
+FRAMING_KINDS = (START, REPEATED_START, STOP)
+
+# The byte sent by the master checker once its tx_data has been used up
+CHECKER_DEFAULT_DATA = 0xab
+
+# The byte read from an address that no device ACKs, as the bus is pulled up
+IDLE_BUS_DATA = 0xff
+
+# The number of differences reported by GoldenSink before it only counts them
+MAX_DIFFERENCES = 20
+
+#
+# records: the records that the checker should see, in order
+# results: the results of the operations of a master, or the callbacks made
+#          to the device of a slave
+#
+Golden = namedtuple("Golden", ["records", "results"])
+
+def master_golden(ops, tx_data=(), ack_sequence=()):
+    """ The golden model of a master making a sequence of operations against
+        I2CMasterChecker with the given tx_data and ack_sequence. The
+        operations are:
+
+          ("w", device, data, send_stop_bit)
+          ("r", device, num_bytes, send_stop_bit)
+          ("t", device, write_data, num_read_bytes)
+          ("stop",)
+
+        where "t" is a transfer (a write, then a read after a repeated start
+        if every byte of the write is ACKed, then a stop bit). Devices are
+        truncated to 7 bits as the master does.
+
+        The results are (ack, num_bytes_sent) for each write, and (ack, data)
+        for each read and transfer, where ack is True for an ACK.
+    """
+    acks = iter(ack_sequence)
+    tx = iter(tx_data)
+    next_ack = lambda: next(acks, True)
+    next_tx = lambda: next(tx, CHECKER_DEFAULT_DATA)
+    records = []
+    results = []
+
+    def write(device, data):
+        ack = next_ack()
+        sent, op_acks = [], [ack]
+        if ack:
+            for byte in data:
+                ack = next_ack()
+                sent.append(byte)
+                op_acks.append(ack)
+                if not ack:
+                    break
+        records.append(Transaction("w", device, sent, op_acks))
+        return ack, len(sent)
+
+    def read(device, num_bytes):
+        ack = next_ack()
+        # The checker takes the first byte when it sees the address
+        first = next_tx()
+        if not ack:
+            records.append(Transaction("r", device, [], [False]))
+            return False, []
+        data = [first] + [next_tx() for _ in range(num_bytes - 1)]
+        records.append(Transaction("r", device, data, [True] * num_bytes + [False]))
+        return True, data
+
+    stopped = True
+    for op in ops:
+        if op[0] == "stop":
+            records.append(STOP)
+            stopped = True
+            continue
+
+        mode, device, arg, send_stop_bit = op
+        device &= 0x7f
+        records.append(START if stopped else REPEATED_START)
+        if mode == "w":
+            results.append(write(device, arg))
+        elif mode == "r":
+            results.append(read(device, arg))
+        elif mode == "t":
+            ack, _ = write(device, op[2])
+            data = []
+            if ack:
+                records.append(REPEATED_START)
+                ack, data = read(device, op[3])
+            results.append((ack, data))
+            send_stop_bit = True
+        else:
+            raise ValueError("Unknown operation %r" % (op,))
+
+        if send_stop_bit:
+            records.append(STOP)
+        stopped = bool(send_stop_bit)
+    return Golden(records, results)
+
+def slave_golden(tsequence, device_addr, tx_data, ack_sequence=(), exit_data=None):
+    """ The golden model of a slave at device_addr against I2CSlaveChecker
+        running tsequence (see I2CSlaveChecker). The application of the slave
+        ACKs every address, ACKs written bytes according to ack_sequence
+        (then always) and returns tx_data cyclically to reads, like
+        I2CSlaveDeviceModel. If exit_data is given the application exits when
+        it is sent that byte, which ends the records.
+
+        The results are the callbacks made to the application, in order:
+
+          ("ack_write_request",)
+          ("ack_read_request",)
+          ("master_sent_data", byte)
+          ("master_requires_data", byte)
+          ("stop_bit",)
+
+        The slave is only told of a stop bit if it was addressed since the
+        previous one.
+    """
+    acks = iter(ack_sequence)
+    tx_index = 0
+    records = []
+    callbacks = []
+    addressed = False
+    repeated = False
+    for mode, address, arg, *stop in tsequence:
+        stop = stop[0] if stop else True
+        ours = (address == device_addr)
+        addressed = addressed or ours
+        records.append(REPEATED_START if repeated else START)
+        if mode == "w":
+            if ours:
+                callbacks.append(("ack_write_request",))
+            data, op_acks = [], [ours]
+            for byte in arg:
+                data.append(byte)
+                if ours:
+                    callbacks.append(("master_sent_data", byte))
+                    if byte == exit_data:
+                        records.append(Transaction("w", address, data, op_acks))
+                        return Golden(records, callbacks)
+                    op_acks.append(next(acks, True))
+                else:
+                    op_acks.append(False)
+            records.append(Transaction("w", address, data, op_acks))
+        else:
+            if ours:
+                callbacks.append(("ack_read_request",))
+                data = []
+                for _ in range(arg):
+                    data.append(tx_data[tx_index])
+                    callbacks.append(("master_requires_data", tx_data[tx_index]))
+                    tx_index = (tx_index + 1) % len(tx_data)
+            else:
+                data = [IDLE_BUS_DATA] * arg
+            records.append(Transaction("r", address, data, [ours] + [True] * (arg - 1) + [False]))
+
+        if stop:
+            records.append(STOP)
+            if addressed:
+                callbacks.append(("stop_bit",))
+            addressed = False
+        repeated = not stop
+    return Golden(records, callbacks)
+
+def record_to_json(record):
+    if record in FRAMING_KINDS:
+        return KIND_NAMES[record]
+    record = Transaction(*record)
+    return [record.mode, record.address, list(record.data),
+            None if record.acks is None else list(record.acks)]
+
+def describe_record(record):
+    if record in FRAMING_KINDS:
+        return KIND_NAMES[record]
+    record = Transaction(*record)
+    text = "%s 0x%x [%s]" % (record.mode, record.address,
+                             ", ".join("0x%x" % d for d in record.data))
+    if record.acks is not None:
+        text += " acks %s" % [int(ack) for ack in record.acks]
+    return text
+
+class GoldenSink(object):
+    """ An event sink which compares the events of a checker against the
+        records of the golden model as they arrive, reporting any violation,
+        error or warning as a difference. Transactions are compared with
+        diff_transaction, so the acks of an expected record can be left as
+        None. Call finish() at the end of the events to get the differences.
+    """
+
+    def __init__(self, records, max_differences=MAX_DIFFERENCES):
+        self.records = records
+        self._max_differences = max_differences
+        self._index = 0
+        self._num_differences = 0
+        self.differences = []
+        self._transactions = TransactionSink(self._check, self._problem)
+
+    def cache_params(self):
+        """ The parameters which determine the outcome of a comparison, used
+            to cache the results of simulations.
+        """
+        text = json.dumps([record_to_json(record) for record in self.records])
+        return {"records": hashlib.sha256(text.encode()).hexdigest()}
+
+    def __call__(self, event):
+        # Any transaction in progress is completed before the framing event
+        self._transactions(event)
+        if event.kind in FRAMING_KINDS:
+            self._check(event.kind)
+
+    def _report(self, difference):
+        self._num_differences += 1
+        if len(self.differences) < self._max_differences:
+            self.differences.append(difference)
+
+    def _problem(self, event):
+        self._report("%s @ %s: %s" % (KIND_NAMES[event.kind], event.time, event.detail))
+
+    def _check(self, actual):
+        index = self._index
+        self._index += 1
+        if index >= len(self.records):
+            return
+        expected = self.records[index]
+        if expected in FRAMING_KINDS or actual in FRAMING_KINDS:
+            if expected != actual:
+                self._report("Record %d: expected %s, got %s" %
+                             (index, describe_record(expected), describe_record(actual)))
+        else:
+            for difference in diff_transaction(index, expected, actual):
+                self._report(difference)
+
+    def finish(self):
+        """ Complete the last transaction and return the differences (empty
+            if the events matched the records).
+        """
+        self._transactions.flush()
+        num_records = len(self.records)
+        if self._index < num_records:
+            self._report("Expected %d records, got %d, next expected %s" %
+                         (num_records, self._index,
+                          describe_record(self.records[self._index])))
+        elif self._index > num_records:
+            self._report("Expected %d records, got %d" % (num_records, self._index))
+        num_dropped = self._num_differences - len(self.differences)
+        if num_dropped:
+            self.differences.append("... and %d more differences" % num_dropped)
+        return self.differences
+
+def firmware_output(out):
+    """ The lines printed by the xCORE in the output of a simulation.
+    """
+    return [line.strip() for line in out.splitlines()
+            if line.strip().lower().startswith("xcore")]
+
+def diff_output(expected, actual):
+    """ Compare the lines printed by the xCORE against the expected lines and
+        return a list of differences (empty if they match).
+    """
+    differences = ["Output line %d: expected '%s', got '%s'" % (index, exp, act)
+                   for index, (exp, act) in enumerate(zip(expected, actual))
+                   if exp != act]
+    if len(expected) > len(actual):
+        differences.append("Missing output lines %s" % expected[len(actual):])
+    elif len(actual) > len(expected):
+        differences.append("Unexpected output lines %s" % actual[len(expected):])
+    return differences
+
+def diff_run(golden, output, out):
+    """ Return the differences of a run from the records of a GoldenSink and
+        the expected output lines of the xCORE, given the output of the
+        simulation.
+    """
+    return golden.finish() + diff_output(output, firmware_output(out))
+
+def debug_hex(value):
+    """ Format a value as debug_printf() does for %x, with upper case digits.
+    """
+    return "%X" % value
@@ -1,17 +1,102 @@
 # Copyright 2014-2025 XMOS LIMITED.
 # This Software is subject to the terms of the XMOS Public Licence: Version 1.
-import Pyxsim as px
+try:
+    from Pyxsim import SimThread
+except ImportError:
+    # Without the XMOS test support the checker can still run on the bus model
+    from i2c_bus_model import SimThread
+from i2c_timing import I2CTimingProfile, T_LOW_MIN, T_HIGH_MIN, T_SU_STA_MIN, \
+                       T_HD_STA_MIN, T_SU_DAT_MIN, T_VD_DAT_MAX, T_SU_STO_MIN, \
+                       T_BUF_MIN, StreamingStats, BitTimingStats
+from i2c_events import Event, TextRenderer, START, REPEATED_START, STOP, \
+                       ADDRESS, BYTE, ACK, VIOLATION, ERROR, WARNING, MASTER, SLAVE
+from i2c_coverage import active_coverage
 
 VERBOSE = False
 
-class I2CMasterChecker(px.SimThread):
+# The speed errors have always been printed without the time
+SPEED_SLOWER = "speed is <1% slower than expected"
+SPEED_FASTER = "speed is faster than expected"
+
+def render_master_checker_text(event):
+    """ Render an event as the lines of text that the I2CMasterChecker has
+        always printed.
+    """
+    kind = event.kind
+    lines = []
+    if kind == START:
+        lines.append("Start bit received")
+    elif kind == REPEATED_START:
+        lines.append("Repeated start bit received")
+    elif kind == STOP:
+        lines.append("Stop bit received")
+    elif kind == ADDRESS or kind == BYTE:
+        if event.sender == MASTER:
+            lines.append("Byte received: 0x%x" % event.value)
+        else:
+            lines.append("Byte sent")
+        if event.detail is not None:
+            lines.append("Speed = %d Kbps" % event.detail)
+        if kind == ADDRESS:
+            lines.append("Master %s transaction started, device address=0x%x" %
+                         ("write" if (event.value & 1) == 0 else "read", event.value >> 1))
+    elif kind == ACK:
+        if event.sender == SLAVE:
+            lines.append("Sending %s" % ("nack" if event.value else "ack"))
+        else:
+            lines.append("Master sends %s." % ("NACK" if event.value else "ACK"))
+            if event.value:
+                lines.append("Waiting for stop/start bit")
+    elif kind == VIOLATION and event.detail in (SPEED_SLOWER, SPEED_FASTER):
+        lines.append("ERROR: %s" % event.detail)
+    elif kind == VIOLATION or kind == ERROR:
+        lines.append("ERROR: %s @ %s" % (event.detail, event.time))
+    elif kind == WARNING:
+        lines.append("WARNING: %s" % event.detail)
+    return lines
+
+class PinsChangeOrTime(object):
+    """
+    Wait condition which is met as soon as any of the ports changes value or
+    the simulation reaches a given time. The deadline is exposed as
+    ``time`` so that event driven simulators can schedule the wake-up rather
+    than polling the condition.
+    """
+
+    def __init__(self, xsi, ports, time):
+        self.ports = ports
+        self.time = time
+        self._values = [xsi.sample_port_pins(port) for port in ports]
+
+    def __call__(self, xsi):
+        if xsi.get_time() >= self.time:
+            return True
+        for port, value in zip(self.ports, self._values):
+            if xsi.sample_port_pins(port) != value:
+                return True
+        return False
+
+class I2CMasterChecker(SimThread):
     """"
     This simulator thread will act as I2C slave and check any transactions
     caused by the master.
+
+    The bus traffic is reported as events (see i2c_events) to event_sink, if
+    given, and as text on stdout unless text_output is False.
+
+    If passive is set the checker only monitors the bus: it never drives the
+    pins and the ACKs and data of the slave are sampled from the bus, which
+    allows it to check recorded traces (see i2c_trace_analyzer).
     """
 
     def __init__(self, scl_port, sda_port, expected_speed,
-                 tx_data=[], ack_sequence=[], clock_stretch=0, original_speed=None):
+                 tx_data=[], ack_sequence=[], clock_stretch=0, original_speed=None,
+                 report_stats=False, event_sink=None, text_output=True,
+                 passive=False):
+        if passive and clock_stretch:
+          raise ValueError("A passive checker cannot stretch the clock")
+
+        self._passive = passive
         self._scl_port = scl_port
         self._sda_port = sda_port
         self._tx_data = tx_data
@@ -31,12 +116,22 @@ class I2CMasterChecker(px.SimThread):
         self._clock_release_time = None
 
         self._bit_num = 0
-        self._bit_times = []
+        self._byte_bit_times = StreamingStats()
         self._prev_fall_time = None
+        self._last_fall_time = None
         self._byte_num = 0
+        self._num_bytes = 0
 
         self._read_data = None
         self._write_data = None
+        self._sent_data = None
+
+        self._text_output = text_output
+        self._sinks = []
+        if text_output:
+          self._sinks.append(TextRenderer(render_master_checker_text))
+        if event_sink is not None:
+          self._sinks.append(event_sink)
 
         self._drive_ack = 1
         if original_speed is not None:
@@ -44,12 +139,62 @@ class I2CMasterChecker(px.SimThread):
         else:
           self._original_speed = self._expected_speed
 
+        # Timing checks use the speed at which the I2C master is operating
+        self._timing = I2CTimingProfile(self._original_speed)
+        self._timing_limits = self._timing.limits
+
+        # Bit timing statistics of the current transaction and the whole run.
+        # These are held in constant memory so that long transfers can be
+        # checked; they are only printed if report_stats is set.
+        self._report_stats = report_stats or VERBOSE
+        self._num_transactions = 0
+        self._in_transaction = False
+        self.transaction_stats = BitTimingStats(self._original_speed)
+        self.run_stats = BitTimingStats(self._original_speed)
+
+        self.compile_states()
+
+        # Count the state transitions and timing margins if coverage is being
+        # collected (see i2c_coverage)
+        coverage = active_coverage()
+        self._transitions = None
+        self._margins = None
+        if coverage is not None:
+          self._transitions = coverage.transitions("I2CMasterChecker", self.STATE_NAMES,
+                                                   self.possible_transitions())
+          self._margins = coverage.margins(self._timing)
+
         #print("Checking I2C: SCL=%s, SDA=%s" % (self._scl_port, self._sda_port))
 
+    def cache_params(self):
+      """ The parameters which determine the output of the checker for a given
+          binary, used to cache the results of simulations.
+      """
+      return {"scl_port": self._scl_port, "sda_port": self._sda_port,
+              "expected_speed": self._expected_speed,
+              "original_speed": self._original_speed,
+              "tx_data": list(self._tx_data),
+              "ack_sequence": list(self._ack_sequence),
+              "clock_stretch": self._clock_stretch,
+              "report_stats": self._report_stats,
+              "text_output": self._text_output,
+              "passive": self._passive}
+
+    def emit(self, kind, value=None, sender=None, detail=None):
+      event = Event(self.xsi.get_time(), kind, value, sender, detail)
+      for sink in self._sinks:
+        sink(event)
+
     def error(self, str):
-         print("ERROR: %s @ %s" % (str, self.xsi.get_time()))
+      self.emit(ERROR, detail=str)
+
+    def violation(self, str):
+      self.emit(VIOLATION, detail=str)
 
     def read_port(self, port, external_value):
+      if self._passive:
+        return self.xsi.sample_port_pins(port)
+
       driving = self.xsi.is_port_driving(port)
       if driving:
         value = self.xsi.sample_port_pins(port)
@@ -70,12 +215,14 @@ class I2CMasterChecker(px.SimThread):
     def drive_scl(self, value):
        # Cache the value that is currently being driven
        self._external_scl_value = value
-       self.xsi.drive_port_pins(self._scl_port, value)
+       if not self._passive:
+         self.xsi.drive_port_pins(self._scl_port, value)
 
     def drive_sda(self, value):
        # Cache the value that is currently being driven
        self._external_sda_value = value
-       self.xsi.drive_port_pins(self._sda_port, value)
+       if not self._passive:
+         self.xsi.drive_port_pins(self._sda_port, value)
 
     def get_next_ack(self):
         if self._ack_index >= len(self._ack_sequence):
@@ -90,46 +237,54 @@ class I2CMasterChecker(px.SimThread):
             # Data change must have been for a previous bit
             return
 
-        if (self._original_speed == 100 and time > 3450e6) or\
-           (self._original_speed == 400 and time >  900e6):
-            self.error("Data valid time not respected: %gns" % time)
+        if self._margins is not None:
+            self._margins.add(T_VD_DAT_MAX, time)
+        if time > self._timing_limits[T_VD_DAT_MAX]:
+            self.violation("Data valid time not respected: %gns" % time)
 
     def check_hold_start_time(self, time):
-        if (self._original_speed == 100 and time < 4000e6) or\
-           (self._original_speed == 400 and time < 600e6):
-            self.error(f"Start hold time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_HD_STA_MIN, time)
+        if time < self._timing_limits[T_HD_STA_MIN]:
+            self.violation(f"Start hold time less than minimum in spec: %gfs" % time)
 
     def check_setup_start_time(self, time):
-        if (self._original_speed == 100 and time < 4700e6) or\
-           (self._original_speed == 400 and time < 600e6):
-            self.error(f"Start bit setup time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_SU_STA_MIN, time)
+        if time < self._timing_limits[T_SU_STA_MIN]:
+            self.violation(f"Start bit setup time less than minimum in spec: %gfs" % time)
 
     def check_data_setup_time(self, time):
-        if (self._original_speed == 100 and time < 250e6) or\
-           (self._original_speed == 400 and time < 100e6):
-            self.error("Data setup time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_SU_DAT_MIN, time)
+        if time < self._timing_limits[T_SU_DAT_MIN]:
+            self.violation("Data setup time less than minimum in spec: %gfs" % time)
 
     def check_clock_low_time(self, time):
-        if (self._original_speed == 100 and time < 4700e6) or\
-           (self._original_speed == 400 and time < 1300e6):
-            self.error("Clock low time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_LOW_MIN, time)
+        if time < self._timing_limits[T_LOW_MIN]:
+            self.violation("Clock low time less than minimum in spec: %gfs" % time)
 
     def check_clock_high_time(self, time):
-        if (self._original_speed == 100 and time < 4000e6) or\
-           (self._original_speed == 400 and time < 900e6):
-            self.error("Clock high time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_HIGH_MIN, time)
+        if time < self._timing_limits[T_HIGH_MIN]:
+            self.violation("Clock high time less than minimum in spec: %gfs" % time)
 
     def check_setup_stop_time(self, time):
-        if (self._original_speed == 100 and time < 4000e6) or\
-           (self._original_speed == 400 and time < 600e6):
-            self.error("Stop bit setup time less than minimum in spec: %gfs" % time)
+        if self._margins is not None:
+            self._margins.add(T_SU_STO_MIN, time)
+        if time < self._timing_limits[T_SU_STO_MIN]:
+            self.violation("Stop bit setup time less than minimum in spec: %gfs" % time)
 
     def check_bus_free_time(self, time):
       """ Check the time from the STOP to the START condition
       """
-      if (self._original_speed == 100 and time < 4700e6) or \
-         (self._original_speed == 400 and time < 1300e6):
-          self.error("STOP to START time less than minimum in spec: %gfs" % time)
+      if self._margins is not None:
+        self._margins.add(T_BUF_MIN, time)
+      if time < self._timing_limits[T_BUF_MIN]:
+          self.violation("STOP to START time less than minimum in spec: %gfs" % time)
 
     def get_next_data_item(self):
         if self._tx_data_index >= len(self._tx_data):
@@ -160,13 +315,72 @@ class I2CMasterChecker(px.SimThread):
       "ILLEGAL"          : ( None, None,  "ILLEGAL",          "ILLEGAL" ),
     }
 
+    # Integer IDs of the states, in the order of the states table
+    STATE_NAMES = tuple(states)
+    (STOPPED, STARTING, DRIVE_BIT, SAMPLE_BIT, CHECK_START_STOP, BYTE_DONE,
+     DRIVE_ACK, ACK_SENT, SAMPLE_ACK, ACKED, NACKED, REPEAT_START,
+     ILLEGAL) = range(len(STATE_NAMES))
+
+    # The transitions made by the handlers rather than by the states table
+    HANDLER_TRANSITIONS = (
+      ("SAMPLE_BIT",       "BYTE_DONE"),
+      ("CHECK_START_STOP", "STOPPED"),
+      ("CHECK_START_STOP", "REPEAT_START"),
+      # A start bit mid-byte, which is an error
+      ("CHECK_START_STOP", "STARTING"),
+      ("DRIVE_ACK",        "ACK_SENT"),
+      ("SAMPLE_ACK",       "ACKED"),
+      ("SAMPLE_ACK",       "NACKED"),
+    )
+
+    @classmethod
+    def possible_transitions(cls):
+      """ The (from, to) state names of every transition which the checker
+          can make without reaching the ILLEGAL state.
+      """
+      transitions = []
+      for name in cls.STATE_NAMES:
+        for next_name in cls.states[name][2:]:
+          if next_name not in ("ILLEGAL", "NOT_POSSIBLE") and \
+             (name, next_name) not in transitions:
+            transitions.append((name, next_name))
+      return transitions + list(cls.HANDLER_TRANSITIONS)
+
+    def compile_states(self):
+      """ Compile the states table into arrays indexed by integer state ID so
+          that no string work needs to be done on each edge.
+      """
+      state_ids = {}
+      for state_id, name in enumerate(self.STATE_NAMES):
+        assert getattr(self, name) == state_id, "State ID mismatch for %s" % name
+        state_ids[name] = state_id
+
+      # The handler of SAMPLE_ACK always moves on to ACKED or NACKED so the
+      # NOT_POSSIBLE transitions are never taken; map them to ILLEGAL
+      def state_id(name):
+        return state_ids.get(name, self.ILLEGAL)
+
+      table = [self.states[name] for name in self.STATE_NAMES]
+      self._expected_scl = [entry[0] for entry in table]
+      self._expected_sda = [entry[1] for entry in table]
+      self._next_on_scl = [state_id(entry[2]) for entry in table]
+      self._next_on_sda = [state_id(entry[3]) for entry in table]
+      self._handlers = [getattr(self, "handle_" + name.lower())
+                        for name in self.STATE_NAMES]
+
     @property
     def expected_scl(self):
-      return self.states[self._state][0]
+      return self._expected_scl[self._state]
 
     @property
     def expected_sda(self):
-      return self.states[self._state][1]
+      return self._expected_sda[self._state]
+
+    def wait_for_port_pins_change_or_time(self, ports, time):
+      """ Wait until any of the ports changes value or the simulation reaches
+          the given time, whichever comes first.
+      """
+      self.wait(PinsChangeOrTime(self.xsi, ports, time))
 
     def wait_for_stopped(self):
       while self._scl_value != 1 or self._sda_value != 1:
@@ -190,9 +404,11 @@ class I2CMasterChecker(px.SimThread):
       new_sda_value = self.read_sda_value()
       while new_scl_value == scl_value and new_sda_value == sda_value:
         if self._clock_release_time is not None:
-          # When clock stretching it is necessary simply to clock the simulation
-          # as there is no wait for data change with timeout
-          self.wait_for_next_cycle()
+          # When clock stretching, race the scheduled release of the clock
+          # against a change on either pin so that the whole stretch costs a
+          # single wait rather than one wait per simulator cycle
+          self.wait_for_port_pins_change_or_time([self._scl_port, self._sda_port],
+                                                 self._clock_release_time)
           if self.xsi.get_time() >= self._clock_release_time:
             self.drive_scl(1)
             self._clock_release_time = None
@@ -219,9 +435,11 @@ class I2CMasterChecker(px.SimThread):
         scl_changed = True
 
         # Ensure the clock timing is correct
+        high_time = None
         if self._scl_change_time:
           if new_scl_value == 0:
-            self.check_clock_high_time(time_now - self._scl_change_time)
+            high_time = time_now - self._scl_change_time
+            self.check_clock_high_time(high_time)
           else:
             self.check_clock_low_time(time_now - self._scl_change_time)
 
@@ -230,10 +448,7 @@ class I2CMasterChecker(px.SimThread):
 
         # Record the time of the falling edges
         if new_scl_value == 0:
-          fall_time = self.xsi.get_time()
-          if self._prev_fall_time is not None:
-            self._bit_times.append(fall_time - self._prev_fall_time)
-          self._prev_fall_time = fall_time
+          self.record_fall(time_now, high_time)
 
         # Stretch the clock if required
         if self._clock_stretch and new_scl_value == 0:
@@ -257,9 +472,47 @@ class I2CMasterChecker(px.SimThread):
 
       return scl_changed, sda_changed
 
+    def record_fall(self, fall_time, high_time):
+      """ Add the bit period ending at a falling edge of SCL to the bit timing
+          statistics.
+      """
+      if self._prev_fall_time is not None:
+        self._byte_bit_times.add(fall_time - self._prev_fall_time)
+      self._prev_fall_time = fall_time
+
+      # Transaction and run statistics include the ACK bits
+      if self._last_fall_time is not None and high_time is not None:
+        period = fall_time - self._last_fall_time
+        self.transaction_stats.add(period, high_time)
+        self.run_stats.add(period, high_time)
+      self._last_fall_time = fall_time
+
+    def start_transaction(self):
+      # A repeated start ends the previous transaction
+      self.end_transaction()
+      self._num_transactions += 1
+      self._in_transaction = True
+
+    def end_transaction(self):
+      if not self._in_transaction:
+        return
+      if self._report_stats:
+        self.transaction_stats.report("Transaction %d bit timing" % self._num_transactions)
+      self.transaction_stats.reset()
+      self._last_fall_time = None
+      self._in_transaction = False
+
+    def report_run_stats(self):
+      """ Print the bit timing statistics of all transactions checked.
+      """
+      self.run_stats.report("Run bit timing (%d transactions)" % self._num_transactions)
+
     def set_state(self, next_state):
       if VERBOSE:
-        print("State: {} -> {} @ {}".format(self._state, next_state, self.xsi.get_time()))
+        print("State: {} -> {} @ {}".format(self.STATE_NAMES[self._state],
+          self.STATE_NAMES[next_state], self.xsi.get_time()))
+      if self._transitions is not None:
+        self._transitions.add(self._state, next_state)
       self._prev_state = self._state
       self._state = next_state
 
@@ -267,59 +520,82 @@ class I2CMasterChecker(px.SimThread):
       self.check_scl_sda_lines()
 
       # Execute the handler for the state
-      handler = getattr(self, "handle_" + self._state.lower())
-      handler()
+      self._handlers[next_state]()
 
     def move_to_next_state(self, scl_changed, sda_changed):
       if scl_changed:
-        next_state = self.states[self._state][2]
+        next_state = self._next_on_scl[self._state]
       else:
-        next_state = self.states[self._state][3]
+        next_state = self._next_on_sda[self._state]
       self.set_state(next_state)
 
     def check_value(self, value, expected, name):
       if expected is not None:
         if value != expected:
-          self.error("{}: {} != {}".format(self._state, name, expected))
+          self.error("{}: {} != {}".format(self.STATE_NAMES[self._state], name, expected))
 
     def check_scl_sda_lines(self):
-      self.check_value(self.read_scl_value(), self.expected_scl, "SCL")
-      self.check_value(self.read_sda_value(), self.expected_sda, "SDA")
+      self.check_value(self.read_scl_value(), self._expected_scl[self._state], "SCL")
+      self.check_value(self.read_sda_value(), self._expected_sda[self._state], "SDA")
 
     def start_read(self):
       self._bit_num = 0
-      self._bit_times = []
+      self._byte_bit_times.reset()
       self._prev_fall_time = None
       self._read_data = 0
       self._write_data = None
 
     def start_write(self):
       self._bit_num = 0
-      self._bit_times = []
+      self._byte_bit_times.reset()
       self._prev_fall_time = None
       self._read_data = None
-      self._write_data = self.get_next_data_item()
+      self.start_sending()
 
-    def byte_done(self):
-      if self._read_data is not None:
-        print("Byte received: 0x%x" % self._read_data)
-        self._drive_ack = 1
+    def start_sending(self):
+      """ Prepare the next byte to be read by the master. When passive the byte
+          is sampled from the bus rather than driven.
+      """
+      if self._passive:
+        self._write_data = None
+        self._sent_data = 0
       else:
-        # Reads are acked by the master
-        self._drive_ack = 0
-        print("Byte sent")
+        self._write_data = self.get_next_data_item()
+        self._sent_data = self._write_data
+
+    @property
+    def num_bytes(self):
+      """ The total number of bytes (including address bytes) checked so far.
+      """
+      return self._num_bytes
 
-      if self._bit_times:
-        avg_bit_time = sum(self._bit_times) / len(self._bit_times)
-        speed_in_kbps = pow(10, 12) / avg_bit_time
-        print("Speed = %d Kbps" % int(speed_in_kbps + .5))
+    def byte_done(self):
+      self._num_bytes += 1
+
+      speed_in_kbps = None
+      speed = None
+      if self._byte_bit_times.count:
+        speed_in_kbps = pow(10, 12) / self._byte_bit_times.mean
+        speed = int(speed_in_kbps + .5)
+
+      # Report the speed errors before the byte so that they come before the
+      # start of the transaction in the text, as they always have
+      if speed_in_kbps is not None:
         if self._expected_speed != None and \
           (speed_in_kbps < 0.99 * self._expected_speed):
-           print("ERROR: speed is <1% slower than expected")
+           self.violation(SPEED_SLOWER)
 
         if self._expected_speed != None and \
           (speed_in_kbps > self._expected_speed * 1.05):
-           print("ERROR: speed is faster than expected")
+           self.violation(SPEED_FASTER)
+
+      if self._read_data is not None:
+        self._drive_ack = 1
+        self.emit(ADDRESS if self._byte_num == 0 else BYTE, self._read_data, MASTER, speed)
+      else:
+        # Reads are acked by the master
+        self._drive_ack = 0
+        self.emit(BYTE, self._sent_data, SLAVE, speed)
 
       if self._byte_num == 0:
         # Command byte
@@ -329,8 +605,6 @@ class I2CMasterChecker(px.SimThread):
 
         # Determine whether it is starting a read or write
         mode = self._read_data & 0x1
-        print("Master %s transaction started, device address=0x%x" %
-              ("write" if mode == 0 else "read", self._read_data >> 1))
 
         if mode == 0:
           self.start_read()
@@ -341,17 +615,18 @@ class I2CMasterChecker(px.SimThread):
         if self._read_data is not None:
           self.start_read()
 
-      self.set_state("BYTE_DONE")
+      self.set_state(self.BYTE_DONE)
 
     #
     # Handler functions for each state
     #
     def handle_stopped(self):
-      print("Stop bit received")
+      self.emit(STOP)
       self.check_setup_stop_time(self._sda_change_time - self._scl_change_time)
-      pass
+      self.end_transaction()
 
     def starting_sequence(self):
+      self.start_transaction()
       self._byte_num = 0
       self.start_read()
       if self._last_sda_change_time is not None:
@@ -359,7 +634,7 @@ class I2CMasterChecker(px.SimThread):
 
     def handle_drive_bit(self):
       if self._sda_change_time is not None and \
-        (self._prev_state == "STARTING" or self._prev_state == "REPEAT_START") :
+        (self._prev_state == self.STARTING or self._prev_state == self.REPEAT_START) :
         # Need to check that the start hold time has been respected
         self.check_hold_start_time(self.xsi.get_time() - self._sda_change_time)
 
@@ -371,7 +646,7 @@ class I2CMasterChecker(px.SimThread):
         self.drive_sda(1)
 
     def handle_starting(self):
-      print("Start bit received")
+      self.emit(START)
       if self._scl_change_time:
         self.check_setup_start_time(self._sda_change_time - self._scl_change_time)
       self.starting_sequence()
@@ -384,6 +659,11 @@ class I2CMasterChecker(px.SimThread):
         # Read the data value
         self._read_data = (self._read_data << 1) | self.read_sda_value()
 
+      elif self._passive:
+        # Sample the data being read by the master
+        self.check_data_setup_time(self.xsi.get_time() - self._sda_change_time)
+        self._sent_data = (self._sent_data << 1) | self.read_sda_value()
+
       if self._write_data is not None:
         self._write_data = (self._write_data << 1) & 0xff
 
@@ -395,27 +675,30 @@ class I2CMasterChecker(px.SimThread):
       if self._sda_value:
         if self._bit_num != 1:
           self.error("Stopping when mid-byte")
-        self.set_state("STOPPED")
+        self.set_state(self.STOPPED)
       else:
         if self._bit_num != 1:
           self.error("Start bit detected mid-byte")
-          self.set_state("STARTING")
+          self.set_state(self.STARTING)
         else:
-          self.set_state("REPEAT_START")
+          self.set_state(self.REPEAT_START)
 
     def handle_byte_done(self):
       pass
 
     def handle_drive_ack(self):
-      if self._drive_ack:
+      if self._drive_ack and self._passive:
+        # The ACK is sampled from the bus in handle_sample_ack
+        self.set_state(self.ACK_SENT)
+      elif self._drive_ack:
         ack = self.get_next_ack()
         if ack:
-          print("Sending ack")
+          self.emit(ACK, 0, SLAVE)
           self.drive_sda(0)
         else:
-          print("Sending nack")
+          self.emit(ACK, 1, SLAVE)
           self.drive_sda(1)
-        self.set_state("ACK_SENT")
+        self.set_state(self.ACK_SENT)
       else:
         # Simulate external pullup
         self.drive_sda(1)
@@ -425,25 +708,29 @@ class I2CMasterChecker(px.SimThread):
 
     def handle_sample_ack(self):
       if self._drive_ack:
-        if self.xsi.is_port_driving(self._sda_port):
-          print("WARNING: master driving SDA during ACK phase")
+        if self._passive:
+          self.emit(ACK, self.read_sda_value(), SLAVE)
+        elif self.xsi.is_port_driving(self._sda_port):
+          self.emit(WARNING, detail="master driving SDA during ACK phase")
 
         if self.read_sda_value():
-          self.set_state("NACKED")
+          self.set_state(self.NACKED)
+          # A read is not made after its address has been NACKed, so do not
+          # drive the data prepared for it
+          self._write_data = None
         else:
-          self.set_state("ACKED")
+          self.set_state(self.ACKED)
 
       else:
         nack = self.read_sda_value()
-        print("Master sends %s." % ("NACK" if nack else "ACK"))
+        self.emit(ACK, nack, MASTER)
         if nack:
-          self.set_state("NACKED")
+          self.set_state(self.NACKED)
           self._write_data = None # Stop driving data on SDA if the master has NACKED
-          print("Waiting for stop/start bit")
         else:
-          self.set_state("ACKED")
+          self.set_state(self.ACKED)
           # Prepare the next byte to be read
-          self._write_data = self.get_next_data_item()
+          self.start_sending()
 
       self._bit_num = 0
       self._byte_num += 1
@@ -455,13 +742,13 @@ class I2CMasterChecker(px.SimThread):
       pass
 
     def handle_repeat_start(self):
-      print("Repeated start bit received")
+      self.emit(REPEATED_START)
       # Need to check setup time for repeated start has been respected
       self.check_setup_start_time(self._sda_change_time - self._scl_change_time)
       self.starting_sequence()
 
     def handle_illegal(self):
-      self.error("Illegal state arrived at from {}".format(self._prev_state))
+      self.error("Illegal state arrived at from {}".format(self.STATE_NAMES[self._prev_state]))
 
     def run(self):
       # Simulate external pullup
@@ -478,7 +765,7 @@ class I2CMasterChecker(px.SimThread):
       self._tx_data_index = 0
       self._ack_index = 0
 
-      self._state = "STOPPED"
+      self._state = self.STOPPED
 
       while True:
         scl_changed, sda_changed = self.wait_for_change()
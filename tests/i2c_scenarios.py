@@ -0,0 +1,201 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+The scenarios of the test applications.
+
+Each function describes the operations that an application makes on the bus
+and formats the output that it prints from their results. Given the
+behaviour of the checker (or of the slave application), the golden model in
+i2c_golden computes the records that the checker should see and the results
+of the operations, so changing the tx_data or ack_sequence of a test changes
+its expected output without any file to edit.
+"""
+from collections import namedtuple
+from i2c_events import Transaction
+from i2c_golden import master_golden, slave_golden, debug_hex
+
+#
+# records: the records that the checker should see (see i2c_golden)
+# output:  the lines that the xCORE should print
+#
+Expected = namedtuple("Expected", ["records", "output"])
+
+def ack_str(ack):
+    return "ack" if ack else "nack"
+
+def read_buffer(data, num_bytes):
+    """ The buffer of a read, which is left zeroed beyond the bytes read.
+    """
+    return list(data) + [0] * (num_bytes - len(data))
+
+def received_str(data, num_bytes):
+    return "xCORE received: %s" % ", ".join("0x" + debug_hex(byte)
+                                            for byte in read_buffer(data, num_bytes))
+
+def master_test(stop, tx_data, ack_sequence, tx=True, rx=True):
+    """ i2c_master_test, in its rx_tx (tx and rx) or tx_only config. The
+        async and movable tests make the same operations and print the same
+        output.
+    """
+    stop = (stop == "stop")
+    ops = []
+    if tx:
+        ops.append(("w", 0x3c, [0x90, 0xfe], stop))
+    if rx:
+        ops += [("r", 0x22, 2, stop),
+                ("r", 0x22, 1, stop)]
+    if tx:
+        ops += [("w", 0x7b, [0xff, 0x00, 0xaa], stop),
+                ("w", 0x31, [0xee], stop)]
+    golden = master_golden(ops, tx_data, ack_sequence)
+
+    results = iter(golden.results)
+    write_1 = next(results) if tx else None
+    reads = [next(results), next(results)] if rx else []
+    writes = [write_1, next(results), next(results)] if tx else []
+
+    output = ["xCORE got %s, %d" % (ack_str(ack), n) for ack, n in writes]
+    for (ack, data), num_bytes in zip(reads, [2, 1]):
+        output.append("xCORE got %s" % ack_str(ack))
+        output.append(received_str(data, num_bytes))
+    return Expected(golden.records, output)
+
+def single_port_test(stop, tx_data, ack_sequence):
+    """ i2c_sp_test, which reads from 0x88 to check that the device is
+        truncated to 7 bits.
+    """
+    stop = (stop == "stop")
+    golden = master_golden([("w", 0x3c, [0x90, 0xfe], stop),
+                            ("w", 0x7b, [0xff, 0x00, 0xaa], stop),
+                            ("r", 0x22, 2, stop),
+                            ("r", 0x88, 3, stop),
+                            ("w", 0x31, [0xee], stop)],
+                           tx_data, ack_sequence)
+
+    write_1, write_2, read_1, read_2, write_3 = golden.results
+    output = ["xCORE got %s, %d" % (ack_str(ack), n) for ack, n in (write_1, write_2)]
+    for (ack, data), num_bytes in ((read_1, 2), (read_2, 3)):
+        output.append("xCORE got %s" % ack_str(ack))
+        output.append(received_str(data, num_bytes))
+    output.append("xCORE got %s, %d" % (ack_str(write_3[0]), write_3[1]))
+    return Expected(golden.records, output)
+
+def lock_test():
+    """ i2c_test_locks, in which a client holds the bus between two writes
+        without a stop bit and a second client writes after it.
+    """
+    golden = master_golden([("w", 0x33, [0x99], False),
+                            ("w", 0x33, [0x99], True),
+                            ("w", 0x22, [0x88], True)])
+    return Expected(golden.records, [])
+
+def repeated_start_test():
+    """ i2c_test_repeated_start.
+    """
+    golden = master_golden([("w", 0x33, [0x99], False),
+                            ("w", 0x33, [0x99], True)])
+    return Expected(golden.records, [])
+
+def big_endian(value, num_bytes):
+    return [(value >> (8 * k)) & 0xff for k in reversed(range(num_bytes))]
+
+def reg_test(tx_data, ack_sequence):
+    """ i2c_master_reg_test, which writes registers with each of the
+        write_reg functions and then reads them with each of the read_reg
+        functions.
+    """
+    # (device, reg, reg bytes, data, data bytes) of each write
+    writes = [(0x44, 0x07, 1, 0x12, 1),
+              (0x22, 0xfe99, 2, 0x12, 1),
+              (0x33, 0xabcd, 2, 0x12a3, 2),
+              (0x11, 0xef, 1, 0x4567, 2)]
+    # (device, reg, reg bytes, data bytes) of each read
+    reads = [(0x44, 0x33, 1, 1),
+             (0x45, 0xa321, 2, 1),
+             (0x46, 0x3399, 2, 2),
+             (0x47, 0x22, 1, 2)]
+
+    ops = [("w", device, big_endian(reg, reg_bytes) + big_endian(data, data_bytes), True)
+           for device, reg, reg_bytes, data, data_bytes in writes]
+    ops += [("t", device, big_endian(reg, reg_bytes), data_bytes)
+            for device, reg, reg_bytes, data_bytes in reads]
+    golden = master_golden(ops, tx_data, ack_sequence)
+
+    write_results = golden.results[:len(writes)]
+    read_results = golden.results[len(writes):]
+
+    output = []
+    for (ack, n), op in zip(write_results, ops):
+        # A write is a success if every byte is sent, even if the last is NACKed
+        output.append("XCORE: %s" % ("ACK" if n == len(op[2]) else "NACK"))
+    for (ack, data), (_, _, _, data_bytes) in zip(read_results, reads):
+        output.append("XCORE: %s" % ("ACK" if ack else "NACK"))
+        value = 0
+        for byte in read_buffer(data, data_bytes):
+            value = (value << 8) | byte
+        output.append("XCORE: val=%s" % debug_hex(value))
+    return Expected(golden.records, output)
+
+# The responses of the application of i2c_slave_test
+SLAVE_TEST_ADDRESS = 0x3c
+SLAVE_TEST_DATA = [0xff, 0x01, 0x99, 0x20, 0x33, 0xee]
+SLAVE_TEST_ACKS = [True, True, False, False, True, False]
+SLAVE_TEST_EXIT_DATA = 0xff
+
+def slave_output(callbacks):
+    """ The lines printed by the application of i2c_slave_test for the
+        callbacks made to it.
+    """
+    output = []
+    for callback in callbacks:
+        name = callback[0]
+        if name == "ack_write_request":
+            output.append("xCORE got start of write transaction")
+        elif name == "ack_read_request":
+            output.append("xCORE got start of read transaction")
+        elif name == "master_sent_data":
+            output.append("xCORE got data: 0x%s" % debug_hex(callback[1]))
+        elif name == "master_requires_data":
+            output.append("xCORE sending: 0x%s" % debug_hex(callback[1]))
+        else:
+            output.append("xCORE got stop bit")
+    return output
+
+def slave_test(tsequence):
+    """ i2c_slave_test, whose application prints each callback and exits
+        when it is sent 0xff.
+    """
+    golden = slave_golden(tsequence, SLAVE_TEST_ADDRESS, SLAVE_TEST_DATA,
+                          SLAVE_TEST_ACKS, exit_data = SLAVE_TEST_EXIT_DATA)
+    return Expected(golden.records, slave_output(golden.results))
+
+def fuzz_master_test(program, tx_data, ack_sequence):
+    """ The master config of i2c_fuzz_test, which makes the operations of a
+        fuzz program ("w", "r" and "stop") and then prints their results as
+        i2c_master_test does.
+    """
+    golden = master_golden(program, tx_data, ack_sequence)
+    results = iter(golden.results)
+    output = []
+    for op in program:
+        if op[0] == "w":
+            ack, n = next(results)
+            output.append("xCORE got %s, %d" % (ack_str(ack), n))
+        elif op[0] == "r":
+            ack, data = next(results)
+            output.append("xCORE got %s" % ack_str(ack))
+            output.append(received_str(data, op[2]))
+    return Expected(golden.records, output)
+
+def fuzz_slave_test(tsequence, device_addr, tx_data, ack_sequence):
+    """ The slave config of i2c_fuzz_test, whose application prints each
+        callback as i2c_slave_test does. It exits when asked to ACK one more
+        write than tsequence makes to it, so the master ends with an empty
+        write to device_addr.
+    """
+    golden = slave_golden(list(tsequence) + [("w", device_addr, [], True)],
+                          device_addr, tx_data, ack_sequence)
+    # The final write stops at its address, which is not ACKed, and the
+    # application neither prints its request nor sees its stop bit
+    records = golden.records[:-2] + [Transaction("w", device_addr, [], None)]
+    return Expected(records, slave_output(golden.results[:-2]))
@@ -1,22 +1,99 @@
 # Copyright 2014-2025 XMOS LIMITED.
 # This Software is subject to the terms of the XMOS Public Licence: Version 1.
-import Pyxsim as px
+try:
+    from Pyxsim import SimThread
+except ImportError:
+    # Without the XMOS test support the checker can still run on the bus model
+    from i2c_bus_model import SimThread
+from i2c_events import Event, TextRenderer, START, REPEATED_START, STOP, \
+                       ADDRESS, BYTE, ACK, MASTER, SLAVE
+from i2c_coverage import active_coverage, slave_state_tracker
 
-class I2CSlaveChecker(px.SimThread):
+def render_slave_checker_text(event):
+    """ Render an event as the lines of text that the I2CSlaveChecker has
+        always printed.
+    """
+    kind = event.kind
+    lines = []
+    if kind == ADDRESS:
+        lines.append("Starting %s transaction to device id 0x%x" %
+                     ("read" if event.value & 1 else "write", event.value >> 1))
+        lines.append("Sending data 0x%x" % event.value)
+    elif kind == BYTE:
+        if event.sender == MASTER:
+            lines.append("Sending data 0x%x" % event.value)
+        else:
+            lines.append("Received byte 0x%x" % event.value)
+    elif kind == ACK:
+        if event.sender == SLAVE:
+            lines.append("Master received %s" % ("NACK" if event.value else "ACK"))
+        else:
+            lines.append("Master sending %s" % ("NACK" if event.value else "ACK"))
+    elif kind == STOP:
+        lines.append("Sending stop bit")
+    return lines
+
+class I2CSlaveChecker(SimThread):
     """"
     This simulator thread will act as I2C master, create
     bus transactions and test the response of the slave
+
+    The bus traffic is reported as events (see i2c_events) to event_sink, if
+    given, and as text on stdout unless text_output is False. The number of
+    times that the slave stretched the clock and the total time it held the
+    clock low are counted in num_stretches and stretch_time (in fs), and the
+    number of stretches by the device address of the transaction in
+    stretches_by_address.
+
+    Each entry of tsequence is ("w", address, data) or ("r", address,
+    number of bytes), optionally followed by False to end the transaction
+    without a stop bit so that the next one starts with a repeated start.
+    This allows the transactions to several devices to be interleaved.
+
+    slave_firmware names the slave under test if it is i2c_slave(), whose
+    state machine is then counted while coverage is collected (see
+    i2c_coverage).
     """
 
     def __init__(self, scl_port, sda_port, speed,
-                 tsequence):
+                 tsequence, event_sink=None, text_output=True,
+                 slave_firmware=None):
         self._scl_port = scl_port
         self._sda_port = sda_port
         self._tsequence = tsequence
         self._speed = speed
         self._bit_time = 1000000e6 / speed
+
+        self._text_output = text_output
+        self._sinks = []
+        if text_output:
+            self._sinks.append(TextRenderer(render_slave_checker_text))
+        if event_sink is not None:
+            self._sinks.append(event_sink)
+        # Count the transitions of the slave if coverage is being collected
+        # (see i2c_coverage)
+        coverage = active_coverage()
+        if coverage is not None and slave_firmware is not None:
+            self._sinks.append(slave_state_tracker(coverage, slave_firmware))
+        self.num_stretches = 0
+        self.stretch_time = 0
+        self.stretches_by_address = {}
+        self._address = None
         #print("Checking I2C: SCL=%s, SDA=%s" % (self._scl_port, self._sda_port))
 
+    def cache_params(self):
+        """ The parameters which determine the output of the checker for a
+            given binary, used to cache the results of simulations.
+        """
+        return {"scl_port": self._scl_port, "sda_port": self._sda_port,
+                "speed": self._speed, "tsequence": self._tsequence,
+                "text_output": self._text_output}
+
+    def emit(self, kind, value=None, sender=None, detail=None):
+        event = Event(self.xsi.get_time(), kind, value, sender, detail)
+        for sink in self._sinks:
+            sink(event)
+
     def get_port_val(self, xsi, port):
         "Sample port, modelling the pull up"
         is_driving = xsi.is_port_driving(port)
@@ -25,21 +102,36 @@ class I2CSlaveChecker(px.SimThread):
         else:
             return xsi.sample_port_pins(port);
 
-    def start_bit(self, xsi):
+    def start_bit(self, xsi, repeated=False):
+        if repeated:
+            # Release SDA while SCL is low so that it can fall while SCL is high
+            self.wait_until(self._fall_time + self._bit_time / 4)
+            xsi.drive_port_pins(self._sda_port, 1)
+            self.wait_until(self._fall_time + self._bit_time / 2)
         xsi.drive_port_pins(self._scl_port, 1)
         self.wait_until(xsi.get_time() + self._bit_time / 4)
         xsi.drive_port_pins(self._sda_port, 0);
         self.wait_until(xsi.get_time() + self._bit_time / 2)
         xsi.drive_port_pins(self._scl_port, 0);
         self._fall_time = xsi.get_time()
+        self.emit(REPEATED_START if repeated else START)
 
 
 
+    def wait_for_clock_release(self, xsi):
+        "Wait for the slave to stop holding the clock low, if it is"
+        if xsi.is_port_driving(self._scl_port):
+            stretch_start = xsi.get_time()
+            self.wait_for_port_pins_change([self._scl_port])
+            self.num_stretches += 1
+            self.stretch_time += xsi.get_time() - stretch_start
+            self.stretches_by_address[self._address] = \
+                self.stretches_by_address.get(self._address, 0) + 1
+
     def high_pulse(self, xsi):
         self.wait_until(self._fall_time + self._bit_time / 2 + self._bit_time / 32)
         xsi.drive_port_pins(self._scl_port, 1)
-        if xsi.is_port_driving(self._scl_port):
-            self.wait_for_port_pins_change([self._scl_port])
+        self.wait_for_clock_release(xsi)
         new_fall_time = self._fall_time + self._bit_time
         if xsi.get_time() > new_fall_time:
             new_fall_time = xsi.get_time() + self._bit_time / 4
@@ -49,8 +141,7 @@ class I2CSlaveChecker(px.SimThread):
 
     def high_pulse_sample(self, xsi):
         self.wait_until(self._fall_time + self._bit_time / 2 + self._bit_time / 32)
-        if xsi.is_port_driving(self._scl_port):
-            self.wait_for_port_pins_change([self._scl_port])
+        self.wait_for_clock_release(xsi)
         xsi.drive_port_pins(self._scl_port, 1)
         self.wait_until(xsi.get_time() + self._bit_time / 4)
         data = self.get_port_val(xsi, self._sda_port)
@@ -62,8 +153,10 @@ class I2CSlaveChecker(px.SimThread):
         self._fall_time = new_fall_time
         return data
 
-    def write(self, xsi, byte):
-        print("Sending data 0x%x" % byte)
+    def write(self, xsi, byte, kind=BYTE):
+        if kind == ADDRESS:
+            self._address = byte >> 1
+        self.emit(kind, byte, MASTER)
         for i in range(8):
             self.wait_until(self._fall_time + self._bit_time / 8);
             bit = (byte >> 7) & 1
@@ -71,13 +164,10 @@ class I2CSlaveChecker(px.SimThread):
             byte <<= 1;
             self.high_pulse(xsi)
         ack = self.high_pulse_sample(xsi)
-        if ack == 1:
-            print("Master received NACK")
-        else:
-            print("Master received ACK")
+        self.emit(ACK, ack, SLAVE)
 
     def stop_bit(self, xsi):
-        print("Sending stop bit")
+        self.emit(STOP)
         self.wait_until(self._fall_time + self._bit_time / 4)
         xsi.drive_port_pins(self._sda_port, 0)
         self.wait_until(self._fall_time + self._bit_time / 2 + self._bit_time / 32)
@@ -92,12 +182,9 @@ class I2CSlaveChecker(px.SimThread):
         for i in range(8):
             bit = self.high_pulse_sample(xsi)
             byte = (byte << 1) | bit
-        print("Received byte 0x%x" % byte)
+        self.emit(BYTE, byte, SLAVE)
         self.wait_until(self._fall_time + self._bit_time / 8);
-        if ack == 0:
-            print("Master sending ACK")
-        else:
-            print("Master sending NACK")
+        self.emit(ACK, ack, MASTER)
         xsi.drive_port_pins(self._sda_port, ack)
         self.high_pulse(xsi)
 
@@ -107,20 +194,21 @@ class I2CSlaveChecker(px.SimThread):
         xsi.drive_port_pins(self._scl_port, 1)
         xsi.drive_port_pins(self._sda_port, 1)
         self.wait_until(xsi.get_time() + 30000e6)
-        for (typ, addr, d) in self._tsequence:
+        repeated = False
+        for (typ, addr, d, *stop) in self._tsequence:
+            stop = stop[0] if stop else True
             if typ == "w":
-                self.start_bit(xsi)
-                print("Starting write transaction to device id 0x%x" % addr)
-                self.write(xsi, (addr << 1) | 0)
+                self.start_bit(xsi, repeated)
+                self.write(xsi, (addr << 1) | 0, ADDRESS)
                 for x in d:
                     self.write(xsi, x);
-                self.stop_bit(xsi)
             elif typ == "r":
-                self.start_bit(xsi)
-                print("Starting read transaction to device id 0x%x" % addr)
-                self.write(xsi, (addr << 1) | 1)
+                self.start_bit(xsi, repeated)
+                self.write(xsi, (addr << 1) | 1, ADDRESS)
                 for x in range(d-1):
                     self.read(xsi, 0);
                 self.read(xsi, 1)
+            if stop:
                 self.stop_bit(xsi)
+            repeated = not stop
 
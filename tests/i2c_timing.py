@@ -0,0 +1,223 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+I2C timing limits, as defined by the I2C specification (UM10204), for the
+bus speed modes supported by lib_i2c.
+
+Also provides constant memory statistics for checking the bit timing of long
+transfers. All times are in femtoseconds, the unit of the simulator time.
+"""
+
+# Timing parameters. Each parameter has a minimum and a maximum limit stored
+# at index (2 * parameter) and (2 * parameter + 1) of the limits array.
+T_LOW, T_HIGH, T_SU_STA, T_HD_STA, T_SU_DAT, T_VD_DAT, T_SU_STO, T_BUF = range(8)
+
+PARAMETER_NAMES = ("tLOW", "tHIGH", "tSU;STA", "tHD;STA",
+                   "tSU;DAT", "tVD;DAT", "tSU;STO", "tBUF")
+
+T_LOW_MIN,    T_LOW_MAX    = 2 * T_LOW,    2 * T_LOW + 1
+T_HIGH_MIN,   T_HIGH_MAX   = 2 * T_HIGH,   2 * T_HIGH + 1
+T_SU_STA_MIN, T_SU_STA_MAX = 2 * T_SU_STA, 2 * T_SU_STA + 1
+T_HD_STA_MIN, T_HD_STA_MAX = 2 * T_HD_STA, 2 * T_HD_STA + 1
+T_SU_DAT_MIN, T_SU_DAT_MAX = 2 * T_SU_DAT, 2 * T_SU_DAT + 1
+T_VD_DAT_MIN, T_VD_DAT_MAX = 2 * T_VD_DAT, 2 * T_VD_DAT + 1
+T_SU_STO_MIN, T_SU_STO_MAX = 2 * T_SU_STO, 2 * T_SU_STO + 1
+T_BUF_MIN,    T_BUF_MAX    = 2 * T_BUF,    2 * T_BUF + 1
+
+NO_LIMIT = float("inf")
+
+# (maximum speed in kbps, mode name, limits in ns)
+#
+#                        tLOW  tHIGH  tSU;STA  tHD;STA  tSU;DAT  tVD;DAT  tSU;STO  tBUF
+#                        min   min    min      min      min      max      min      min
+SPEED_MODES = (
+  (100,  "Standard",       (4700, 4000,  4700,    4000,    250,     3450,    4000,    4700)),
+  # The checks have always required a 900ns high time in Fast-mode, tighter
+  # than the 600ns of the specification
+  (400,  "Fast",           (1300,  900,   600,     600,    100,      900,     600,    1300)),
+  (1000, "Fast-mode Plus", ( 500,  260,   260,     260,     50,      450,     260,     500)),
+)
+
+class I2CTimingProfile(object):
+    """
+    The timing limits to check an I2C bus against for a given bus speed.
+
+    The limits are held in a flat array, ``limits``, with the minimum and
+    maximum of each parameter at indices ``2 * parameter`` and
+    ``2 * parameter + 1`` (see T_LOW_MIN etc). Limits which do not apply are
+    set to 0 (minimum) or infinity (maximum) so that every check is a single
+    comparison.
+    """
+
+    def __init__(self, speed):
+        self.speed = speed
+        self.mode = None
+        self.limits = [0, NO_LIMIT] * len(PARAMETER_NAMES)
+
+        if speed is None:
+            # No timing checks
+            return
+
+        for max_speed, mode, limits_ns in SPEED_MODES:
+            if speed <= max_speed:
+                break
+        else:
+            raise ValueError("Unsupported I2C speed %s kbps" % speed)
+
+        self.mode = mode
+        for param, limit_ns in enumerate(limits_ns):
+            if param == T_VD_DAT:
+                self.limits[2 * param + 1] = limit_ns * 1e6
+            else:
+                self.limits[2 * param] = limit_ns * 1e6
+
+    def min(self, param):
+        return self.limits[2 * param]
+
+    def max(self, param):
+        return self.limits[2 * param + 1]
+
+    def __repr__(self):
+        return "I2CTimingProfile(%s, %s)" % (self.speed, self.mode)
+
+class StreamingStats(object):
+    """
+    Running count, mean, minimum, maximum and variance of a stream of values,
+    held in constant memory. The mean and variance use Welford's method.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self._mean
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        return self.variance ** 0.5
+
+class Histogram(object):
+    """
+    Fixed-bucket histogram of the values in [low, high). Values outside of
+    the range are counted in ``underflow`` and ``overflow``.
+    """
+
+    def __init__(self, low, high, num_buckets):
+        self.low = low
+        self.high = high
+        self.bucket_width = (high - low) / num_buckets
+        self.buckets = [0] * num_buckets
+        self.underflow = 0
+        self.overflow = 0
+
+    def reset(self):
+        self.buckets = [0] * len(self.buckets)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, value):
+        if value < self.low:
+            self.underflow += 1
+        elif value >= self.high:
+            self.overflow += 1
+        else:
+            self.buckets[int((value - self.low) / self.bucket_width)] += 1
+
+    def bucket_range(self, index):
+        low = self.low + index * self.bucket_width
+        return low, low + self.bucket_width
+
+class BitTimingStats(object):
+    """
+    Statistics of the SCL bit period (time between falling edges) and duty
+    cycle (high time as a fraction of the bit period) for a window of the
+    bus traffic, such as a transaction or a whole run.
+    """
+
+    # Bit period histogram range, as a multiple of the nominal bit period
+    PERIOD_RANGE = 4
+    PERIOD_BUCKETS = 32
+    DUTY_BUCKETS = 20
+
+    def __init__(self, speed):
+        # Nominal bit period in femtoseconds; fall back to Standard-mode when
+        # the speed is not known
+        self.nominal_period = 1e12 / (speed if speed else 100)
+        self.period = StreamingStats()
+        self.duty = StreamingStats()
+        self.period_histogram = Histogram(0, self.PERIOD_RANGE * self.nominal_period,
+                                          self.PERIOD_BUCKETS)
+        self.duty_histogram = Histogram(0, 1, self.DUTY_BUCKETS)
+
+    def reset(self):
+        self.period.reset()
+        self.duty.reset()
+        self.period_histogram.reset()
+        self.duty_histogram.reset()
+
+    def add(self, period, high_time):
+        self.period.add(period)
+        self.period_histogram.add(period)
+        duty = high_time / period
+        self.duty.add(duty)
+        self.duty_histogram.add(duty)
+
+    @property
+    def speed(self):
+        """ The average speed in kbps, or None if no bits have been seen.
+        """
+        if not self.period.count:
+            return None
+        return pow(10, 12) / self.period.mean
+
+    def report(self, name):
+        if not self.period.count:
+            print("%s: no bits" % name)
+            return
+
+        period = self.period
+        duty = self.duty
+        print("%s: %d bits, speed %d Kbps, period mean %.1fns stddev %.1fns "
+              "min %.1fns max %.1fns, duty cycle mean %.3f min %.3f max %.3f" %
+              (name, period.count, int(self.speed + .5), period.mean / 1e6,
+               period.stddev / 1e6, period.min / 1e6, period.max / 1e6,
+               duty.mean, duty.min, duty.max))
+
+        for title, histogram, scale, unit in (
+                ("period", self.period_histogram, 1e6, "ns"),
+                ("duty cycle", self.duty_histogram, 1, "")):
+            print("  %s histogram:" % title)
+            if histogram.underflow:
+                print("    < %g%s: %d" % (histogram.low / scale, unit, histogram.underflow))
+            for index, count in enumerate(histogram.buckets):
+                if count:
+                    low, high = histogram.bucket_range(index)
+                    print("    %g-%g%s: %d" % (low / scale, high / scale, unit, count))
+            if histogram.overflow:
+                print("    >= %g%s: %d" % (histogram.high / scale, unit, histogram.overflow))
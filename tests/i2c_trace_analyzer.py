@@ -0,0 +1,330 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+"""
+Offline checking of recorded I2C traces.
+
+A VCD file (such as the one written by xsim with --vcd-tracing) or a CSV
+capture from a logic analyser is streamed through a passive I2CMasterChecker,
+so the same protocol decode and timing checks are applied as in simulation.
+The trace is read one change at a time, so traces of any size can be checked
+in constant memory.
+
+Usage:
+
+  python i2c_trace_analyzer.py trace.vcd --speed 400 --scl XS1_PORT_1A --sda XS1_PORT_1B
+  python i2c_trace_analyzer.py capture.csv --speed 100 --scl "Channel 0" --sda "Channel 1"
+
+The transactions and any timing violations are printed, and the exit status
+is non-zero if there were violations or errors. With --batch only the timing
+is checked, by the much faster NumPy analysis of i2c_edge_timing.
+"""
+import argparse
+import csv
+import sys
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import TransactionSink, JsonlSink, KIND_NAMES
+from i2c_coverage import set_source, TRACE
+
+SCL, SDA = "scl", "sda"
+
+# Femtoseconds per VCD timescale unit
+TIME_UNITS = {"s": 10**15, "ms": 10**12, "us": 10**9, "ns": 10**6, "ps": 10**3, "fs": 1}
+
+class TraceEnd(Exception):
+    """ Raised in the checker when the trace has no more changes.
+    """
+    pass
+
+def parse_signal(spec):
+    """ Split a signal given as NAME or NAME:BIT (to select a bit of a vector).
+    """
+    name, sep, bit = spec.rpartition(":")
+    if sep and bit.isdigit():
+        return name, int(bit)
+    return spec, None
+
+def _pin_value(char):
+    # Undriven (z) or unknown (x) pins are pulled up
+    return 0 if char == "0" else 1
+
+def read_vcd_changes(file, scl, sda):
+    """ Yield (time, port, value) for each change of the SCL and SDA signals in
+        a VCD file, where port is SCL or SDA and time is in femtoseconds. The
+        signals are matched by the end of their hierarchical name, which must
+        be unique.
+    """
+    signals = {SCL: parse_signal(scl), SDA: parse_signal(sda)}
+    ids = {}
+    matches = {}
+    scope = []
+    scale = 1
+    tokens = []
+    time = 0
+
+    # Declarations can span lines, so gather the tokens of each up to its $end
+    lines = iter(file)
+    for line in lines:
+        tokens.extend(line.split())
+        if not tokens or tokens[-1] != "$end":
+            continue
+        command, tokens = tokens, []
+
+        if command[0] == "$timescale":
+            text = "".join(command[1:-1])
+            number = text.rstrip("munpfs")
+            scale = int(number or 1) * TIME_UNITS[text[len(number):]]
+        elif command[0] == "$scope":
+            scope.append(command[2])
+        elif command[0] == "$upscope":
+            scope.pop()
+        elif command[0] == "$var":
+            width, code, name = int(command[2]), command[3], command[4]
+            full_name = ".".join(scope + [name])
+            for port, (wanted, bit) in signals.items():
+                if full_name.endswith(wanted):
+                    if port in matches and matches[port] != full_name:
+                        raise ValueError("Signal %s matches both %s and %s" %
+                                         (wanted, matches[port], full_name))
+                    matches[port] = full_name
+                    ids.setdefault(code, []).append((port, width, bit))
+        elif command[0] == "$enddefinitions":
+            break
+
+    missing = set(signals) - set(matches)
+    if missing:
+        raise ValueError("Signals not found in VCD: %s" %
+                         ", ".join(signals[port][0] for port in sorted(missing)))
+
+    values = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        char = line[0]
+        if char == "#":
+            time = int(line[1:]) * scale
+            continue
+        if char in "01xzXZ":
+            code, vector = line[1:], line[0]
+        elif char in "bB":
+            vector, code = line[1:].split()
+        else:
+            # Dump commands and real valued variables are not needed
+            continue
+
+        for port, width, bit in ids.get(code, ()):
+            if bit is None:
+                value = _pin_value(vector[-1])
+            else:
+                # Vectors are given MSB first with the leading zeros dropped
+                vector = vector.rjust(width, "0")
+                value = _pin_value(vector[width - 1 - bit])
+            if values.get(port) != value:
+                values[port] = value
+                yield time, port, value
+
+def read_csv_changes(file, scl, sda, time_column=0, time_scale=10**15):
+    """ Yield (time, port, value) for each change of the SCL and SDA columns of
+        a CSV capture. The time column is scaled to femtoseconds by time_scale
+        (the default is for times in seconds).
+    """
+    reader = csv.reader(file)
+    header = [name.strip() for name in next(reader)]
+    columns = {}
+    for port, name in ((SCL, scl), (SDA, sda)):
+        if name not in header:
+            raise ValueError("Column %s not found in CSV" % name)
+        columns[port] = header.index(name)
+
+    values = {}
+    for row in reader:
+        if not row:
+            continue
+        time = int(round(float(row[time_column]) * time_scale))
+        for port, column in columns.items():
+            value = 0 if float(row[column]) < 0.5 else 1
+            if values.get(port) != value:
+                values[port] = value
+                yield time, port, value
+
+class TraceReplay(object):
+    """
+    Replays a stream of pin changes through the xsi interface used by the
+    checkers. Each wait consumes the changes up to the point the wait is
+    satisfied, so the checker runs directly on the trace with no simulator or
+    threads.
+    """
+
+    def __init__(self, changes, cycle_time=10000000):
+        self._changes = iter(changes)
+        self._cycle_time = cycle_time
+        self._time = 0
+        self._pins = {SCL: 1, SDA: 1}
+        self._next = None
+        self.num_changes = 0
+        self._peek()
+        # The checkers are not testing the firmware (see i2c_coverage)
+        set_source(TRACE)
+
+    def _peek(self):
+        self._next = next(self._changes, None)
+
+    def _apply_next(self):
+        if self._next is None:
+            raise TraceEnd()
+        time, port, value = self._next
+        self._time = max(self._time, time)
+        self._pins[port] = value
+        self.num_changes += 1
+        self._peek()
+
+    def _apply_simultaneous(self):
+        # Changes at the same time are seen together, as in a simulator cycle
+        while self._next is not None and self._next[0] <= self._time:
+            self._apply_next()
+
+    def get_time(self):
+        return self._time
+
+    def sample_port_pins(self, port):
+        return self._pins[port]
+
+    def is_port_driving(self, port):
+        return True
+
+    def drive_port_pins(self, port, value):
+        pass
+
+    def _wait_until(self, time):
+        while self._next is not None and self._next[0] <= time:
+            self._apply_next()
+        if self._next is None:
+            raise TraceEnd()
+        self._time = max(self._time, time)
+
+    def _wait_for_next_cycle(self):
+        self._wait_until(self._time + self._cycle_time)
+
+    def _wait_for_port_pins_change(self, ports):
+        values = [self._pins[port] for port in ports]
+        while True:
+            self._apply_next()
+            self._apply_simultaneous()
+            if [self._pins[port] for port in ports] != values:
+                return
+
+    def _user_wait(self, condition):
+        deadline = getattr(condition, "time", None)
+        while True:
+            if deadline is not None and \
+               (self._next is None or self._next[0] > deadline):
+                self._wait_until(deadline)
+            else:
+                self._apply_next()
+                self._apply_simultaneous()
+            if condition(self):
+                return
+
+class TraceChecker(I2CMasterChecker):
+    """ A passive I2CMasterChecker on the SCL and SDA of a trace.
+    """
+
+    def __init__(self, speed, expected_speed=None, **kwargs):
+        super(TraceChecker, self).__init__(SCL, SDA, expected_speed,
+                                           original_speed=speed, passive=True,
+                                           **kwargs)
+
+def analyze_trace(changes, speed, expected_speed=None, event_sink=None,
+                  text_output=False):
+    """ Check the (time, port, value) changes of a trace, reporting the events
+        to event_sink. speed is the speed the master is configured for, which
+        selects the timing limits. Returns the checker, which holds the bit
+        timing statistics of the run.
+    """
+    checker = TraceChecker(speed, expected_speed, event_sink=event_sink,
+                           text_output=text_output)
+    checker.xsi = TraceReplay(changes)
+    try:
+        checker.run()
+    except TraceEnd:
+        pass
+    return checker
+
+def format_transaction(transaction):
+    data = " ".join("%02x" % byte for byte in transaction.data)
+    acks = "".join("A" if ack else "N" for ack in transaction.acks)
+    return "%s 0x%02x [%s] %s" % (transaction.mode, transaction.address, data, acks)
+
+def read_changes(file, args):
+    if args.csv:
+        return read_csv_changes(file, args.scl, args.sda, time_scale=args.csv_time_scale)
+    return read_vcd_changes(file, args.scl, args.sda)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a recorded I2C trace")
+    parser.add_argument("trace", help="VCD or CSV file")
+    parser.add_argument("--speed", type=int, required=True,
+                        help="Speed of the master in kbps, which selects the timing limits")
+    parser.add_argument("--expected-speed", type=int, default=None,
+                        help="Check the measured speed of each byte against this (kbps)")
+    parser.add_argument("--scl", default="scl", help="SCL signal or column name (NAME or NAME:BIT)")
+    parser.add_argument("--sda", default="sda", help="SDA signal or column name (NAME or NAME:BIT)")
+    parser.add_argument("--csv", action="store_true", help="Trace is a CSV capture")
+    parser.add_argument("--csv-time-scale", type=float, default=1e15,
+                        help="Femtoseconds per unit of the CSV time column")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Print the events as JSONL rather than transactions")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print the bit timing statistics of the trace")
+    parser.add_argument("--batch", action="store_true",
+                        help="Only check the timing, using the batch edge analysis")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        return batch_main(args)
+
+    problems = []
+    def on_problem(event):
+        problems.append(event)
+        if not args.jsonl:
+            print("%s @ %s: %s" % (KIND_NAMES[event.kind], event.time, event.detail))
+
+    def on_transaction(transaction):
+        print(format_transaction(transaction))
+
+    if args.jsonl:
+        jsonl = JsonlSink(sys.stdout)
+        transactions = TransactionSink(lambda transaction: None, on_problem)
+        def event_sink(event):
+            jsonl(event)
+            transactions(event)
+    else:
+        transactions = TransactionSink(on_transaction, on_problem)
+        event_sink = transactions
+
+    with open(args.trace, newline="" if args.csv else None) as f:
+        checker = analyze_trace(read_changes(f, args), args.speed,
+                                args.expected_speed, event_sink)
+
+    transactions.flush()
+    if args.stats:
+        checker.report_run_stats()
+    print("%d changes, %d problems" % (checker.xsi.num_changes, len(problems)),
+          file=sys.stderr)
+    return 1 if problems else 0
+
+def batch_main(args):
+    # NumPy is only needed for the batch analysis
+    from i2c_edge_timing import analyze_edges
+
+    with open(args.trace, newline="" if args.csv else None) as f:
+        analysis = analyze_edges(read_changes(f, args), args.speed)
+
+    for time, name, value in analysis.violation_list():
+        print("VIOLATION @ %d: %s %gfs outside of limits" % (time, name, value))
+    if args.stats:
+        analysis.report()
+    return 1 if analysis.num_violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, START, STOP, REPEATED_START
+
+test_name = "i2c_master_async_batch_test"
+
+SPEED = 100
+BIT_TIME_FS = 10**12 // SPEED
+
+# The transactions of the i2c_master_test, with a repeated start after the
+# first
+expected_transactions = [
+    ("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+    ("r", 0x22, [0x99, 0x3a], [True, True, False]),
+    ("r", 0x22, [0xff], [True, False]),
+    ("w", 0x7b, [0xff, 0x00, 0xaa], [True, True, True, False]),
+    ("w", 0x31, [0xee], [True, False]),
+]
+
+expected_conditions = [START, REPEATED_START, STOP, START, STOP,
+                       START, STOP, START, STOP]
+
+expected_xcore_output = [
+    "xCORE got nack, 2",
+    "xCORE got ack, 2",
+    "xCORE got ack, 1",
+    "xCORE got nack, 3",
+    "xCORE got nack, 1",
+    "xCORE received: 0x99, 0x3A",
+    "xCORE received: 0xFF",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("impl", ["comb", "non_comb"])
+def test_async_batch(capfd, request, nightly, impl, arch):
+    """ Check that a batch submitted to the async master is performed back to
+        back, and the results of each operation returned.
+    """
+    cwd = Path(request.fspath).parent
+    cfg = f"{impl}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               tx_data = [0x99, 0x3A, 0xff],
+                               expected_speed = SPEED,
+                               ack_sequence = [ack for _, _, _, acks in expected_transactions
+                                               for ack in acks],
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+
+    conditions = [event for event in sink.events
+                  if event.kind in (START, REPEATED_START, STOP)]
+    assert [event.kind for event in conditions] == expected_conditions
+
+    # The bus is not left idle waiting for the client between operations
+    for stop, start in zip(conditions, conditions[1:]):
+        if stop.kind == STOP:
+            assert start.time - stop.time < 2 * BIT_TIME_FS
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("xCORE")]
+    assert xcore_output == expected_xcore_output
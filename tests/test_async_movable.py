@@ -0,0 +1,45 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_golden import GoldenSink
+from i2c_scenarios import master_test
+
+test_name = "i2c_master_async_movable_test"
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("impl", ["comb", "non_comb"])
+@pytest.mark.parametrize("stop", ["stop", "no_stop"])
+def test_async_movable(run_sim, request, nightly, impl, stop, arch):
+    """ Check the transactions of i2c_master_test made with buffers moved to
+        the async master, which are larger than its local buffer.
+    """
+    cwd = Path(request.fspath).parent
+    cfg = f"{impl}_{arch}_{stop}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    tx_data = [0x99, 0x3A, 0xff]
+    ack_sequence = [True, True, False,
+                    True,
+                    True,
+                    True, True, True, False,
+                    True, False]
+    expected = master_test(stop, tx_data, ack_sequence)
+    golden = GoldenSink(expected.records)
+
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               tx_data = tx_data,
+                               expected_speed = 100,
+                               ack_sequence = ack_sequence,
+                               event_sink = golden,
+                               text_output = False)
+
+    run_sim(binary,
+            simthreads = [checker],
+            golden = golden,
+            output = expected.output,
+            simargs = ['--weak-external-drive'])
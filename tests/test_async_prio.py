@@ -0,0 +1,118 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import re
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, group_transactions, \
+                       START, REPEATED_START, STOP, ADDRESS
+
+test_name = "i2c_master_async_prio_test"
+
+CONTROL_ADDR = 0x3c
+POLLER_ADDRS = (0x22, 0x23)
+NUM_CONTROL_WRITES = 16
+POLL_BYTES = 4
+
+# Allowance for the master to pick up the results and accept the next request
+SLACK_FS = 20 * 10**9
+TICK_FS = 10**7
+
+def transaction_durations(events):
+    """ The time from the start to the stop of each transaction, keyed by
+        device address.
+    """
+    durations = {}
+    start = address = None
+    for event in events:
+        if event.kind in (START, REPEATED_START):
+            start = event.time
+        elif event.kind == ADDRESS:
+            address = event.value >> 1
+        elif event.kind == STOP and start is not None:
+            durations.setdefault(address, []).append(event.time - start)
+            start = None
+    return durations
+
+def run_prio_test(capfd, cwd, prio, arch):
+    """ Run a build of the test, check its transactions and bounds and
+        return the wait statistics of each client and the duration of the
+        longest transaction.
+    """
+    cfg = f"{prio}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               expected_speed = 400,
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    # The order of the transactions depends on the arbitration, so only their
+    # contents are checked
+    transactions = group_transactions(sink.events)
+    expected = []
+    for transaction in transactions:
+        if transaction.address == CONTROL_ADDR:
+            expected.append(("w", CONTROL_ADDR,
+                             [0x10, len([t for t in expected if t[1] == CONTROL_ADDR])],
+                             [True] * 3))
+        else:
+            assert transaction.address in POLLER_ADDRS
+            expected.append(("r", transaction.address, [0xab] * POLL_BYTES,
+                             [True] * POLL_BYTES + [False]))
+    differences = diff_events(expected, sink.events)
+    assert not differences, "\n".join(differences)
+    assert len([t for t in transactions if t.address == CONTROL_ADDR]) == NUM_CONTROL_WRITES
+
+    out, _ = capfd.readouterr()
+    stats = {}
+    for client, ops, p50, p99, wait_max in re.findall(
+            r"XCORE: client (\d+) ops (\d+) wait p50 (\d+) p99 (\d+) max (\d+)", out):
+        stats[int(client)] = {"ops": int(ops), "p50": int(p50) * TICK_FS,
+                              "p99": int(p99) * TICK_FS, "max": int(wait_max) * TICK_FS}
+        print(f"{prio} client {client}: {ops} ops, wait p50 {int(p50) / 100:.1f}us, "
+              f"p99 {int(p99) / 100:.1f}us, max {int(wait_max) / 100:.1f}us")
+    assert sorted(stats) == [0, 1, 2]
+
+    # A request waits for at most the operation in progress and one other
+    # operation that was accepted while it was being made
+    durations = transaction_durations(sink.events)
+    longest = max(max(durations[address]) for address in durations)
+    assert stats[0]["max"] <= 2 * longest + SLACK_FS
+    for client in (1, 2):
+        assert stats[client]["max"] <= 3 * longest + SLACK_FS
+
+    # The pollers have the same priority so are served in turn, other than
+    # as they are stopped one after the other
+    assert abs(stats[1]["ops"] - stats[2]["ops"]) <= 2
+    return stats, longest
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+def test_async_prio(capfd, request, nightly, arch):
+    """ Measure how long the requests of a control client and two pollers
+        wait for i2c_master_async under contention, with and without a higher
+        priority for the control client. Check that the waits are bounded,
+        that the pollers are served fairly and that the priority cuts the
+        tail latency of the control client.
+    """
+    cwd = Path(request.fspath).parent
+    no_prio_stats, _ = run_prio_test(capfd, cwd, "no_prio", arch)
+    prio_stats, longest = run_prio_test(capfd, cwd, "prio", arch)
+
+    # With priority the control client only waits for the transaction in
+    # progress, where with round-robin it also waits for a poller's turn
+    assert prio_stats[0]["max"] <= longest + SLACK_FS
+    assert prio_stats[0]["max"] < no_prio_stats[0]["p99"]
@@ -0,0 +1,150 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+import io
+import pytest
+from i2c_bus_model import I2CBusModel, I2CMasterModel, I2CSlaveModel, I2CSlaveDeviceModel
+from i2c_master_checker import I2CMasterChecker
+from i2c_slave_checker import I2CSlaveChecker
+from i2c_events import ListSink, diff_events
+
+# These tests run the checkers against models of the lib_i2c master and slave
+# rather than the simulator, using the transactions of i2c_master_test and
+# i2c_slave_test
+
+def master_program(stop):
+    return [("w", 0x3c, [0x90, 0xfe], stop),
+            ("r", 0x22, 2, stop),
+            ("r", 0x22, 1, stop),
+            ("w", 0x7b, [0xff, 0x00, 0xaa], stop),
+            ("w", 0x31, [0xee], stop)]
+
+master_transactions = [
+    ("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+    ("r", 0x22, [0x99, 0x3a], [True, True, False]),
+    ("r", 0x22, [0xff], [True, False]),
+    ("w", 0x7b, [0xff, 0x00, 0xaa], [True, True, True, False]),
+    ("w", 0x31, [0xee], [True, False]),
+]
+
+# The results the xCORE prints in i2c_master_test
+master_results = [(False, 2), (True, [0x99, 0x3a]), (True, [0xff]), (False, 3), (False, 1)]
+
+@pytest.mark.parametrize("speed", [10, 100, 400, 1000])
+@pytest.mark.parametrize("stop", ["stop", "no_stop"])
+@pytest.mark.parametrize("clock_stretch", [0, 5000])
+def test_bus_model_master(speed, stop, clock_stretch):
+    if clock_stretch and speed != 400:
+        pytest.skip("Clock stretching only tested at 400 kbps")
+
+    bus = I2CBusModel()
+    master = I2CMasterModel(bus, "scl", "sda", speed, master_program(stop == "stop"))
+    sink = ListSink()
+    checker = I2CMasterChecker("scl", "sda",
+                               tx_data = [0x99, 0x3A, 0xff],
+                               expected_speed = 160 if clock_stretch else speed,
+                               clock_stretch = clock_stretch,
+                               ack_sequence=[True, True, False,
+                                             True,
+                                             True,
+                                             True, True, True, False,
+                                             True, False],
+                               original_speed = speed,
+                               event_sink = sink,
+                               text_output = False)
+    bus.register_simthread(checker)
+    bus.add_model(master.run())
+    bus.run()
+
+    differences = diff_events(master_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+    assert master.results == master_results
+
+def test_bus_model_two_checkers():
+    """ The first checker runs the event loop from its waits and the second
+        runs in its own thread; a passive checker sees the same transactions
+        as the checker acting as the slave.
+    """
+    bus = I2CBusModel()
+    master = I2CMasterModel(bus, "scl", "sda", 400, master_program(True))
+    sink = ListSink()
+    checker = I2CMasterChecker("scl", "sda",
+                               tx_data = [0x99, 0x3A, 0xff],
+                               expected_speed = 400,
+                               ack_sequence=[True, True, False,
+                                             True,
+                                             True,
+                                             True, True, True, False,
+                                             True, False],
+                               event_sink = sink,
+                               text_output = False)
+    monitor_sink = ListSink()
+    monitor = I2CMasterChecker("scl", "sda", 400, passive = True,
+                               event_sink = monitor_sink, text_output = False)
+    bus.register_simthread(checker)
+    bus.register_simthread(monitor)
+    bus.add_model(master.run())
+    bus.run()
+
+    for events in (sink.events, monitor_sink.events):
+        differences = diff_events(master_transactions, events)
+        assert not differences, "\n".join(differences)
+    assert master.results == master_results
+
+def test_bus_model_speed_error_text(capsys):
+    """ A speed error is printed without the time and ahead of the byte, so
+        before the start of the transaction as the checker has always printed.
+    """
+    bus = I2CBusModel()
+    master = I2CMasterModel(bus, "scl", "sda", 400, [("w", 0x3c, [0x90], True)])
+    checker = I2CMasterChecker("scl", "sda", expected_speed = 100,
+                               ack_sequence = [True], original_speed = 400)
+    bus.register_simthread(checker)
+    bus.add_model(master.run())
+    bus.run()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:5] == ["Start bit received",
+                         "ERROR: speed is faster than expected",
+                         "Byte received: 0x78",
+                         "Speed = 400 Kbps",
+                         "Master write transaction started, device address=0x3c"]
+
+@pytest.mark.parametrize("speed", [10, 100, 400, 1000])
+def test_bus_model_slave(speed):
+    bus = I2CBusModel(trace=True)
+    device = I2CSlaveDeviceModel(tx_data=[0xff, 0x01, 0x99, 0x20, 0x33, 0xee],
+                                 ack_sequence=[True, True, False,
+                                               False,
+                                               True, False])
+    slave = I2CSlaveModel(bus, "scl", "sda", 0x3c, device)
+    sink = ListSink()
+    checker = I2CSlaveChecker("scl", "sda",
+                              tsequence =
+                              [("w", 0x3c, [0x33, 0x44, 0x3]),
+                               ("r", 0x3c, 3),
+                               ("w", 0x3c, [0x99]),
+                               ("w", 0x44, [0x33]),
+                               ("r", 0x3c, 1),
+                               ("w", 0x3c, [0x22, 0xff])],
+                              speed = speed,
+                              event_sink = sink,
+                              text_output = False)
+    bus.register_simthread(checker)
+    bus.add_model(slave.run())
+    bus.run()
+
+    expected = [("w", 0x3c, [0x33, 0x44, 0x3], [True, True, True, False]),
+                ("r", 0x3c, [0xff, 0x01, 0x99], [True, True, True, False]),
+                ("w", 0x3c, [0x99], [True, False]),
+                ("w", 0x44, [0x33], [False, False]),
+                ("r", 0x3c, [0x20], [True, False]),
+                ("w", 0x3c, [0x22, 0xff], [True, True, False])]
+    differences = diff_events(expected, sink.events)
+    assert not differences, "\n".join(differences)
+    assert device.received == [0x33, 0x44, 0x3, 0x99, 0x22, 0xff]
+    assert device.num_stop_bits == 5
+
+    vcd = io.StringIO()
+    bus.write_vcd(vcd, ["scl", "sda"])
+    assert "$enddefinitions $end" in vcd.getvalue()
+    assert len(bus.trace) == bus.num_changes
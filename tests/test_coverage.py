@@ -0,0 +1,142 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+import json
+from i2c_coverage import Coverage, CoverageReport, collecting, redundant_configs, \
+                         SLAVE_TRANSITIONS, transition_name, XSIM, MODEL
+from i2c_fuzz import Case, run_master_case, run_slave_case
+from i2c_master_checker import I2CMasterChecker
+from i2c_slave_checker import I2CSlaveChecker
+
+# These tests collect coverage from runs of the checkers against the models
+# of the lib_i2c master and slave (see i2c_bus_model)
+
+def test_master_coverage():
+    case = Case(speed = 400, clock_stretch = 0,
+                ops = [("w", 0x3c, [0x90, 0xfe], False),
+                       ("r", 0x22, 2, True)],
+                tx_data = [0x99, 0x3a],
+                ack_sequence = [True, True, False])
+    coverage = Coverage()
+    with collecting(coverage):
+        assert run_master_case(case) == []
+    data = coverage.to_dict()
+
+    transitions = data["transitions"]["I2CMasterChecker"]
+    counts = transitions["counts"]
+    assert counts["STOPPED -> STARTING"] == 1
+    assert counts["CHECK_START_STOP -> REPEAT_START"] == 1
+    assert counts["CHECK_START_STOP -> STOPPED"] == 1
+    assert counts["SAMPLE_ACK -> NACKED"] == 2
+    assert counts["NACKED -> DRIVE_BIT"] == 2
+    # The two addresses and four data bytes
+    assert counts["SAMPLE_BIT -> BYTE_DONE"] == 6
+    assert set(counts) <= set(transitions["possible"])
+
+    margins = data["margins"]["Fast"]
+    assert margins["tLOW min"]["count"] > 0
+    assert margins["tLOW min"]["closest"] >= 0
+    assert margins["tLOW min"]["underflow"] == 0
+    assert sum(margins["tLOW min"]["buckets"]) + margins["tLOW min"]["overflow"] == \
+           margins["tLOW min"]["count"]
+    assert "tVD;DAT max" in margins
+
+def test_slave_coverage():
+    # Covers every transition of i2c_slave()
+    case = Case(speed = 100, clock_stretch = 0,
+                ops = [("w", 0x3c, [0x01, 0x02], False),
+                       ("r", 0x3c, 2, True),
+                       ("w", 0x44, [0x03], True),
+                       ("w", 0x3c, [], True)],
+                tx_data = [0x10, 0x20],
+                ack_sequence = [True, False])
+    coverage = Coverage()
+    with collecting(coverage):
+        assert run_slave_case(case) == []
+    transitions = coverage.to_dict()["transitions"]["i2c_slave"]
+    assert set(transitions["counts"]) == {transition_name(*t) for t in SLAVE_TRANSITIONS}
+    assert transitions["counts"]["MASTER_WRITE -> READING_ADDR"] == 1
+    assert transitions["counts"]["ACK_WAIT_LOW -> MASTER_WRITE"] == 4
+    # The run was on the model of i2c_slave(), not the firmware
+    assert coverage.source == MODEL
+
+def test_slave_coverage_firmware():
+    """ The slave state machine is only counted for a named slave, under
+        its name.
+    """
+    coverage = Coverage()
+    with collecting(coverage):
+        I2CSlaveChecker("scl", "sda", 400, [("w", 0x3c, [])], text_output = False)
+        assert coverage.to_dict()["transitions"] == {}
+        I2CSlaveChecker("scl", "sda", 400, [("w", 0x3c, [])], text_output = False,
+                        slave_firmware = "i2c_slave")
+    assert list(coverage.to_dict()["transitions"]) == ["i2c_slave"]
+    assert coverage.source == XSIM
+
+def test_no_coverage():
+    with collecting(None):
+        checker = I2CMasterChecker("scl", "sda", 400)
+    assert checker._transitions is None
+    assert checker._margins is None
+
+def config(transitions, margins=None, source=XSIM):
+    return {"source": source,
+            "transitions": {"m": {"states": ["A", "B"],
+                                  "possible": ["A -> B", "B -> A", "B -> B"],
+                                  "counts": transitions}},
+            "margins": {"Fast": margins or {}}}
+
+def margin(closest, buckets, count=1):
+    return {"limit": 1000e6, "count": count, "closest": closest * 1e6,
+            "buckets": buckets, "underflow": 0, "overflow": 0}
+
+def test_coverage_report():
+    # Two parallel runs, each of which ran a test
+    run_1 = {"test_a": config({"A -> B": 3, "B -> A": 1},
+                              {"tLOW min": margin(50, [1] + [0] * 9)})}
+    run_2 = {"test_b": config({"A -> B": 2}, {"tLOW min": margin(500, [0] * 5 + [1] + [0] * 4)}),
+             "test_c": config({"A -> B": 1})}
+    report = CoverageReport(run_1)
+    report.add(json.loads(json.dumps(run_2)))
+
+    merged = report.merged()
+    assert merged["transitions"]["m"]["counts"] == {"A -> B": 6, "B -> A": 1}
+    assert merged["margins"]["Fast"]["tLOW min"]["closest"] == 50e6
+    assert merged["margins"]["Fast"]["tLOW min"]["count"] == 2
+
+    lines = report.lines()
+    assert lines[0] == "m: 2 of 3 transitions covered"
+    assert any("B -> B" in line and "NOT COVERED" in line for line in lines)
+    assert any("tLOW min" in line and "closest     50.0ns" in line for line in lines)
+    # test_b reaches a band of margin which test_a does not
+    assert lines[-2:] == ["1 of 3 configs can be dropped without losing any transition "
+                          "or band of timing margin", "  test_c"]
+
+    # The same config from another run is merged rather than replaced
+    report.add({"test_c": config({"B -> B": 1})})
+    assert report.configs["test_c"]["transitions"]["m"]["counts"] == {"A -> B": 1, "B -> B": 1}
+
+def test_coverage_report_models():
+    """ The configs run on the models are reported separately and are never
+        counted as redundant, nor do they make a simulator config redundant.
+    """
+    report = CoverageReport({"test_sim": config({"A -> B": 1}),
+                             "test_model": config({"A -> B": 1, "B -> A": 2}, source = MODEL)})
+    assert report.merged()["transitions"]["m"]["counts"] == {"A -> B": 1}
+    assert report.merged(MODEL)["transitions"]["m"]["counts"] == {"A -> B": 1, "B -> A": 2}
+
+    lines = report.lines()
+    assert lines[0] == "m: 1 of 3 transitions covered"
+    assert "Runs on the models (1 configs, not counted as redundant):" in lines
+    assert "  m: 2 of 3 transitions covered" in lines
+    assert lines[-1] == "0 of 1 configs can be dropped without losing any transition " \
+                        "or band of timing margin"
+
+    # Coverage written without a source is from the simulator
+    data = config({"B -> A": 1})
+    del data["source"]
+    report.add({"test_old": data})
+    assert report.configs["test_old"]["source"] == XSIM
+
+def test_redundant_configs():
+    assert redundant_configs({"a": {1, 2}, "b": {2, 3}, "c": {1, 3}, "d": {3}}) == ["c", "d"]
+    assert redundant_configs({"a": {1}, "b": {1}}) == ["b"]
@@ -0,0 +1,80 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+import pytest
+from i2c_edge_timing import analyze_edges
+from i2c_trace_analyzer import analyze_trace, main
+from i2c_timing import PARAMETER_NAMES, T_LOW, T_HIGH, T_HD_STA, T_SU_STA, T_SU_DAT, \
+                       T_VD_DAT, T_SU_STO, T_BUF
+from i2c_events import ListSink, VIOLATION
+from test_trace_analyzer import record_trace, SCL_PORT, SDA_PORT
+
+NS = 10**6
+
+def test_edge_timing_parameters():
+    """ Each parameter measured from a hand made trace of a START, one bit
+        and a STOP followed by a second START.
+    """
+    changes = [(1000 * NS, "sda", 0),   # START
+               (1600 * NS, "scl", 0),
+               (1900 * NS, "sda", 1),
+               (2900 * NS, "scl", 1),
+               (3800 * NS, "scl", 0),
+               (4000 * NS, "sda", 0),
+               (5300 * NS, "scl", 1),
+               (5900 * NS, "sda", 1),   # STOP
+               (7200 * NS, "sda", 0),   # START
+               (8000 * NS, "scl", 0)]
+    analysis = analyze_edges(changes, 400)
+
+    assert list(analysis.values[T_LOW]) == [1300 * NS, 1500 * NS]
+    assert list(analysis.values[T_HIGH]) == [900 * NS, 2700 * NS]
+    assert list(analysis.values[T_HD_STA]) == [600 * NS, 800 * NS]
+    assert list(analysis.values[T_SU_DAT]) == [1000 * NS, 1300 * NS]
+    assert list(analysis.values[T_VD_DAT]) == [300 * NS, 200 * NS]
+    assert list(analysis.values[T_SU_STO]) == [600 * NS]
+    assert list(analysis.values[T_BUF]) == [1300 * NS]
+    # Only the second START follows an SCL edge
+    assert list(analysis.values[T_SU_STA]) == [1900 * NS]
+    assert analysis.num_violations == 0
+    assert list(analysis.stretch) == [0, 100 * NS]
+
+    # Against the Standard-mode limits
+    analysis = analyze_edges(changes, 100)
+    violated = set(name for _, name, _ in analysis.violation_list())
+    assert violated == set(PARAMETER_NAMES) - {"tSU;DAT", "tVD;DAT"}
+
+@pytest.mark.parametrize("speed", [10, 100, 400, 1000])
+def test_edge_timing_bus_model(speed):
+    trace = record_trace(speed).trace
+    analysis = analyze_edges(trace, speed, SCL_PORT, SDA_PORT)
+    assert analysis.num_violations == 0, analysis.violation_list()
+
+    summary = analysis.summary()
+    assert summary["tLOW"]["count"] == summary["tHIGH"]["count"] + 1
+    assert summary["stretch"]["stretched"] == 0
+
+def test_edge_timing_matches_checker():
+    """ The batch analysis reports violations of the same parameters as the
+        checker for a Fast-mode trace checked against the Standard-mode limits.
+    """
+    trace = record_trace(400).trace
+    analysis = analyze_edges(trace, 100, SCL_PORT, SDA_PORT)
+    assert analysis.num_violations
+
+    sink = ListSink()
+    changes = [(time, "scl" if port == SCL_PORT else "sda", value)
+               for time, port, value in trace]
+    analyze_trace(changes, 100, event_sink=sink)
+    checker_times = set(event.time for event in sink.events if event.kind == VIOLATION)
+    assert checker_times <= set(time for time, _, _ in analysis.violation_list())
+
+def test_edge_timing_cli(tmp_path, capsys):
+    trace_path = tmp_path / "trace.vcd"
+    with open(trace_path, "w") as f:
+        record_trace(400).write_vcd(f)
+
+    args = [str(trace_path), "--scl", "XS1_PORT_1A", "--sda", "XS1_PORT_1B", "--batch"]
+    assert main(args + ["--speed", "400"]) == 0
+    assert main(args + ["--speed", "100"]) == 1
+    out, _ = capsys.readouterr()
+    assert out.startswith("VIOLATION @ ")
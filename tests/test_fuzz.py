@@ -0,0 +1,109 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import json
+import pytest
+from i2c_fuzz import Case, fuzz, format_failure, shrink, master_case, slave_case, \
+                     firmware_runner, master_case_bytes, slave_case_bytes, SLAVE_ADDRESS
+from i2c_scenarios import fuzz_slave_test
+from i2c_events import Transaction, START
+
+test_name = "i2c_fuzz_test"
+
+with open(Path(__file__).parent / f"{test_name}/test_params.json") as f:
+    params = json.load(f)
+
+# The seeds are split into chunks so that they are run by several workers
+NUM_CHUNKS = 4
+SEEDS_PER_CHUNK = 50
+NIGHTLY_SEEDS_PER_CHUNK = 1000
+
+# The seeds run nightly on the firmware, which takes seconds per case on the
+# simulator
+FIRMWARE_SEEDS = 25
+
+@pytest.mark.parametrize("side", ["master", "slave"])
+@pytest.mark.parametrize("chunk", range(NUM_CHUNKS))
+def test_fuzz(nightly, side, chunk):
+    """ Run random traffic through the checkers and the models of the master
+        and slave, with many more seeds nightly.
+    """
+    num_seeds = NIGHTLY_SEEDS_PER_CHUNK if nightly else SEEDS_PER_CHUNK
+    seeds = range(chunk * num_seeds, (chunk + 1) * num_seeds)
+    failures = fuzz(side, seeds)
+    assert not failures, "\n".join(format_failure(side, *failure) for failure in failures)
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("side", ["master", "slave"])
+def test_fuzz_firmware(capfd, request, monkeypatch, tmp_path, nightly, side, arch):
+    """ Run the cases of the first seeds on i2c_fuzz_test under the
+        simulator, checked by the same golden model as the model runs and
+        shrunk on the firmware if they fail.
+    """
+    if not nightly:
+        pytest.skip("Firmware fuzzing is only run nightly")
+
+    cwd = Path(request.fspath).parent
+    def binary(case):
+        cfg = f"master_{case.speed}_{arch}" if side == "master" else f"slave_{arch}"
+        return f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    for speed in params['SPEEDS']:
+        path = binary(Case(speed, 0, [], [], []))
+        assert Path(path).exists(), f"Cannot find {path}"
+
+    # The firmware reads each case from the working directory
+    monkeypatch.chdir(tmp_path)
+    failures = fuzz(side, range(FIRMWARE_SEEDS), firmware_runner(side, binary, capfd))
+    assert not failures, "\n".join(format_failure(side, *failure) for failure in failures)
+
+def test_fuzz_case_bytes():
+    case = Case(speed = 400, clock_stretch = 0,
+                ops = [("w", 0x3c, [0x01, 0x02], True),
+                       ("r", 0x22, 3, False)],
+                tx_data = [0x11, 0x22],
+                ack_sequence = [True, False])
+    assert master_case_bytes(case) == bytes([3,
+                                             ord("w"), 0x3c, 2, 1, 0x01, 0x02,
+                                             ord("r"), 0x22, 3, 0,
+                                             ord("s"), 0, 0, 0])
+    # One write to the slave, after which it exits on the next
+    assert slave_case_bytes(case) == bytes([1, 2, 0x11, 0x22, 2, 1, 0])
+
+def test_fuzz_slave_firmware_expected():
+    """ The slave firmware exits when asked to ACK the final empty write, so
+        neither its request nor its stop bit is expected.
+    """
+    tsequence = [("w", SLAVE_ADDRESS, [0x05], True)]
+    expected = fuzz_slave_test(tsequence, SLAVE_ADDRESS, [0x11], [])
+    assert expected.output == ["xCORE got start of write transaction",
+                               "xCORE got data: 0x5",
+                               "xCORE got stop bit"]
+    assert expected.records[-2:] == [START, Transaction("w", SLAVE_ADDRESS, [], None)]
+
+def test_fuzz_cases_are_seeded():
+    assert master_case(7) == master_case(7)
+    assert slave_case(7) == slave_case(7)
+    assert master_case(7) != master_case(8)
+
+def test_fuzz_shrink():
+    """ Shrink a case against a run which fails whenever there is a read of
+        more than one byte without a stop bit.
+    """
+    def run(case):
+        return ["long read"] if any(op[0] == "r" and op[2] > 1 and not op[3]
+                                    for op in case.ops) else []
+
+    case = Case(speed = 400, clock_stretch = 5000,
+                ops = [("w", 0x3c, [0x01, 0x02], True),
+                       ("r", 0x22, 4, False),
+                       ("w", 0x3c, [0x03], False),
+                       ("r", 0x22, 3, True)],
+                tx_data = [0x11, 0x22],
+                ack_sequence = [True, False, True])
+    case, differences = shrink(run, case, run(case))
+    assert differences == ["long read"]
+    assert case == Case(speed = 400, clock_stretch = 0,
+                        ops = [("r", 0x22, 2, False)],
+                        tx_data = [0x11],
+                        ack_sequence = [])
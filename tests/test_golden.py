@@ -0,0 +1,146 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from i2c_golden import GoldenSink, master_golden, slave_golden, diff_output, \
+                       firmware_output, FRAMING_KINDS
+from i2c_events import Event, START, REPEATED_START, STOP, \
+                       ADDRESS, BYTE, ACK, ERROR, MASTER, SLAVE
+
+NUM_TRANSACTIONS = 10**5
+NIGHTLY_NUM_TRANSACTIONS = 10**6
+
+def record_events(records):
+    """ Generate the events that a checker emits for a sequence of records.
+    """
+    time = 0
+    for record in records:
+        time += 1
+        if record in FRAMING_KINDS:
+            yield Event(time, record)
+            continue
+        mode, address, data, acks = record
+        reading = (mode == "r")
+        yield Event(time, ADDRESS, (address << 1) | reading, MASTER)
+        yield Event(time, ACK, 0 if acks[0] else 1, SLAVE)
+        for byte, ack in zip(data, acks[1:]):
+            yield Event(time, BYTE, byte, SLAVE if reading else MASTER)
+            yield Event(time, ACK, 0 if ack else 1, MASTER if reading else SLAVE)
+
+def check(records, events):
+    sink = GoldenSink(records)
+    for event in events:
+        sink(event)
+    return sink.finish()
+
+def test_master_golden():
+    golden = master_golden([("w", 0x3c, [0x90, 0xfe], False),
+                            ("r", 0x22, 2, True),
+                            ("t", 0x44, [0x10], 1),
+                            ("t", 0x45, [0x10, 0x11], 1),
+                            ("r", 0x88, 1, False),
+                            ("stop",)],
+                           tx_data = [0x99, 0x3a, 0x5a],
+                           ack_sequence = [True, True, False,
+                                           True,
+                                           True, True, True,
+                                           True, True, False])
+    assert golden.records == [
+        START, ("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+        REPEATED_START, ("r", 0x22, [0x99, 0x3a], [True, True, False]), STOP,
+        START, ("w", 0x44, [0x10], [True, True]),
+        REPEATED_START, ("r", 0x44, [0x5a], [True, False]), STOP,
+        # The read of a transfer is not made if the write is NACKed
+        START, ("w", 0x45, [0x10, 0x11], [True, True, False]), STOP,
+        # The device is truncated to 7 bits and the checker sends its default
+        START, ("r", 0x08, [0xab], [True, False]),
+        STOP]
+    assert golden.results == [(False, 2), (True, [0x99, 0x3a]), (True, [0x5a]),
+                              (False, []), (True, [0xab])]
+
+def test_master_golden_nacked_read():
+    # The checker takes a byte of its tx_data for a read that it NACKs
+    golden = master_golden([("r", 0x22, 2, True), ("r", 0x22, 1, True)],
+                           tx_data = [0x11, 0x22], ack_sequence = [False])
+    assert golden.records == [START, ("r", 0x22, [], [False]), STOP,
+                              START, ("r", 0x22, [0x22], [True, False]), STOP]
+    assert golden.results == [(False, []), (True, [0x22])]
+
+def test_slave_golden():
+    golden = slave_golden([("w", 0x3c, [0x01, 0x02], False),
+                           ("r", 0x3c, 3),
+                           ("w", 0x44, [0x03]),
+                           ("r", 0x44, 1),
+                           ("w", 0x3c, [0x04, 0xff, 0x05])],
+                          0x3c, tx_data = [0x10, 0x20], ack_sequence = [True, False],
+                          exit_data = 0xff)
+    assert golden.records == [
+        START, ("w", 0x3c, [0x01, 0x02], [True, True, False]),
+        REPEATED_START, ("r", 0x3c, [0x10, 0x20, 0x10], [True, True, True, False]), STOP,
+        START, ("w", 0x44, [0x03], [False, False]), STOP,
+        START, ("r", 0x44, [0xff], [False, False]), STOP,
+        # The application exits before it ACKs 0xff
+        START, ("w", 0x3c, [0x04, 0xff], [True, True])]
+    assert golden.results == [
+        ("ack_write_request",), ("master_sent_data", 0x01), ("master_sent_data", 0x02),
+        ("ack_read_request",), ("master_requires_data", 0x10),
+        ("master_requires_data", 0x20), ("master_requires_data", 0x10),
+        ("stop_bit",),
+        ("ack_write_request",), ("master_sent_data", 0x04), ("master_sent_data", 0xff)]
+
+def test_golden_sink_differences():
+    records = [START, ("w", 0x3c, [0x90], [True, True]), STOP,
+               START, ("r", 0x22, [0x99], None), STOP]
+    events = list(record_events(records[:3] + [START, ("r", 0x22, [0x99], [True, False]), STOP]))
+    assert check(records, events) == []
+
+    # The acks of a record left as None are not checked
+    nacked = list(record_events(records[:3] + [START, ("r", 0x22, [0x99], [False, True]), STOP]))
+    assert check(records, nacked) == []
+
+    wrong = list(record_events([START, ("w", 0x3c, [0x91], [True, True]), REPEATED_START]))
+    assert check(records, wrong) == [
+        "Transaction 1: expected data [0x90], got [0x91]",
+        "Record 2: expected STOP, got REPEATED_START",
+        "Expected 6 records, got 3, next expected START"]
+
+    problem = Event(0, ERROR, detail = "bus error")
+    assert check(records, events + [problem] + events[:1]) == [
+        "ERROR @ 0: bus error",
+        "Expected 6 records, got 7"]
+
+def test_golden_sink_max_differences():
+    records = [START, ("w", 0x3c, [0x90], [True, True]), STOP] * 10
+    events = record_events([START, ("w", 0x3c, [0x91], [True, True]), STOP] * 10)
+    sink = GoldenSink(records, max_differences = 3)
+    for event in events:
+        sink(event)
+    differences = sink.finish()
+    assert len(differences) == 4
+    assert differences[-1] == "... and 7 more differences"
+
+def test_golden_sink_long_run(nightly):
+    """ Check a long run of transactions, as the records of a simulation of
+        that length would be checked.
+    """
+    num_transactions = NIGHTLY_NUM_TRANSACTIONS if nightly else NUM_TRANSACTIONS
+    ops = [("w", 0x3c, [k & 0xff, 0x55], k % 3 == 0) if k % 2 else
+           ("r", 0x22, 1 + k % 4, k % 5 == 0)
+           for k in range(num_transactions)]
+    ack_sequence = [k % 7 != 0 for k in range(2 * num_transactions)]
+    golden = master_golden(ops + [("stop",)],
+                           tx_data = [k & 0xff for k in range(num_transactions)],
+                           ack_sequence = ack_sequence)
+    assert check(golden.records, record_events(golden.records)) == []
+
+    # A difference at the end of the run is found
+    events = record_events(golden.records[:-1] + [REPEATED_START])
+    assert check(golden.records, events) == [
+        "Record %d: expected STOP, got REPEATED_START" % (len(golden.records) - 1)]
+
+def test_firmware_output():
+    out = "Start bit received\nxCORE got ack, 2\n  XCORE: val=3A\nother\n"
+    assert firmware_output(out) == ["xCORE got ack, 2", "XCORE: val=3A"]
+    assert diff_output(["xCORE got ack, 2", "XCORE: val=3A"], firmware_output(out)) == []
+    assert diff_output(["xCORE got ack, 2", "XCORE: val=3a", "XCORE: ACK"],
+                       firmware_output(out)) == [
+        "Output line 1: expected 'XCORE: val=3a', got 'XCORE: val=3A'",
+        "Missing output lines ['XCORE: ACK']"]
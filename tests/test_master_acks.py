@@ -1,10 +1,11 @@
 # Copyright 2014-2025 XMOS LIMITED.
 # This Software is subject to the terms of the XMOS Public Licence: Version 1.
 from pathlib import Path
-import Pyxsim
 import pytest
 import json
 from i2c_master_checker import I2CMasterChecker
+from i2c_golden import GoldenSink
+from i2c_scenarios import master_test
 
 test_name = "i2c_master_test"
 
@@ -15,34 +16,30 @@ with open(Path(__file__).parent / f"{test_name}/test_params.json") as f:
 @pytest.mark.parametrize("dir", ["tx_only"]) # Tests only test the tx_only
 @pytest.mark.parametrize("speed", [400]) # Tests only test speed = 400
 @pytest.mark.parametrize("stop", params['STOPS'])
-def test_master_acks(capfd, request, nightly, dir, speed, stop, arch):
+def test_master_acks(run_sim, request, nightly, dir, speed, stop, arch):
     cwd = Path(request.fspath).parent
     cfg = f"{dir}_{speed}_{stop}_{arch}"
     binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
 
     assert Path(binary).exists(), f"Cannot find {binary}"
 
+    tx_data = [0x99, 0x3A, 0xff]
+    ack_sequence = [True, True, True,
+                    True, True, False,
+                    False, True]
+    expected = master_test(stop, tx_data, ack_sequence, rx = False)
+    golden = GoldenSink(expected.records)
+
     checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
                                "tile[0]:XS1_PORT_1B",
-                               tx_data = [0x99, 0x3A, 0xff],
+                               tx_data = tx_data,
                                expected_speed = speed,
-                               ack_sequence=[True, True, True,
-                                             True, True, False,
-                                             False, True])
-
-
-    tester = Pyxsim.testers.AssertiveComparisonTester(
-        f'{cwd}/expected/ack_test_{stop}.expect',
-        regexp = True,
-        ordered = True,
-        suppress_multidrive_messages=True,
-    )
-
-    Pyxsim.run_on_simulator_(
-        binary,
-        tester = tester,
-        do_xe_prebuild = False,
-        simthreads = [checker],
-        simargs=['--weak-external-drive'],
-        capfd=capfd
-        )
+                               ack_sequence = ack_sequence,
+                               event_sink = golden,
+                               text_output = False)
+
+    run_sim(binary,
+            simthreads = [checker],
+            golden = golden,
+            output = expected.output,
+            simargs = ['--weak-external-drive'])
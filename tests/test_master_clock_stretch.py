@@ -4,11 +4,19 @@ from pathlib import Path
 import Pyxsim
 import pytest
 import json
+import time
 from i2c_master_checker import I2CMasterChecker
+from i2c_golden import GoldenSink, diff_run
+from i2c_scenarios import master_test
 
 DEBUG = False
 test_name = "i2c_master_test"
 
+# A stretched byte takes 400/160 times as long on the bus. Allow twice that
+# in wall time per byte, which leaves room for the wait condition that the
+# simulator still checks every cycle while the clock is stretched
+MAX_STRETCH_SLOWDOWN = 2 * 400 / 160
+
 with open(Path(__file__).parent / f"{test_name}/test_params.json") as f:
     params = json.load(f)
 
@@ -16,54 +24,126 @@ with open(Path(__file__).parent / f"{test_name}/test_params.json") as f:
 @pytest.mark.parametrize("dir", ["rx_tx"]) # only test the rx_tx config
 @pytest.mark.parametrize("speed", [400]) # only test speed = 400
 @pytest.mark.parametrize("stop", params['STOPS'])
-def test_master_clock_stretch(capfd, request, nightly, dir, speed, stop, arch):
+def test_master_clock_stretch(capfd, run_sim, request, nightly, dir, speed, stop, arch):
     cwd = Path(request.fspath).parent
     cfg = f"{dir}_{speed}_{stop}_{arch}"
     binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
 
     assert Path(binary).exists(), f"Cannot find {binary}"
 
+    tx_data = [0x99, 0x3A, 0xff]
+    ack_sequence = [True, True, False, # Master write
+                    True, # Master read
+                    True, # Master read
+                    True, True, True, False, # Master write
+                    True, False] # Master write
+    expected = master_test(stop, tx_data, ack_sequence)
+    golden = GoldenSink(expected.records)
+
     checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
                                "tile[0]:XS1_PORT_1B",
-                               tx_data = [0x99, 0x3A, 0xff],
+                               tx_data = tx_data,
                                expected_speed=160,
                                clock_stretch=5000,
-                               ack_sequence=[True, True, False, # Master write
-                                             True, # Master read
-                                             True, # Master read
-                                             True, True, True, False, # Master write
-                                             True, False], # Master write
-                               original_speed = speed # Timing checks use the original speed that the I2C master is configured to run at
+                               ack_sequence=ack_sequence,
+                               original_speed = speed, # Timing checks use the original speed that the I2C master is configured to run at
+                               event_sink = golden,
+                               text_output = False
                                )
 
-    tester = Pyxsim.testers.AssertiveComparisonTester(
-        f'{cwd}/expected/master_test_{stop}.expect',
-        regexp = True,
-        ordered = True,
-        suppress_multidrive_messages=True,
-    )
-
     if DEBUG:
-        with capfd.disabled():
-            Pyxsim.run_on_simulator_(
-                binary,
-                tester = tester,
-                do_xe_prebuild = False,
-                simthreads=[checker],
-                simargs=[
-                    "--vcd-tracing",
-                    f"-o i2c_trace.vcd -tile tile[0] -cycles -ports -ports-detailed -cores -instructions",
-                    "--trace-to",
-                    f"i2c_trace.txt",
-                    '--weak-external-drive'
-                ],
-            )
+        Pyxsim.run_on_simulator_(
+            binary,
+            do_xe_prebuild = False,
+            simthreads=[checker],
+            simargs=[
+                "--vcd-tracing",
+                f"-o i2c_trace.vcd -tile tile[0] -cycles -ports -ports-detailed -cores -instructions",
+                "--trace-to",
+                f"i2c_trace.txt",
+                '--weak-external-drive'
+            ],
+            capfd=capfd
+        )
+        out, _ = capfd.readouterr()
+        differences = diff_run(golden, expected.output, out)
+        assert not differences, "\n".join(differences)
     else:
+        run_sim(binary,
+                simthreads = [checker],
+                golden = golden,
+                output = expected.output,
+                simargs = ['--weak-external-drive'])
+
+
+@pytest.mark.parametrize("arch", ["xs3"])
+@pytest.mark.parametrize("stop", ["stop"])
+def test_master_clock_stretch_benchmark(capfd, request, nightly, stop, arch):
+    """ Compare the wall time per simulated byte with and without clock
+        stretching enabled in the checker, which must be within
+        MAX_STRETCH_SLOWDOWN.
+    """
+    if not nightly:
+        pytest.skip("Benchmark is only run nightly")
+
+    cwd = Path(request.fspath).parent
+    speed = 400
+    cfg = f"rx_tx_{speed}_{stop}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    tx_data = [0x99, 0x3A, 0xff]
+    ack_sequence = [True, True, False,
+                    True,
+                    True,
+                    True, True, True, False,
+                    True, False]
+    expected = master_test(stop, tx_data, ack_sequence)
+
+    results = []
+    checkers = []
+    for clock_stretch, expected_speed in [(0, speed), (5000, 160)]:
+        golden = GoldenSink(expected.records)
+        checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                                   "tile[0]:XS1_PORT_1B",
+                                   tx_data = tx_data,
+                                   expected_speed=expected_speed,
+                                   clock_stretch=clock_stretch,
+                                   ack_sequence=ack_sequence,
+                                   original_speed = speed,
+                                   event_sink = golden,
+                                   text_output = False)
+
+        start = time.perf_counter()
         Pyxsim.run_on_simulator_(
             binary,
-            tester = tester,
             do_xe_prebuild = False,
             simthreads = [checker],
             simargs=['--weak-external-drive'],
             capfd=capfd
             )
+        wall_time = time.perf_counter() - start
+
+        out, _ = capfd.readouterr()
+        differences = diff_run(golden, expected.output, out)
+        assert not differences, "\n".join(differences)
+        assert checker.num_bytes, "No bytes were checked"
+        results.append((clock_stretch, wall_time, checker.num_bytes))
+        checkers.append(checker)
+
+    with capfd.disabled():
+        print()
+        print(f"{'stretch (ns)':>12} {'wall (s)':>10} {'bytes':>6} {'ms/byte':>8}")
+        for clock_stretch, wall_time, num_bytes in results:
+            print(f"{clock_stretch:>12} {wall_time:>10.2f} {num_bytes:>6} "
+                  f"{1000 * wall_time / num_bytes:>8.2f}")
+        (_, base_time, base_bytes), (_, stretch_time, stretch_bytes) = results
+        slowdown = (stretch_time / stretch_bytes) / (base_time / base_bytes)
+        print("Stretched/unstretched wall time per byte: %.2f" % slowdown)
+        for checker in checkers:
+            checker.report_run_stats()
+
+    assert slowdown <= MAX_STRETCH_SLOWDOWN, \
+        "Stretched bytes take %.2f times as long to check, more than %.2f" % \
+        (slowdown, MAX_STRETCH_SLOWDOWN)
@@ -0,0 +1,84 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+import json
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import JsonlSink, read_jsonl_events, diff_events, STOP, REPEATED_START
+
+test_name = "i2c_master_test"
+
+with open(Path(__file__).parent / f"{test_name}/test_params.json") as f:
+    params = json.load(f)
+
+expected_transactions = [
+    ("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+    ("r", 0x22, [0x99, 0x3a], [True, True, False]),
+    ("r", 0x22, [0xff], [True, False]),
+    ("w", 0x7b, [0xff, 0x00, 0xaa], [True, True, True, False]),
+    ("w", 0x31, [0xee], [True, False]),
+]
+
+expected_xcore_output = [
+    "xCORE got nack, 2",
+    "xCORE got nack, 3",
+    "xCORE got nack, 1",
+    "xCORE got ack",
+    "xCORE received: 0x99, 0x3A",
+    "xCORE got ack",
+    "xCORE received: 0xFF",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("speed", [400])
+@pytest.mark.parametrize("stop", params['STOPS'])
+def test_master_events(capfd, request, tmp_path, nightly, speed, stop, arch):
+    """ Check the master test using the structured events of the checker
+        rather than comparing its text output.
+    """
+    cwd = Path(request.fspath).parent
+    cfg = f"rx_tx_{speed}_{stop}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    log_path = tmp_path / "events.jsonl"
+    with open(log_path, "w") as log:
+        checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                                   "tile[0]:XS1_PORT_1B",
+                                   tx_data = [0x99, 0x3A, 0xff],
+                                   expected_speed = speed,
+                                   ack_sequence=[True, True, False,
+                                                 True,
+                                                 True,
+                                                 True, True, True, False,
+                                                 True, False],
+                                   event_sink = JsonlSink(log),
+                                   text_output = False)
+
+        Pyxsim.run_on_simulator_(
+            binary,
+            do_xe_prebuild = False,
+            simthreads = [checker],
+            simargs=['--weak-external-drive'],
+            capfd=capfd
+            )
+
+    with open(log_path) as log:
+        events = list(read_jsonl_events(log))
+
+    differences = diff_events(expected_transactions, events)
+    assert not differences, "\n".join(differences)
+
+    # Without stops the transactions are separated by repeated starts
+    kinds = [event.kind for event in events if event.kind in (STOP, REPEATED_START)]
+    if stop == "stop":
+        assert kinds == [STOP] * len(expected_transactions)
+    else:
+        assert kinds == [REPEATED_START] * (len(expected_transactions) - 1)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("xCORE")]
+    assert xcore_output == expected_xcore_output
@@ -0,0 +1,98 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, START, REPEATED_START, STOP
+
+test_name = "i2c_master_multi_bus_test"
+
+SPEED = 100
+
+# The slave on bus 2 stretches the clock, which slows that bus down to two
+# thirds of its speed, as the master then checks SCL a tick later in each bit
+CLOCK_STRETCH = 9000
+
+# For each bus, the pins, the data and ACKs of the slave, the speed on the
+# bus and the transactions expected
+buses = [
+    dict(scl = "tile[0]:XS1_PORT_1A",
+         sda = "tile[0]:XS1_PORT_1B",
+         tx_data = [0x99, 0x3a],
+         ack_sequence = [True, True, False,
+                         True],
+         clock_stretch = 0,
+         expected_speed = SPEED,
+         transactions = [("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+                         ("r", 0x22, [0x99, 0x3a], [True, True, False])]),
+    dict(scl = "tile[0]:XS1_PORT_4A.0",
+         sda = "tile[0]:XS1_PORT_4A.1",
+         tx_data = [0x5a, 0xa5],
+         ack_sequence = [True, True,
+                         True],
+         clock_stretch = 0,
+         expected_speed = SPEED,
+         transactions = [("w", 0x50, [0x01], [True, True]),
+                         ("r", 0x50, [0x5a, 0xa5], [True, True, False])]),
+    dict(scl = "tile[0]:XS1_PORT_4A.2",
+         sda = "tile[0]:XS1_PORT_4A.3",
+         tx_data = [],
+         ack_sequence = [True, True, True, False],
+         clock_stretch = CLOCK_STRETCH,
+         expected_speed = SPEED * 2 // 3,
+         transactions = [("w", 0x7b, [0xff, 0x00, 0xaa], [True, True, True, False])]),
+]
+
+expected_xcore_output = [
+    "xCORE bus 0 write got nack, 2",
+    "xCORE bus 0 read got ack: 0x99, 0x3A",
+    "xCORE bus 1 write got ack, 1",
+    "xCORE bus 1 read got ack: 0x5A, 0xA5",
+    "xCORE bus 2 write got nack, 3",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+def test_master_multi_bus(capfd, request, nightly, arch):
+    """ Check the transactions on each of the buses of i2c_master_multi_bus,
+        with a checker on each bus, and that the buses run at the same time.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sinks = [ListSink() for _ in buses]
+    checkers = [I2CMasterChecker(bus["scl"], bus["sda"],
+                                 tx_data = bus["tx_data"],
+                                 expected_speed = bus["expected_speed"],
+                                 clock_stretch = bus["clock_stretch"],
+                                 ack_sequence = bus["ack_sequence"],
+                                 original_speed = SPEED,
+                                 event_sink = sink,
+                                 text_output = False)
+                for bus, sink in zip(buses, sinks)]
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = checkers,
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    for n, (bus, sink) in enumerate(zip(buses, sinks)):
+        differences = diff_events(bus["transactions"], sink.events)
+        assert not differences, "bus %d:\n%s" % (n, "\n".join(differences))
+
+    # The first transaction on each bus starts before any of them has stopped
+    starts = [min(event.time for event in sink.events
+                  if event.kind in (START, REPEATED_START)) for sink in sinks]
+    stops = [min(event.time for event in sink.events if event.kind == STOP)
+             for sink in sinks]
+    assert max(starts) < min(stops)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("xCORE")]
+    assert xcore_output == expected_xcore_output
@@ -0,0 +1,97 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import re
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, group_transactions, START, STOP
+
+test_name = "i2c_master_stats_test"
+
+expected_transactions = [
+    ("w", 0x3c, [0x90, 0xfe], [True, True, False]),
+    ("r", 0x22, [0x99, 0x3a], [True, True, False]),
+    ("r", 0x22, [0xff], [True, False]),
+    ("w", 0x7b, [0xff, 0x00, 0xaa], [True, True, True, False]),
+    ("w", 0x31, [0xee], [True, False]),
+]
+
+# The ports of each master
+PORTS = {"single_port": ("tile[0]:XS1_PORT_8A.1", "tile[0]:XS1_PORT_8A.3")}
+DEFAULT_PORTS = ("tile[0]:XS1_PORT_1A", "tile[0]:XS1_PORT_1B")
+
+FS_PER_TICK = 10**7
+
+def run_stats_test(binary, impl, clock_stretch, capfd):
+    """ Run the test with the checker stretching the clock by clock_stretch ns
+        after each falling edge, returning the checker events and the
+        statistics that the master counted.
+    """
+    sink = ListSink()
+    scl, sda = PORTS.get(impl, DEFAULT_PORTS)
+    checker = I2CMasterChecker(scl, sda,
+                               tx_data = [0x99, 0x3A, 0xff],
+                               expected_speed = 160 if clock_stretch else 400,
+                               clock_stretch = clock_stretch,
+                               ack_sequence = [ack for _, _, _, acks in expected_transactions
+                                               for ack in acks],
+                               original_speed = 400,
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    out, _ = capfd.readouterr()
+    stats = {name: int(value) for name, value in
+             re.findall(r"(\w+) (\d+)", " ".join(line for line in out.splitlines()
+                                                  if line.startswith("XCORE")))}
+    return sink.events, stats
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("impl", ["sync", "single_port", "async", "comb"])
+def test_master_stats(capfd, request, nightly, impl, arch):
+    """ Check the statistics counted by each master against the transactions
+        seen on the bus, with and without clock stretching.
+    """
+    cwd = Path(request.fspath).parent
+    cfg = f"{impl}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    results = {}
+    for clock_stretch in [0, 5000]:
+        events, stats = run_stats_test(binary, impl, clock_stretch, capfd)
+        differences = diff_events(expected_transactions, events)
+        assert not differences, "\n".join(differences)
+
+        transactions = group_transactions(events)
+        assert stats["transactions"] == len(transactions)
+        assert stats["nacks"] == sum(1 for t in transactions
+                                     if not t.acks[0] or
+                                        (t.mode == "w" and not t.acks[-1]))
+        assert stats["read"] == sum(len(t.data) for t in transactions if t.mode == "r")
+        assert stats["written"] == sum(len(t.data) for t in transactions if t.mode == "w")
+        assert stats["reset"] == 0
+
+        # Each transaction is timed by the master from its start to its stop,
+        # give or take the time to set up the bits either side
+        starts = [event.time for event in events if event.kind == START]
+        stops = [event.time for event in events if event.kind == STOP]
+        durations = [(stop - start) / FS_PER_TICK for start, stop in zip(starts, stops)]
+        assert sum(durations) <= stats["busy"] <= 1.5 * sum(durations)
+        assert max(durations) <= stats["max"] <= 1.5 * max(durations)
+        results[clock_stretch] = stats
+
+    # The transactions take longer by the time that the clock is stretched
+    no_stretch, stretch = results[0], results[5000]
+    assert no_stretch["stretch"] < 0.05 * no_stretch["busy"]
+    extra = stretch["busy"] - no_stretch["busy"]
+    assert 0.8 * extra <= stretch["stretch"] - no_stretch["stretch"] <= 1.2 * extra
@@ -0,0 +1,101 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, ACK, REPEATED_START
+
+test_name = "i2c_master_transfer_test"
+
+SPEED = 100
+
+# A register read split between a write and a read from the client, then the
+# same read made twice by transfers, then a transfer to a missing device
+expected_transactions = [
+    ("w", 0x3c, [0x10], [True, True]),
+    ("r", 0x3c, [0x5a], [True, False]),
+    ("w", 0x3c, [0x10], [True, True]),
+    ("r", 0x3c, [0xa5], [True, False]),
+    ("w", 0x3c, [0x10], [True, True]),
+    ("r", 0x3c, [0x3c], [True, False]),
+    ("w", 0x44, [], [False]),
+]
+
+expected_xcore_output = [
+    "XCORE: split ack 0x5A",
+    "XCORE: transfer ack 0xA5",
+    "XCORE: transfer ack 0x3C",
+    "XCORE: transfer nack",
+]
+
+# The ports of each master
+PORTS = {"single_port": ("tile[0]:XS1_PORT_8A.1", "tile[0]:XS1_PORT_8A.3")}
+DEFAULT_PORTS = ("tile[0]:XS1_PORT_1A", "tile[0]:XS1_PORT_1B")
+
+FS_PER_NS = 10**6
+
+def repeated_start_gaps(events):
+    """ Return the time in ns from the ACK of the last byte written to each
+        repeated start, which is the time that the master takes to turn
+        the bus around from the write to the read.
+    """
+    gaps = []
+    last_ack_time = None
+    for event in events:
+        if event.kind == ACK:
+            last_ack_time = event.time
+        elif event.kind == REPEATED_START and last_ack_time is not None:
+            gaps.append((event.time - last_ack_time) / FS_PER_NS)
+    return gaps
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("impl", ["sync", "single_port", "async", "comb", "multi_bus"])
+def test_master_transfer(capfd, request, nightly, impl, arch):
+    """ Check the transactions of a transfer against the same write and read
+        made by the client, and that the transfer turns the bus around from
+        the write to the read no slower than the client does.
+    """
+    cwd = Path(request.fspath).parent
+    cfg = f"{impl}_{arch}"
+    binary = f'{cwd}/{test_name}/bin/{cfg}/{test_name}_{cfg}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    scl, sda = PORTS.get(impl, DEFAULT_PORTS)
+    checker = I2CMasterChecker(scl, sda,
+                               tx_data = [0x5a, 0xa5, 0x3c],
+                               expected_speed = SPEED,
+                               ack_sequence = [True, True, True,
+                                               True, True, True,
+                                               True, True, True,
+                                               False],
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("XCORE")]
+    assert xcore_output == expected_xcore_output
+
+    # The first repeated start follows a round trip to the client, the others
+    # are made by the master
+    gaps = repeated_start_gaps(sink.events)
+    assert len(gaps) == 3
+    split_gap, transfer_gaps = gaps[0], gaps[1:]
+    print(f"{cfg}: write to read {split_gap:.0f}ns split, "
+          f"{max(transfer_gaps):.0f}ns transfer")
+    # Allow for the jitter of the edges of the masters
+    assert max(transfer_gaps) <= split_gap + 100
@@ -0,0 +1,110 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, START, STOP
+
+test_name = "i2c_master_burst_test"
+
+NUM_REGS = 8
+values = [0x80 + k for k in range(40)]
+
+def write(data):
+    return ("w", 0x3c, data, [True] * (len(data) + 1))
+
+def read(data):
+    return ("r", 0x3c, data, [True] * len(data) + [False])
+
+expected_transactions = (
+    # write_reg one register at a time and then write_regs
+    [write([0x10 + k, values[k]]) for k in range(NUM_REGS)] +
+    [write([0x10] + values[:NUM_REGS])] +
+    # read_reg one register at a time and then read_regs
+    [t for k in range(NUM_REGS) for t in (write([0x10 + k]), read([values[k]]))] +
+    [write([0x10]), read(values[:NUM_REGS])] +
+    # write_regs_addr16 and read_regs_addr16
+    [write([0x12, 0x34] + values[:2]),
+     write([0x12, 0x34]), read(values[:2])] +
+    # write_regs split at I2C_REGS_MAX_BURST
+    [write([0x40] + values[:32]),
+     write([0x60] + values[32:40])] +
+    # The third register is NACKed
+    [("w", 0x3c, [0x20] + values[:3], [True, True, True, True, False])] +
+    # The last register is NACKed, by write_regs and write_regs_addr16
+    [("w", 0x3c, [0x30] + values[:3], [True, True, True, True, False]),
+     ("w", 0x3c, [0x12, 0x34] + values[:2], [True, True, True, True, False])]
+)
+
+expected_xcore_output = (
+    ["XCORE: write_regs 0 8"] +
+    ["XCORE: read_reg 0x%x" % values[k] for k in range(NUM_REGS)] +
+    ["XCORE: read_regs 0 " + " ".join("0x%x" % v for v in values[:NUM_REGS]),
+     "XCORE: write_regs_addr16 0 2",
+     "XCORE: read_regs_addr16 0 0x80 0x81",
+     "XCORE: write_regs long 0 40",
+     "XCORE: write_regs partial 2 2",
+     "XCORE: write_regs last 2 2",
+     "XCORE: write_regs_addr16 last 2 1"]
+)
+
+def bus_times(events):
+    """ The time from each START to the following STOP.
+    """
+    starts = [event.time for event in events if event.kind == START]
+    stops = [event.time for event in events if event.kind == STOP]
+    return [stop - start for start, stop in zip(starts, stops)]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+def test_reg_burst(capfd, request, nightly, arch):
+    """ Check the burst register operations and that they take less bus time
+        than the same registers moved one at a time.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    # The slave ACKs every byte it receives apart from the ones the expected
+    # transactions NACK
+    ack_sequence = [ack for mode, _, _, acks in expected_transactions
+                    for ack in (acks if mode == "w" else acks[:1])]
+    tx_data = [byte for mode, _, data, _ in expected_transactions if mode == "r"
+               for byte in data]
+
+    sink = ListSink()
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               tx_data = tx_data,
+                               expected_speed = 400,
+                               ack_sequence = ack_sequence,
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("XCORE")]
+    assert xcore_output == expected_xcore_output
+
+    # Bus time of each operation, in the order of the test
+    times = bus_times(sink.events)
+    single_writes, burst_write = sum(times[:NUM_REGS]), times[NUM_REGS]
+    reads = times[NUM_REGS + 1:]
+    single_reads, burst_read = sum(reads[:NUM_REGS]), reads[NUM_REGS]
+    print(f"Bus time for {NUM_REGS} registers: "
+          f"write_reg {single_writes / 1e9:.1f}us, write_regs {burst_write / 1e9:.1f}us, "
+          f"read_reg {single_reads / 1e9:.1f}us, read_regs {burst_read / 1e9:.1f}us")
+    assert burst_write * 2 < single_writes
+    assert burst_read * 2 < single_reads
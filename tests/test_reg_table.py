@@ -0,0 +1,85 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import re
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events, START, STOP
+
+test_name = "i2c_master_reg_table_test"
+
+def write(data, device=0x3c):
+    return ("w", device, data, [True] * (len(data) + 1))
+
+expected_transactions = [
+    # The init table one register at a time
+    write([0x10, 0x01]), write([0x11, 0x02]), write([0x12, 0x03]),
+    write([0x13, 0x04]), write([0x14, 0x05]),
+    write([0x12, 0x34, 0xab, 0xcd]), write([0x12, 0x35, 0x01, 0x02]),
+    write([0x20, 0x06]), write([0x21, 0x07]), write([0x22, 0x08], 0x22),
+    # The init table by write_reg_table, ending a burst at the delay and at
+    # each change of width, device or I2C_REG_NO_BURST entry
+    write([0x10, 0x01, 0x02, 0x03, 0x04]),
+    write([0x14, 0x05]),
+    write([0x12, 0x34, 0xab, 0xcd, 0x01, 0x02]),
+    write([0x20, 0x06]), write([0x21, 0x07]), write([0x22, 0x08], 0x22),
+    # The value of the second entry is NACKed
+    ("w", 0x3c, [0x30, 0x11, 0x12], [True, True, True, False]),
+    # The device address is NACKed
+    ("w", 0x50, [], [False]),
+]
+
+NUM_SINGLE = 10
+DELAY_FS = 100 * 10**9
+
+expected_xcore_output = [
+    "XCORE: write_reg_table 0 10",
+    "XCORE: write_reg_table nack 2 1",
+    "XCORE: write_reg_table device nack 1 0",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+def test_reg_table(capfd, request, nightly, arch):
+    """ Check the transactions of write_reg_table and that it writes the
+        table in less time than calling write_reg for each register.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               expected_speed = 400,
+                               ack_sequence = [ack for _, _, _, acks in expected_transactions
+                                               for ack in acks],
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+
+    # The delay of the fourth entry is made between the first two bursts
+    starts = [event.time for event in sink.events if event.kind == START]
+    stops = [event.time for event in sink.events if event.kind == STOP]
+    assert starts[NUM_SINGLE + 1] - stops[NUM_SINGLE] >= DELAY_FS
+
+    out, _ = capfd.readouterr()
+    ticks = dict(re.findall(r"XCORE: (\w+) ticks (\d+)", out))
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("XCORE") and "ticks" not in line]
+    assert xcore_output == expected_xcore_output
+
+    print(f"Init table: write_reg {ticks['write_reg']} ticks, "
+          f"write_reg_table {ticks['write_reg_table']} ticks")
+    assert int(ticks["write_reg_table"]) < int(ticks["write_reg"])
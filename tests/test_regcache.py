@@ -0,0 +1,93 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_master_checker import I2CMasterChecker
+from i2c_events import ListSink, diff_events
+
+test_name = "i2c_regcache_test"
+
+def write(data):
+    return ("w", 0x3c, data, [True] * (len(data) + 1))
+
+def read(data):
+    return ("r", 0x3c, data, [True] * len(data) + [False])
+
+# Only the reads and writes that the cache cannot serve reach the bus
+expected_transactions = [
+    # The first read of register 0x1, the second is a hit
+    write([0x01]), read([0x99]),
+    # The update of register 0x1 and writes of 0x2 and 0x3 in one flush
+    write([0x01, 0x95, 0xaa, 0xbb]),
+    # The volatile register is read twice
+    write([0x10]), read([0x3a]),
+    write([0x10]), read([0xff]),
+    # The flush before the first dirty register is evicted
+    write([0x20, 0x11, 0x22, 0x33, 0x44]),
+    # The flush before the write of the volatile register, and the write
+    write([0x24, 0x55]),
+    write([0x10, 0x66]),
+    # The read after the invalidate
+    write([0x21]), read([0x12]),
+    # The flush whose last register is NACKed, and the flush which writes
+    # that register again
+    ("w", 0x3c, [0x30, 0x77, 0x88], [True, True, True, False]),
+    write([0x31, 0x88]),
+]
+
+expected_xcore_output = [
+    "XCORE: read 0x1 0 0x99",
+    "XCORE: read 0x1 0 0x99",
+    "XCORE: update_bits 0x1 0",
+    "XCORE: flush 0",
+    "XCORE: read 0x10 0 0x3A",
+    "XCORE: read 0x10 0 0xFF",
+    "XCORE: write 0x10 0",
+    "XCORE: read 0x21 0 0x12",
+    "XCORE: flush nack 2",
+    "XCORE: flush retry 0",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+def test_regcache(capfd, request, nightly, arch):
+    """ Check that the register cache serves the reads of cacheable registers,
+        combines the writes into bursts, evicts the least recently used
+        registers and keeps a register dirty until it is written.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    # The device ACKs every byte it receives apart from the ones the expected
+    # transactions NACK
+    ack_sequence = [ack for mode, _, _, acks in expected_transactions
+                    for ack in (acks if mode == "w" else acks[:1])]
+    tx_data = [byte for mode, _, data, _ in expected_transactions if mode == "r"
+               for byte in data]
+
+    sink = ListSink()
+    checker = I2CMasterChecker("tile[0]:XS1_PORT_1A",
+                               "tile[0]:XS1_PORT_1B",
+                               tx_data = tx_data,
+                               expected_speed = 400,
+                               ack_sequence = ack_sequence,
+                               event_sink = sink,
+                               text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("XCORE")]
+    assert xcore_output == expected_xcore_output
@@ -0,0 +1,90 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_slave_checker import I2CSlaveChecker
+from i2c_events import ListSink, diff_events
+
+test_name = "i2c_slave_multi_test"
+
+MATCHING = [0x20, 0x21, 0x50, 0x51]
+
+# Transactions to the devices of the slave interleaved with transactions to
+# other devices, some joined by repeated starts
+tsequence = [("w", 0x20, [0x01], False),
+             ("r", 0x51, 1),
+             ("w", 0x44, [0x33]),
+             ("w", 0x21, [0x02, 0x03], False),
+             ("w", 0x30, [0x04]),
+             ("r", 0x50, 2),
+             ("w", 0x52, [0x05], False),
+             ("r", 0x22, 1),
+             ("w", 0x20, [0xff])]
+
+expected_transactions = [
+    ("w", 0x20, [0x01], [True, True]),
+    ("r", 0x51, [0x51], [True, False]),
+    ("w", 0x44, [0x33], [False, False]),
+    ("w", 0x21, [0x02, 0x03], [True, True, True]),
+    ("w", 0x30, [0x04], [False, False]),
+    ("r", 0x50, [0x50, 0x50], [True, True, False]),
+    ("w", 0x52, [0x05], [False, False]),
+    ("r", 0x22, [0xff], [False, False]),
+    ("w", 0x20, [0xff], None),
+]
+
+expected_xcore_output = [
+    "xCORE write request 0x20",
+    "xCORE got data 0x20: 0x1",
+    "xCORE read request 0x51",
+    "xCORE sending 0x51",
+    "xCORE stop bit 0x51",
+    "xCORE write request 0x21",
+    "xCORE got data 0x21: 0x2",
+    "xCORE got data 0x21: 0x3",
+    "xCORE stop bit 0x21",
+    "xCORE read request 0x50",
+    "xCORE sending 0x50",
+    "xCORE sending 0x50",
+    "xCORE stop bit 0x50",
+    "xCORE write request 0x20",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("speed", [400, 100])
+def test_slave_multi(capfd, request, nightly, speed, arch):
+    """ Check that i2c_slave_multi responds to each of its addresses, passing
+        the address to the callbacks, and ignores the other addresses without
+        stretching the clock.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    checker = I2CSlaveChecker("tile[0]:XS1_PORT_1A",
+                              "tile[0]:XS1_PORT_1B",
+                              tsequence = tsequence,
+                              speed = speed,
+                              event_sink = sink,
+                              text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    # The test exits on the last byte, before its ACK
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+    assert set(checker.stretches_by_address) <= set(MATCHING)
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("xCORE")]
+    assert xcore_output == expected_xcore_output
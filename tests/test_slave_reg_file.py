@@ -0,0 +1,70 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+from pathlib import Path
+import Pyxsim
+import pytest
+from i2c_slave_checker import I2CSlaveChecker
+from i2c_events import ListSink, diff_events
+
+test_name = "i2c_slave_reg_file_test"
+
+tsequence = [("w", 0x3c, [0x10, 0x11, 0x22, 0x33]),
+             # Select a register and read from it
+             ("w", 0x3c, [0x10]),
+             ("r", 0x3c, 3),
+             # Continue reading from the next register
+             ("r", 0x3c, 2),
+             ("w", 0x44, [0x33]),
+             # Write around the end of the registers
+             ("w", 0x3c, [0xff, 0x01, 0x02])]
+
+expected_transactions = [
+    ("w", 0x3c, [0x10, 0x11, 0x22, 0x33], [True, True, True, True, True]),
+    ("w", 0x3c, [0x10], [True, True]),
+    ("r", 0x3c, [0x11, 0x22, 0x33], [True, True, True, False]),
+    ("r", 0x3c, [0xa5, 0x5a], [True, True, False]),
+    ("w", 0x44, [0x33], [False, False]),
+    ("w", 0x3c, [0xff, 0x01, 0x02], [True, True, True, True]),
+]
+
+expected_xcore_output = [
+    "xCORE regs written 0x10 3",
+    "xCORE regs written 0x0 32",
+    "xCORE reg 0x1f 0x1 reg 0x0 0x2",
+]
+
+@pytest.mark.parametrize("arch", ["xs2", "xs3"])
+@pytest.mark.parametrize("speed", [400, 100])
+def test_slave_reg_file(capfd, request, nightly, speed, arch):
+    """ Check the reads and writes of the registers of i2c_slave_reg_file,
+        and that it never stretches the clock.
+    """
+    cwd = Path(request.fspath).parent
+    binary = f'{cwd}/{test_name}/bin/{arch}/{test_name}_{arch}.xe'
+
+    assert Path(binary).exists(), f"Cannot find {binary}"
+
+    sink = ListSink()
+    checker = I2CSlaveChecker("tile[0]:XS1_PORT_1A",
+                              "tile[0]:XS1_PORT_1B",
+                              tsequence = tsequence,
+                              speed = speed,
+                              event_sink = sink,
+                              text_output = False)
+
+    Pyxsim.run_on_simulator_(
+        binary,
+        do_xe_prebuild = False,
+        simthreads = [checker],
+        simargs=['--weak-external-drive'],
+        capfd=capfd
+        )
+
+    differences = diff_events(expected_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+    assert checker.num_stretches == 0
+
+    out, _ = capfd.readouterr()
+    xcore_output = [line.strip() for line in out.splitlines()
+                    if line.startswith("xCORE")]
+    assert xcore_output == expected_xcore_output
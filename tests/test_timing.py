@@ -0,0 +1,85 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+import statistics
+import pytest
+from i2c_timing import StreamingStats, Histogram, BitTimingStats
+
+SAMPLE = [2.5e9, 2.4e9, 2.6e9, 2.55e9, 3.1e9, 2.45e9, 2.5e9]
+
+def test_streaming_stats():
+    stats = StreamingStats()
+    for value in SAMPLE:
+        stats.add(value)
+    assert stats.count == len(SAMPLE)
+    assert stats.mean == pytest.approx(statistics.mean(SAMPLE))
+    assert stats.min == min(SAMPLE)
+    assert stats.max == max(SAMPLE)
+    assert stats.variance == pytest.approx(statistics.variance(SAMPLE))
+    assert stats.stddev == pytest.approx(statistics.stdev(SAMPLE))
+
+def test_streaming_stats_few_values():
+    stats = StreamingStats()
+    assert stats.count == 0
+    assert stats.mean is None
+    assert stats.min is None and stats.max is None
+    assert stats.variance == 0.0
+
+    stats.add(7)
+    assert stats.mean == 7
+    assert stats.min == stats.max == 7
+    assert stats.variance == 0.0
+    assert stats.stddev == 0.0
+
+def test_streaming_stats_reset():
+    stats = StreamingStats()
+    for value in SAMPLE:
+        stats.add(value)
+    stats.reset()
+    assert stats.count == 0
+    assert stats.mean is None
+    assert stats.variance == 0.0
+
+    stats.add(1)
+    stats.add(3)
+    assert stats.mean == 2
+    assert stats.min == 1 and stats.max == 3
+    assert stats.variance == 2
+
+def test_histogram():
+    histogram = Histogram(0, 10, 5)
+    # The low edge of each bucket is in it, the high edge is in the next
+    for value in [0, 1.999, 2, 9.999, 10, -0.001, 4, 100]:
+        histogram.add(value)
+    assert histogram.buckets == [2, 1, 1, 0, 1]
+    assert histogram.underflow == 1
+    assert histogram.overflow == 2
+    assert histogram.bucket_range(0) == (0, 2)
+    assert histogram.bucket_range(4) == (8, 10)
+
+    histogram.reset()
+    assert histogram.buckets == [0] * 5
+    assert histogram.underflow == 0 and histogram.overflow == 0
+
+def test_bit_timing_stats(capsys):
+    # 400 kbps has a nominal bit period of 2.5us
+    stats = BitTimingStats(400)
+    assert stats.speed is None
+    stats.add(2.5e9, 1.25e9)
+    stats.add(2.5e9, 1e9)
+    assert stats.speed == pytest.approx(400)
+    assert stats.duty.mean == pytest.approx(0.45)
+    # Four nominal periods in 32 buckets of 0.3125us
+    assert stats.period_histogram.buckets[8] == 2
+    assert stats.duty_histogram.buckets[8] == 1
+    assert stats.duty_histogram.buckets[10] == 1
+
+    stats.report("Run")
+    out = capsys.readouterr().out
+    assert out.startswith("Run: 2 bits, speed 400 Kbps, period mean 2500.0ns")
+    assert "2500-2812.5ns: 2" in out
+
+    stats.reset()
+    assert stats.speed is None
+    assert stats.period_histogram.buckets == [0] * BitTimingStats.PERIOD_BUCKETS
+    stats.report("Empty")
+    assert capsys.readouterr().out == "Empty: no bits\n"
@@ -0,0 +1,88 @@
+# Copyright 2026 XMOS LIMITED.
+# This Software is subject to the terms of the XMOS Public Licence: Version 1.
+import io
+import pytest
+from i2c_bus_model import I2CBusModel, I2CMasterModel
+from i2c_master_checker import I2CMasterChecker
+from i2c_trace_analyzer import analyze_trace, read_vcd_changes, read_csv_changes, main
+from i2c_events import ListSink, diff_events, VIOLATION
+from test_bus_model import master_program, master_transactions
+
+# The traces are recorded from the bus model with the port names xsim uses
+SCL_PORT = "tile[0]:XS1_PORT_1A"
+SDA_PORT = "tile[0]:XS1_PORT_1B"
+
+def record_trace(speed):
+    """ Record the bus model master with an active checker acting as the
+        slave, as in test_bus_model_master.
+    """
+    bus = I2CBusModel(trace=True)
+    master = I2CMasterModel(bus, SCL_PORT, SDA_PORT, speed, master_program(True))
+    checker = I2CMasterChecker(SCL_PORT, SDA_PORT,
+                               tx_data = [0x99, 0x3A, 0xff],
+                               expected_speed = speed,
+                               ack_sequence=[True, True, False,
+                                             True,
+                                             True,
+                                             True, True, True, False,
+                                             True, False],
+                               original_speed = speed,
+                               text_output = False)
+    bus.register_simthread(checker)
+    bus.add_model(master.run())
+    bus.run()
+    return bus
+
+def write_csv(file, trace):
+    values = {SCL_PORT: 1, SDA_PORT: 1}
+    file.write("Time [s],SCL,SDA\n")
+    for time, port, value in trace:
+        values[port] = value
+        file.write("%.12f,%d,%d\n" % (time / 1e15, values[SCL_PORT], values[SDA_PORT]))
+
+@pytest.mark.parametrize("speed", [10, 100, 400, 1000])
+@pytest.mark.parametrize("fmt", ["vcd", "csv"])
+def test_trace_analyzer(tmp_path, speed, fmt):
+    bus = record_trace(speed)
+    trace_path = tmp_path / f"trace.{fmt}"
+    with open(trace_path, "w", newline="") as f:
+        if fmt == "vcd":
+            bus.write_vcd(f, [SCL_PORT, SDA_PORT])
+        else:
+            write_csv(f, bus.trace)
+
+    sink = ListSink()
+    with open(trace_path, newline="") as f:
+        if fmt == "vcd":
+            changes = read_vcd_changes(f, "XS1_PORT_1A", "XS1_PORT_1B")
+        else:
+            changes = read_csv_changes(f, "SCL", "SDA")
+        checker = analyze_trace(changes, speed, speed, sink)
+
+    differences = diff_events(master_transactions, sink.events)
+    assert not differences, "\n".join(differences)
+    assert checker.xsi.num_changes == bus.num_changes
+    assert checker.run_stats.period.count > 0
+
+def test_trace_analyzer_violations(tmp_path):
+    """ A Fast-mode trace checked against the Standard-mode limits.
+    """
+    vcd = io.StringIO()
+    record_trace(400).write_vcd(vcd)
+    vcd.seek(0)
+
+    sink = ListSink()
+    analyze_trace(read_vcd_changes(vcd, "XS1_PORT_1A", "XS1_PORT_1B"), 100, None, sink)
+    assert any(event.kind == VIOLATION for event in sink.events)
+
+def test_trace_analyzer_cli(tmp_path, capsys):
+    trace_path = tmp_path / "trace.vcd"
+    with open(trace_path, "w") as f:
+        record_trace(400).write_vcd(f)
+
+    args = [str(trace_path), "--scl", "XS1_PORT_1A", "--sda", "XS1_PORT_1B"]
+    assert main(args + ["--speed", "400"]) == 0
+    out, _ = capsys.readouterr()
+    assert out.splitlines()[0] == "w 0x3c [90 fe] AAN"
+
+    assert main(args + ["--speed", "100"]) == 1